@@ -84,7 +84,7 @@ def main():
         logger.setLevel(logging.INFO)
 
     feed, api = getFeed(
-        creds, broker=config['Broker'], underlyings=config['Underlyings'])
+        creds, config, underlyings=config['Underlyings'])
 
     logger.info(f"Starting {config['Broker']} data feed....")
     feed.start()
@@ -0,0 +1,28 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Ticks per second the candle aggregator of the quote publisher keeps up with, building one and five
+minute candles for 500 tokens.
+
+Run from the root of the repository with ``python -m benchmarks.candles``.
+"""
+
+import datetime
+import time
+
+from pyalgomate.barfeed.candles import CandleAggregator
+
+tokens = 500
+count = 1000000
+
+if __name__ == "__main__":
+    aggregator = CandleAggregator(intervals=(60, 300))
+    now = int(datetime.datetime.now().timestamp())
+    candleCount = 0
+    start = time.perf_counter()
+    for i in range(count):
+        value = 100.0 + i % 7
+        for _, candles in aggregator.update((2, 40000 + i % tokens, now + i // 2000, 0, value, float(i), 0.0)):
+            candleCount += len(candles)
+    elapsed = time.perf_counter() - start
+    print(f"{count / elapsed:12,.0f} ticks/s, {candleCount} candles")
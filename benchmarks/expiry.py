@@ -0,0 +1,27 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Cost per call of the expiry date lookups of the precomputed expiry calendar against the pendulum
+based computations they replaced, over every day of a year.
+
+Run from the root of the repository with ``python -m benchmarks.expiry``.
+"""
+
+import datetime
+import timeit
+
+from pyalgomate.utils import expiry
+from pyalgomate.utils.expiry import UnderlyingIndex
+
+if __name__ == "__main__":
+    dates = [datetime.date(2023, 1, 1) + datetime.timedelta(days=i) for i in range(365)]
+    for name in ("getNearestWeeklyExpiryDate", "getNextWeeklyExpiryDate", "getNearestMonthlyExpiryDate",
+                 "getNextMonthlyExpiryDate"):
+        function = getattr(expiry, name)
+        reference = getattr(expiry, f"_{name}")
+        referenceTime = timeit.timeit(
+            lambda: [reference(date, UnderlyingIndex.BANKNIFTY) for date in dates], number=1)
+        calendarTime = timeit.timeit(
+            lambda: [function(date, UnderlyingIndex.BANKNIFTY) for date in dates], number=10) / 10
+        print(f"{name:<30} pendulum {referenceTime / len(dates) * 1e6:10.2f} us/call\t"
+              f"calendar {calendarTime / len(dates) * 1e6:8.2f} us/call")
@@ -0,0 +1,45 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Time to add 20000 bars to the original pivot indicators and to their streaming versions, one by one
+and in a batch.
+
+Run from the root of the repository with ``python -m benchmarks.pivots``.
+"""
+
+import datetime
+import time
+
+import numpy as np
+
+from pyalgomate.technical import StructuralPivots as structuralpivots
+from pyalgomate.technical import SwingPivotsJSP as swingpivotsjsp
+from pyalgomate.technical.pivots import StreamingStructuralPivots, StreamingSwingPivotsJSP
+
+count = 20000
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(1)
+    closes = 45000 + np.cumsum(rng.normal(0, 10, count))
+    opens = closes + rng.normal(0, 5, count)
+    highs = np.maximum(opens, closes) + rng.uniform(0, 10, count)
+    lows = np.minimum(opens, closes) - rng.uniform(0, 10, count)
+    dateTimes = [datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=i) for i in range(count)]
+    columns = (dateTimes, opens.tolist(), highs.tolist(), lows.tolist(), closes.tolist())
+
+    for name, original, streaming in (
+        ("StructuralPivots", structuralpivots.StructuralPivots, StreamingStructuralPivots),
+        ("SwingPivotsJSP", swingpivotsjsp.SwingPivotsJSP, StreamingSwingPivotsJSP),
+    ):
+        timings = []
+        for create, batch in ((original, False), (streaming, False), (streaming, True)):
+            pivots = create()
+            start = time.perf_counter()
+            if batch:
+                pivots.add_input_values(*columns)
+            else:
+                for values in zip(*columns):
+                    pivots.add_input_value(*values)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:>16}: original {timings[0] * 1000:8.1f} ms, streaming {timings[1] * 1000:8.1f} ms, "
+              f"batch {timings[2] * 1000:8.1f} ms for {count} bars")
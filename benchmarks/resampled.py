@@ -0,0 +1,63 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Resampling a tick stream of 250 instruments to 1 minute, looking up the bar in progress of one
+instrument per tick as strategies do. ResampledBars is compared with the BarsGrouper it replaced,
+which rebuilds every bar on each lookup.
+
+Run from the root of the repository with ``python -m benchmarks.resampled``.
+"""
+
+import datetime
+import time
+
+from pyalgotrade import bar
+
+from pyalgomate.core.resampled import BarsGrouper, ResampledBars, build_range
+
+
+class TickFeed:
+    def getFrequency(self):
+        return bar.Frequency.TRADE
+
+
+def buildTicks(instruments, count):
+    startDateTime = datetime.datetime.combine(datetime.date.today(), datetime.time(9, 15))
+    ticks = []
+    for i in range(count):
+        tickDateTime = startDateTime + datetime.timedelta(seconds=i // 4)
+        price = 100.0 + i % 13
+        ticks.append((tickDateTime, bar.Bars({
+            instrument: bar.BasicBar(tickDateTime, price, price, price, price, 10, None, bar.Frequency.TRADE)
+            for instrument in instruments
+        })))
+    return ticks
+
+
+if __name__ == "__main__":
+    instruments = [f"NFO|BANKNIFTY{strike}CE" for strike in range(40000, 40000 + 250 * 100, 100)]
+    ticks = buildTicks(instruments, 2000)
+
+    closed = []
+    resampledBars = ResampledBars(TickFeed(), bar.Frequency.MINUTE, closed.append)
+    start = time.perf_counter()
+    for tickDateTime, bars in ticks:
+        resampledBars.addBars(tickDateTime, bars)
+        resampledBars.getBar(instruments[0])
+    elapsed = time.perf_counter() - start
+    print(f'ResampledBars {len(ticks) * len(instruments) / elapsed:12,.0f} bars/s, {len(closed)} periods closed')
+
+    grouper = None
+    range_ = None
+    start = time.perf_counter()
+    for tickDateTime, bars in ticks:
+        if range_ is None or not range_.belongs(tickDateTime):
+            if grouper is not None:
+                grouper.getGrouped()
+            range_ = build_range(tickDateTime, bar.Frequency.MINUTE)
+            grouper = BarsGrouper(range_.getBeginning(), bars, bar.Frequency.MINUTE)
+        else:
+            grouper.addValue(bars)
+        grouper.getGrouped().getBar(instruments[0])
+    elapsed = time.perf_counter() - start
+    print(f'BarsGrouper   {len(ticks) * len(instruments) / elapsed:12,.0f} bars/s')
@@ -0,0 +1,57 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Writes per second into the shared quote table while other processes keep reading every slot, and how
+many of those reads saw a torn tick.
+
+Run from the root of the repository with ``python -m benchmarks.sharedquotes``.
+"""
+
+import datetime
+import multiprocessing
+import time
+
+from pyalgomate.barfeed.sharedquotes import SharedQuoteTable
+
+count = 1000000
+tokens = 200
+readerCount = 2
+readDuration = 2.0
+
+
+def read(name, duration):
+    table = SharedQuoteTable(name)
+    torn = reads = 0
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        for slot in range(len(table)):
+            tick = table.read(slot)
+            # The writer sets every price and quantity of a tick to the same value
+            if tick[5] != tick[4] or tick[10] != tick[4]:
+                torn += 1
+            reads += 1
+    table.close()
+    print(f"reader {reads / duration:12,.0f} reads/s, {torn} torn")
+
+
+if __name__ == "__main__":
+    table = SharedQuoteTable("pyalgomate_quotes_bench", capacity=tokens, create=True)
+    table.write((2, 40000, int(datetime.datetime.now().timestamp()), 0, *([0.0] * 7)))
+    readers = [
+        multiprocessing.Process(target=read, args=(table.getName(), readDuration))
+        for _ in range(readerCount)
+    ]
+    for reader in readers:
+        reader.start()
+
+    now = int(datetime.datetime.now().timestamp())
+    start = time.perf_counter()
+    for i in range(count):
+        value = float(i)
+        table.write((2, 40000 + i % tokens, now, i, value, value, value, value, value, value, value))
+    elapsed = time.perf_counter() - start
+    print(f"writer {count / elapsed:12,.0f} writes/s")
+
+    for reader in readers:
+        reader.join()
+    table.close()
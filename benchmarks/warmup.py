@@ -0,0 +1,46 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Time to warm up talipp indicators from 100000 candles with the vectorized warm-up compared with
+adding the candles one by one.
+
+Run from the root of the repository with ``python -m benchmarks.warmup``.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from talipp.indicators import BB, RSI, SuperTrend
+
+from pyalgomate.technical.warmup import _to_ohlcv, warm_up
+
+count = 100000
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(1)
+    closes = 45000 + np.cumsum(rng.normal(0, 10, count))
+    df = pd.DataFrame({
+        "Date/Time": pd.date_range("2024-01-01 09:15", periods=count, freq="min"),
+        "Open": closes + rng.normal(0, 3, count),
+        "High": closes + 10,
+        "Low": closes - 10,
+        "Close": closes,
+        "Volume": rng.integers(1, 1000, count).astype(float),
+    })
+
+    for name, create, use_ohlcv in (
+        ("SuperTrend", lambda: SuperTrend(7, 3), True),
+        ("RSI", lambda: RSI(14), False),
+        ("BB", lambda: BB(20, 2), False),
+    ):
+        start = time.perf_counter()
+        warm_up(create(), df)
+        vectorized = time.perf_counter() - start
+
+        start = time.perf_counter()
+        replayed = create()
+        for ohlcv in _to_ohlcv(df, 0):
+            replayed.add(ohlcv if use_ohlcv else ohlcv.close)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10}: warm up {vectorized * 1000:8.1f} ms, replay {elapsed * 1000:8.1f} ms for {count} candles")
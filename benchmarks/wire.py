@@ -0,0 +1,84 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Messages per second from a publisher to a subscriber for each wire format of the quote channel.
+
+Run from the root of the repository with ``python -m benchmarks.wire``.
+"""
+
+import datetime
+import pickle
+import threading
+import time
+
+import zmq
+
+from pyalgomate.barfeed.wire import (QuoteTopic, TickTopic, decodeTicks, encodeTick, encodeTicks,
+                                     iterTicks)
+
+count = 200000
+quote = {
+    "t": "tf", "e": "NFO", "tk": "43184", "ft": datetime.datetime.now(), "lp": "245.35",
+    "v": "1234500", "oi": "4567800", "bp1": "245.30", "bq1": "150", "sp1": "245.40",
+    "sq1": "300", "ct": datetime.datetime.now(),
+}
+
+
+def benchmark(name, topic, payload, decode, count, copy=True, ticksPerMessage=1):
+    context = zmq.Context()
+    endpoint = f"inproc://wire-{name}"
+    pub = context.socket(zmq.PUB)
+    pub.setsockopt(zmq.SNDHWM, 0)
+    pub.bind(endpoint)
+    sub = context.socket(zmq.SUB)
+    sub.setsockopt(zmq.RCVHWM, 0)
+    sub.connect(endpoint)
+    sub.setsockopt(zmq.SUBSCRIBE, topic)
+    time.sleep(0.2)
+
+    def publish():
+        for _ in range(count):
+            pub.send_multipart([topic, payload()])
+
+    publisher = threading.Thread(target=publish)
+    start = time.perf_counter()
+    publisher.start()
+    for _ in range(count):
+        _, frame = sub.recv_multipart(copy=copy)
+        decode(frame)
+    elapsed = time.perf_counter() - start
+    publisher.join()
+    sub.close()
+    pub.close()
+    context.term()
+    print(f"{name:<10} {count / elapsed:12,.0f} msgs/s {count * ticksPerMessage / elapsed:14,.0f} ticks/s")
+
+
+def decodePickle(frame):
+    message = pickle.loads(frame)
+    return float(message["lp"]), float(message["v"]), float(message["oi"])
+
+
+def decodeBinary(frame):
+    return list(iterTicks(frame))
+
+
+def decodeBinaryZeroCopy(frame):
+    # What LiveQuoteFeed does
+    return decodeTicks(frame.buffer).tolist()
+
+
+if __name__ == "__main__":
+    # Encoding at the source included
+    benchmark("pickle", QuoteTopic, lambda: pickle.dumps(quote), decodePickle, count)
+    benchmark("binary", TickTopic, lambda: encodeTick(quote), decodeBinary, count)
+
+    # Channel and subscriber side only
+    pickled = pickle.dumps(quote)
+    encoded = encodeTick(quote)
+    batch = encodeTicks([quote] * 250)
+    benchmark("pickle*", QuoteTopic, lambda: pickled, decodePickle, count)
+    benchmark("binary*", TickTopic, lambda: encoded, decodeBinary, count)
+    benchmark("binary0*", TickTopic, lambda: encoded, decodeBinaryZeroCopy, count, copy=False)
+    benchmark("binary250", TickTopic, lambda: batch, decodeBinaryZeroCopy, count // 250, copy=False,
+              ticksPerMessage=250)
@@ -2,6 +2,7 @@
 .. moduleauthor:: Nagaraju Gunda
 """
 
+import collections
 import datetime
 import pandas as pd
 from typing import List, Union, Tuple, Optional
@@ -9,6 +10,29 @@ import time
 from pyalgotrade import bar
 from pyalgomate.barfeed import BaseBarFeed
 from pyalgomate.core import OptionType
+from pyalgomate.core.resampled import build_range
+
+
+def getIntraDayBeginnings(dateTimes: pd.Series, frequency, startTime: datetime.time = datetime.time(hour=9, minute=15)):
+    """Vectorized :class:`pyalgomate.core.resampled.IntraDayRange` beginning of every datetime."""
+    secondsSinceStart = ((dateTimes.dt.hour - startTime.hour) * 60 * 60) + (
+        (dateTimes.dt.minute - startTime.minute) * 60) + (dateTimes.dt.second - startTime.second)
+    return (dateTimes - pd.to_timedelta(secondsSinceStart % frequency, unit="s")).dt.floor("s")
+
+
+def resampleDataFrame(df: pd.DataFrame, frequency) -> pd.DataFrame:
+    """Groups the bars of an instrument, sorted by Date/Time, into the periods of an intraday frequency.
+
+    :returns: The Open, High, Low, Close and Volume of every period, indexed by its beginning.
+    """
+    beginnings = getIntraDayBeginnings(pd.to_datetime(df["Date/Time"]), frequency)
+    return df.groupby(beginnings.to_numpy(), sort=True).agg(
+        Open=("Open", "first"),
+        High=("High", "max"),
+        Low=("Low", "min"),
+        Close=("Close", "last"),
+        Volume=("Volume", "sum"),
+    )
 
 
 class DataFrameFeed(BaseBarFeed):
@@ -44,6 +68,16 @@ class DataFrameFeed(BaseBarFeed):
         )
         self.__nextPos = 0
 
+        # Instruments whose bars were added, mapped to the datetime they were added at
+        self.__addedAt = {}
+        # Frequency -> period beginning -> instrument -> (open, high, low, close, volume)
+        self.__candles = {}
+        self.__candleSubscribers = {}
+        # Frequency -> [beginning, ending, closing datetime] of the period in progress
+        self.__candlePeriods = {}
+        # [frequency, beginning, bars] of the periods closed by the current bars
+        self.__sentCandles = []
+
         for instrument in underlyings:
             self.registerInstrument(instrument)
 
@@ -63,11 +97,19 @@ class DataFrameFeed(BaseBarFeed):
         self.__barsByDateTime = {}
         self.__currentDateTime = None
         self.__nextPos = 0
+        # Bars are added again on demand, from the start
+        self.__addedAt = {}
+        for frequency, period in self.__candlePeriods.items():
+            self.__candles[frequency] = dict()
+            period[:] = [None, None, None]
         super(DataFrameFeed, self).reset()
 
     def getApi(self):
         return None
 
+    def getTickers(self):
+        return self.__instruments
+
     def barsHaveAdjClose(self):
         return self.__haveAdjClose
 
@@ -97,12 +139,106 @@ class DataFrameFeed(BaseBarFeed):
     def eof(self):
         return self.__nextPos >= len(self.__dateTimes)
 
+    def subscribeCandles(self, frequency):
+        """Returns a deque the resampled :class:`pyalgotrade.bar.Bars` of an intraday frequency are
+        appended to, in lockstep with the bars of the feed.
+
+        The candles of every instrument are precomputed with a vectorized groupby when its bars are
+        added and are closed at the same bars :class:`pyalgomate.core.resampled.ResampledBars` would
+        close them, so the callbacks see the same bars at the same time as when grouping online.
+        """
+        if self.__frequency != bar.Frequency.MINUTE or frequency < bar.Frequency.MINUTE or \
+                frequency >= bar.Frequency.DAY:
+            return None
+
+        candles = collections.deque()
+        if frequency not in self.__candleSubscribers:
+            self.__candleSubscribers[frequency] = []
+            self.__candles[frequency] = dict()
+            self.__candlePeriods[frequency] = [None, None, None]
+            for instrument, addedAt in self.__addedAt.items():
+                self.__precomputeCandles(frequency, instrument, self.__df[self.__df["Ticker"] == instrument], addedAt)
+        self.__candleSubscribers[frequency].append(candles)
+        return candles
+
+    def __precomputeCandles(self, frequency, instrument, df, addedAt):
+        df = df.sort_values("Date/Time", kind="stable").drop_duplicates(subset=["Date/Time"], keep="last")
+        if addedAt is not None:
+            # The bars already sent are not grouped online either
+            df = df[pd.to_datetime(df["Date/Time"]) >= addedAt]
+
+        resampled = resampleDataFrame(df, frequency)
+        candles = self.__candles[frequency]
+        for beginning, values in zip(
+            resampled.index,
+            zip(*(resampled[column].tolist() for column in ("Open", "High", "Low", "Close", "Volume"))),
+        ):
+            candles.setdefault(beginning, dict())[instrument] = values
+
+    def __buildCandles(self, frequency, beginning):
+        candles = self.__candles[frequency].get(beginning)
+        if not candles:
+            return None
+        return bar.Bars({
+            instrument: bar.BasicBar(beginning, open_, high, low, close, volume, None, frequency)
+            for instrument, (open_, high, low, close, volume) in candles.items()
+        })
+
+    def __sendCandles(self, frequency, beginning):
+        bars = self.__buildCandles(frequency, beginning)
+        # Instruments added by the strategies on this bar still belong to the period
+        self.__sentCandles.append([frequency, beginning, bars])
+        if bars is None:
+            return
+        for subscriber in self.__candleSubscribers[frequency]:
+            subscriber.append(bars)
+
+    def __resendCandles(self):
+        for sent in self.__sentCandles:
+            frequency, beginning, bars = sent
+            newBars = self.__buildCandles(frequency, beginning)
+            if bars is None or len(newBars.getInstruments()) == len(bars.getInstruments()):
+                continue
+            sent[2] = newBars
+            # Replaced while not handed to the callbacks yet, as ResampledBars only groups the bars then
+            for subscriber in self.__candleSubscribers[frequency]:
+                for i, queued in enumerate(subscriber):
+                    if queued is bars:
+                        subscriber[i] = newBars
+                        break
+
+    def __closeCandles(self, dateTime, hasBars):
+        # Same closing rules as ResampledBars, with a look ahead of one bar
+        for frequency, period in self.__candlePeriods.items():
+            beginning, ending, closeAt = period
+            if beginning is not None and not (beginning <= dateTime < ending):
+                self.__sendCandles(frequency, beginning)
+                beginning = None
+            if hasBars:
+                if beginning is None:
+                    range_ = build_range(dateTime, frequency)
+                    beginning, ending = range_.getBeginning(), range_.getEnding()
+                    closeAt = ending - datetime.timedelta(seconds=self.__frequency)
+                if dateTime >= closeAt:
+                    self.__sendCandles(frequency, beginning)
+                    beginning = None
+            period[:] = [beginning, ending, closeAt] if beginning is not None else [None, None, None]
+
     def addBars(self, instrument) -> dict:
         if instrument not in self:
             self.registerInstrument(instrument)
 
         df = self.__df[(self.__df["Ticker"] == instrument)]
 
+        if instrument not in self.__addedAt:
+            self.__addedAt[instrument] = self.__currentDateTime
+            for frequency in self.__candleSubscribers:
+                self.__precomputeCandles(frequency, instrument, df, self.__currentDateTime)
+            if len(self.__sentCandles):
+                self.__resendCandles()
+
+        hasDepth = "Bid" in self.__columnIndexMapping and "Ask" in self.__columnIndexMapping
+
         for row in df.itertuples():
             instrument = row[self.__columnIndexMapping["Ticker"]]
             dateTime = row[self.__columnIndexMapping["Date/Time"]]
@@ -113,6 +249,11 @@ class DataFrameFeed(BaseBarFeed):
             volume = row[self.__columnIndexMapping["Volume"]]
             openInterest = row[self.__columnIndexMapping["Open Interest"]]
 
+            extra = {"Open Interest": openInterest}
+            if hasDepth:
+                extra["Bid"] = row[self.__columnIndexMapping["Bid"]]
+                extra["Ask"] = row[self.__columnIndexMapping["Ask"]]
+
             if dateTime not in self.__barsByDateTime:
                 self.__barsByDateTime[dateTime] = dict()
 
@@ -125,7 +266,7 @@ class DataFrameFeed(BaseBarFeed):
                 volume,
                 None,
                 self.__frequency,
-                extra={"Open Interest": openInterest},
+                extra=extra,
             )
 
     def getNextBars(self):
@@ -140,7 +281,12 @@ class DataFrameFeed(BaseBarFeed):
         self.__nextPos += 1
         self.__currentDateTime = pd.to_datetime(currentDateTime)
 
-        if self.__currentDateTime not in self.__barsByDateTime:
+        hasBars = self.__currentDateTime in self.__barsByDateTime
+        self.__sentCandles = []
+        if len(self.__candlePeriods):
+            self.__closeCandles(self.__currentDateTime, hasBars)
+
+        if not hasBars:
             return None
 
         return bar.Bars(self.__barsByDateTime[self.__currentDateTime])
@@ -160,6 +306,14 @@ class DataFrameFeed(BaseBarFeed):
 
         return lastBar
 
+    def getBestBidAsk(self, instrument):
+        lastBar = self.getLastBar(instrument)
+        if lastBar is None:
+            return None, None
+        extra = lastBar.getExtraColumns()
+        bid, ask = extra.get("Bid", None), extra.get("Ask", None)
+        return (bid if bid and bid > 0 else None), (ask if ask and ask > 0 else None)
+
     def getLastUpdatedDateTime(self):
         return self.__currentDateTime
 
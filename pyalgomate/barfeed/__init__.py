@@ -31,6 +31,7 @@ class BaseBarFeed(feed.BaseFeed):
         self.__defaultInstrument = None
         self.__currentBars = None
         self.__lastBars = {}
+        self.__resamplingHub = None
 
     def reset(self):
         self.__currentBars = None
@@ -147,3 +148,21 @@ class BaseBarFeed(feed.BaseFeed):
 
     def isDataFeedAlive(self, heartBeatInterval):
         return False
+
+    def getBestBidAsk(self, instrument):
+        """Returns the best (bid, ask) of an instrument. Either is None when the feed has no depth."""
+        return None, None
+
+    def subscribeCandles(self, frequency):
+        """Returns a deque the :class:`pyalgotrade.bar.Bars` of the candles of a frequency built ahead,
+        at the source or precomputed, are appended to, or None when the feed does not have such candles."""
+        return None
+
+    def getResamplingHub(self):
+        """Returns the :class:`pyalgomate.core.resampled.ResamplingHub` resampling the bars of this feed
+        for all the strategies using it."""
+        if self.__resamplingHub is None:
+            from pyalgomate.core.resampled import ResamplingHub  # Lazy import
+
+            self.__resamplingHub = ResamplingHub(self)
+        return self.__resamplingHub
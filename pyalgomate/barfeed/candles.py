@@ -0,0 +1,155 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Candles built once at the source for every subscribed instrument.
+
+The quote publisher feeds its merged ticks to a :class:`CandleAggregator` and publishes the candles
+of a period on the CANDLE topic of their interval once the period is over. Strategies subscribe to
+them instead of each grouping the ticks of every instrument again, so running more strategies does
+not add aggregation work.
+"""
+
+import datetime
+import struct
+import time
+
+import numpy as np
+
+from pyalgomate.barfeed import wire
+
+CandleDtype = np.dtype(
+    [
+        ("exchange", "u1"),
+        ("token", "<u4"),
+        ("start", "<i8"),
+        ("interval", "<u4"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+        ("oi", "<f8"),
+    ]
+)
+
+CandleStruct = struct.Struct("<BIqIdddddd")
+
+assert CandleStruct.size == CandleDtype.itemsize
+
+# IST, the periods are aligned on the exchange's time of the day whatever the time zone of the host
+ExchangeUTCOffset = datetime.timedelta(hours=5, minutes=30)
+
+
+def getCandleTopic(interval) -> bytes:
+    """Returns the topic of the candles of an interval in seconds, e.g. b"CANDLE/60/"."""
+    return wire.getTopic(wire.CandleTopic, str(int(interval)))
+
+
+def encodeCandles(candles) -> bytes:
+    """Packs candles, tuples in CandleDtype field order, into a single frame."""
+    return b"".join(CandleStruct.pack(*candle) for candle in candles)
+
+
+def decodeCandles(buffer) -> np.ndarray:
+    """Returns a read only structured array view over the candles in the buffer."""
+    return np.frombuffer(buffer, dtype=CandleDtype)
+
+
+class CandleAggregator:
+    """Builds the OHLCV/OI candles of every token from merged ticks at several intervals.
+
+    Periods are aligned on startTime like :class:`pyalgomate.core.resampled.IntraDayRange` and use
+    the exchange time of the ticks. The candles of a period all close together, when a tick of a
+    later period arrives or when :meth:`closeElapsed` is called past its end, so instruments that
+    stopped ticking still get their candle. Ticks arriving after their period closed go to the
+    current one. The volume of a candle is the increase of the cumulative volume of the day.
+
+    :param intervals: The candle intervals in seconds.
+    :param startTime: The time of the day the periods are aligned on, in the exchange's time zone.
+    :param utcOffset: The UTC offset of the exchange's time zone.
+    """
+
+    def __init__(
+        self,
+        intervals=(60,),
+        startTime: datetime.time = datetime.time(hour=9, minute=15),
+        utcOffset: datetime.timedelta = ExchangeUTCOffset,
+    ):
+        assert len(intervals), "Missing intervals"
+        self.__intervals = tuple(sorted(set(int(interval) for interval in intervals)))
+        self.__origin = startTime.hour * 3600 + startTime.minute * 60 + startTime.second
+        self.__utcOffset = int(utcOffset.total_seconds())
+        self.__periods = {interval: None for interval in self.__intervals}
+        # (exchange, token) -> [open, high, low, close, volume at open, volume, oi]
+        self.__candles = {interval: dict() for interval in self.__intervals}
+        self.__closeVolumes = {interval: dict() for interval in self.__intervals}
+
+    def getIntervals(self):
+        return self.__intervals
+
+    def getPeriodStart(self, exchangeTime, interval):
+        return exchangeTime - (exchangeTime + self.__utcOffset - self.__origin) % interval
+
+    def update(self, tick: tuple) -> list:
+        """Adds a tick, a tuple in :data:`pyalgomate.barfeed.wire.TickDtype` field order.
+
+        :returns: A list of (interval, candles) for the periods the tick closed. Candles are tuples
+            in CandleDtype field order.
+        """
+        exchange, token, exchangeTime, _, ltp, volume, oi = tick[:7]
+        if ltp <= 0:
+            return []
+
+        closed = []
+        key = (exchange, token)
+        for interval in self.__intervals:
+            periodStart = self.getPeriodStart(exchangeTime, interval)
+            current = self.__periods[interval]
+            if current is None:
+                self.__periods[interval] = periodStart
+            elif periodStart > current:
+                closed.append(self.__close(interval, periodStart))
+
+            candles = self.__candles[interval]
+            candle = candles.get(key, None)
+            if candle is None:
+                openVolume = self.__closeVolumes[interval].get(key, volume)
+                candles[key] = [ltp, ltp, ltp, ltp, openVolume, volume, oi]
+            else:
+                if ltp > candle[1]:
+                    candle[1] = ltp
+                elif ltp < candle[2]:
+                    candle[2] = ltp
+                candle[3] = ltp
+                candle[5] = volume
+                candle[6] = oi
+        return [(interval, candles) for interval, candles in closed if len(candles)]
+
+    def closeElapsed(self, now=None) -> list:
+        """Closes the periods that ended by now, in seconds since the epoch.
+
+        :returns: A list of (interval, candles) as for :meth:`update`.
+        """
+        if now is None:
+            now = time.time()
+        closed = []
+        for interval in self.__intervals:
+            current = self.__periods[interval]
+            if current is not None and now >= current + interval:
+                closed.append(self.__close(interval, current + interval))
+        return [(interval, candles) for interval, candles in closed if len(candles)]
+
+    def __close(self, interval, nextPeriodStart):
+        periodStart = self.__periods[interval]
+        candles = self.__candles[interval]
+        closeVolumes = self.__closeVolumes[interval]
+        self.__candles[interval] = dict()
+        self.__periods[interval] = nextPeriodStart
+
+        ret = []
+        for (exchange, token), (open_, high, low, close, openVolume, volume, oi) in candles.items():
+            closeVolumes[(exchange, token)] = volume
+            ret.append(
+                (exchange, token, periodStart, interval, open_, high, low, close, max(volume - openVolume, 0.0), oi)
+            )
+        return interval, ret
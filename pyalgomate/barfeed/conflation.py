@@ -0,0 +1,131 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+"""
+
+import collections
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ConflatingQuoteBuffer:
+    """Latest value per key buffer between a producer thread and consumer threads.
+
+    Writing a key that has not been drained yet replaces the pending value instead of queueing
+    behind it, so memory is bounded by the number of keys and a slow consumer always sees the
+    newest state rather than a backlog. Pending keys are tracked in a dirty bitmap indexed by slot
+    and queued in a deque.
+
+    No lock is taken: there is a single producer, the only writer of the values and of the
+    write counters, and the handoff relies on the atomicity of list, bytearray and deque
+    operations under the GIL. The producer stores the value before it checks the dirty flag and
+    a consumer clears the flag before it reads the value, so a write racing a drain is either
+    drained or queued for the next drain, never lost. It may then be drained twice. The stats
+    are read without synchronization and are a snapshot only.
+
+    Consumers further downstream (strategies) can acknowledge the sequence they have processed to
+    make their lag visible through :meth:`getConsumerLag`.
+    """
+
+    def __init__(self):
+        self.__slots = dict()
+        self.__keys = []
+        self.__values = []
+        self.__dirty = bytearray()
+        self.__dirtySlots = collections.deque()
+        self.__sequence = 0
+        self.__coalesced = 0
+        self.__dropped = 0
+        self.__drained = 0
+        self.__drains = 0
+        self.__maxPending = 0
+        self.__consumers = dict()
+
+    def put(self, key, value):
+        """Writes a value. Must only be called from the producer thread."""
+        slot = self.__slots.get(key, None)
+        if slot is None:
+            # The slot is published last so that consumers only see complete slots
+            slot = len(self.__keys)
+            self.__keys.append(key)
+            self.__values.append(None)
+            self.__dirty.append(0)
+            self.__slots[key] = slot
+
+        self.__values[slot] = value
+        if self.__dirty[slot]:
+            self.__coalesced += 1
+        else:
+            self.__dirty[slot] = 1
+            self.__dirtySlots.append(slot)
+        self.__sequence += 1
+
+    def putMany(self, items):
+        """Writes an iterable of (key, value) pairs from the producer thread."""
+        for key, value in items:
+            self.put(key, value)
+
+    def drop(self, count=1):
+        """Records messages the producer rejected before they reached the buffer."""
+        self.__dropped += count
+
+    def drain(self):
+        """Returns (sequence, {key: value}) with the keys written since the previous drain.
+
+        The sequence is read first, the values drained may include some later writes.
+        """
+        sequence = self.__sequence
+        dirtySlots = self.__dirtySlots
+        ret = dict()
+        for _ in range(len(dirtySlots)):
+            try:
+                slot = dirtySlots.popleft()
+            except IndexError:
+                # Drained by another consumer
+                break
+            self.__dirty[slot] = 0
+            ret[self.__keys[slot]] = self.__values[slot]
+
+        if len(ret):
+            self.__drained += len(ret)
+            self.__drains += 1
+            self.__maxPending = max(self.__maxPending, len(ret))
+        return sequence, ret
+
+    def get(self, key):
+        slot = self.__slots.get(key, None)
+        return self.__values[slot] if slot is not None else None
+
+    def getSequence(self):
+        return self.__sequence
+
+    def getPendingCount(self):
+        return len(self.__dirtySlots)
+
+    def acknowledge(self, consumer, sequence, drainTime):
+        """Records that a consumer finished processing the data drained at sequence.
+
+        :param drainTime: The time.monotonic() at which that data was drained.
+        """
+        self.__consumers[consumer] = (sequence, time.monotonic() - drainTime)
+
+    def getConsumerLag(self):
+        """Returns, per consumer, how many writes it is behind and how long it took to process the
+        last data it acknowledged after it was drained."""
+        return {
+            consumer: {"messages": self.__sequence - sequence, "seconds": seconds}
+            for consumer, (sequence, seconds) in list(self.__consumers.items())
+        }
+
+    def getStats(self):
+        return {
+            "keys": len(self.__keys),
+            "published": self.__sequence,
+            "coalesced": self.__coalesced,
+            "dropped": self.__dropped,
+            "drained": self.__drained,
+            "drains": self.__drains,
+            "pending": len(self.__dirtySlots),
+            "maxPending": self.__maxPending,
+        }
@@ -0,0 +1,84 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+"""
+
+import threading
+
+import numpy as np
+
+DepthFields = ("bp1", "bq1", "sp1", "sq1")
+
+
+class DepthStore:
+    """Best bid/ask of each instrument kept in one preallocated float array.
+
+    Each instrument gets a row of (bid price, bid quantity, ask price, ask quantity). Updates write
+    into the row in place so no objects are allocated per tick. Partial updates only overwrite the
+    fields they carry, matching the delta messages the websocket sends. Zero means unknown.
+
+    :param capacity: The initial number of rows. The array doubles when full.
+    """
+
+    BidPrice, BidQty, AskPrice, AskQty = range(4)
+
+    def __init__(self, capacity=512):
+        self.__lock = threading.Lock()
+        self.__slots = dict()
+        self.__depth = np.zeros((capacity, len(DepthFields)))
+
+    def __getSlot(self, key):
+        slot = self.__slots.get(key, None)
+        if slot is None:
+            with self.__lock:
+                slot = self.__slots.get(key, None)
+                if slot is None:
+                    slot = len(self.__slots)
+                    if slot == len(self.__depth):
+                        self.__depth = np.concatenate([self.__depth, np.zeros_like(self.__depth)])
+                    self.__slots[key] = slot
+        return slot
+
+    def update(self, key, bidPrice, bidQty, askPrice, askQty):
+        self.__depth[self.__getSlot(key)] = (bidPrice, bidQty, askPrice, askQty)
+
+    def updateFromQuote(self, key, quote: dict):
+        """Updates the depth from the bp1, bq1, sp1 and sq1 fields of a quote, if any.
+
+        :returns: True if the quote carried depth.
+        """
+        row = None
+        for column, field in enumerate(DepthFields):
+            value = quote.get(field, None)
+            if value is None or value == "":
+                continue
+            if row is None:
+                row = self.__depth[self.__getSlot(key)]
+            row[column] = float(value)
+        return row is not None
+
+    def get(self, key):
+        """Returns (bid price, bid quantity, ask price, ask quantity) or None if nothing was received."""
+        slot = self.__slots.get(key, None)
+        if slot is None:
+            return None
+        return tuple(self.__depth[slot].tolist())
+
+    def getBestBidAsk(self, key):
+        """Returns (bid, ask). Either is None when unknown."""
+        depth = self.get(key)
+        if depth is None:
+            return None, None
+        bid, ask = depth[self.BidPrice], depth[self.AskPrice]
+        return (bid if bid > 0 else None), (ask if ask > 0 else None)
+
+    def getSpread(self, key):
+        bid, ask = self.getBestBidAsk(key)
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def __contains__(self, key):
+        return key in self.__slots
+
+    def __len__(self):
+        return len(self.__slots)
@@ -0,0 +1,207 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Latency histograms for the stages a tick goes through on its way to the strategies.
+
+exchangeToReceive and receiveToPublish are recorded by the websocket client, the other stages by the
+process running the feed and the strategies. Each process exposes its own tracker.
+"""
+
+import json
+import logging
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pyalgotrade import bar
+
+logger = logging.getLogger(__name__)
+
+Stages = (
+    "exchangeToReceive",
+    "receiveToPublish",
+    "publishToFeed",
+    "feedToDispatch",
+    "dispatchToOnBars",
+)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of microsecond values in the style of HdrHistogram.
+
+    Values below 2^subBucketBits are counted exactly, larger ones in buckets whose width is a fixed
+    fraction of the value, so recording is O(1), memory is fixed and percentiles keep a relative
+    precision of 2^(1 - subBucketBits) from microseconds to hours.
+    """
+
+    def __init__(self, subBucketBits=7, maxMagnitude=40):
+        self.__subBucketBits = subBucketBits
+        self.__subBucketCount = 1 << subBucketBits
+        self.__halfCount = self.__subBucketCount >> 1
+        self.__counts = [0] * (self.__subBucketCount + maxMagnitude * self.__halfCount)
+        self.__count = 0
+        self.__total = 0
+        self.__max = 0
+        self.__negative = 0
+
+    def __getIndex(self, value):
+        if value < self.__subBucketCount:
+            return value
+        shift = value.bit_length() - self.__subBucketBits
+        return self.__subBucketCount + (shift - 1) * self.__halfCount + ((value >> shift) - self.__halfCount)
+
+    def __getHighestValue(self, index):
+        if index < self.__subBucketCount:
+            return index
+        shift = (index - self.__subBucketCount) // self.__halfCount + 1
+        top = (index - self.__subBucketCount) % self.__halfCount + self.__halfCount
+        return ((top + 1) << shift) - 1
+
+    def record(self, value):
+        """Records a value in microseconds. Negative values, from clock skew, are counted as 0."""
+        value = int(value)
+        if value < 0:
+            self.__negative += 1
+            value = 0
+        index = min(self.__getIndex(value), len(self.__counts) - 1)
+        self.__counts[index] += 1
+        self.__count += 1
+        self.__total += value
+        if value > self.__max:
+            self.__max = value
+
+    def getCount(self):
+        return self.__count
+
+    def getMax(self):
+        return self.__max
+
+    def getMean(self):
+        return self.__total / self.__count if self.__count else 0.0
+
+    def getPercentiles(self, percentiles):
+        """Returns the value at or below which each percentile of the recorded values fall."""
+        counts = list(self.__counts)
+        total = sum(counts)
+        ret = []
+        if total == 0:
+            return [0] * len(percentiles)
+
+        targets = [max(1, percentile / 100.0 * total) for percentile in percentiles]
+        cumulative = 0
+        index = 0
+        for target in targets:
+            while index < len(counts) and cumulative + counts[index] < target:
+                cumulative += counts[index]
+                index += 1
+            ret.append(min(self.__getHighestValue(min(index, len(counts) - 1)), self.__max))
+        return ret
+
+    def getPercentile(self, percentile):
+        return self.getPercentiles([percentile])[0]
+
+    def getSummary(self):
+        """Returns count, mean, p50, p90, p99, p99.9 and max in microseconds."""
+        p50, p90, p99, p999 = self.getPercentiles([50, 90, 99, 99.9])
+        return {
+            "count": self.__count,
+            "mean": round(self.getMean(), 1),
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "p99.9": p999,
+            "max": self.__max,
+            "negative": self.__negative,
+        }
+
+    def reset(self):
+        self.__counts = [0] * len(self.__counts)
+        self.__count = self.__total = self.__max = self.__negative = 0
+
+
+class StampedBars(bar.Bars):
+    """Bars carrying the nanosecond timestamps of the pipeline stages that produced them."""
+
+    def __init__(self, barDict, stamps):
+        super(StampedBars, self).__init__(barDict)
+        self.__stamps = stamps
+
+    def getStamps(self):
+        return self.__stamps
+
+
+class LatencyTracker:
+    """A :class:`LatencyHistogram` per pipeline stage."""
+
+    def __init__(self):
+        self.__histograms = {stage: LatencyHistogram() for stage in Stages}
+        self.__server = None
+
+    def record(self, stage, nanoseconds):
+        self.__histograms[stage].record(nanoseconds // 1000)
+
+    def recordSince(self, stage, startNs):
+        self.record(stage, time.time_ns() - startNs)
+
+    def getHistogram(self, stage) -> LatencyHistogram:
+        return self.__histograms[stage]
+
+    def getSummary(self):
+        """Returns the summary of every stage that recorded values, in microseconds."""
+        return {
+            stage: histogram.getSummary()
+            for stage, histogram in self.__histograms.items()
+            if histogram.getCount()
+        }
+
+    def format(self):
+        return "\n".join(
+            f"{stage:<18} p50 {summary['p50'] / 1000:.2f}ms  p99 {summary['p99'] / 1000:.2f}ms  "
+            f"max {summary['max'] / 1000:.2f}ms"
+            for stage, summary in self.getSummary().items()
+        )
+
+    def reset(self):
+        for histogram in self.__histograms.values():
+            histogram.reset()
+
+    def startServer(self, port, host="127.0.0.1"):
+        """Serves the summary as JSON on http://host:port/metrics from a daemon thread."""
+        if self.__server is not None:
+            return self.__server
+
+        tracker = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(tracker.getSummary()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.__server = ThreadingHTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        thread.start()
+        logger.info(f"Serving latency metrics on http://{host}:{self.__server.server_port}/metrics")
+        return self.__server
+
+    def stopServer(self):
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+
+
+@lru_cache(maxsize=None)
+def getLatencyTracker() -> LatencyTracker:
+    """Returns the tracker shared by everything in this process."""
+    return LatencyTracker()
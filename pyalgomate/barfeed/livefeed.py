@@ -0,0 +1,685 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Broker neutral feed of the quotes published by :class:`pyalgomate.barfeed.publisher.QuotePublisher`.
+"""
+
+import asyncio
+import collections
+import datetime
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+import traceback
+from typing import Optional, Tuple
+
+import zmq
+import zmq.asyncio
+from pyalgotrade import bar, observer
+
+from pyalgomate.barfeed import BaseBarFeed, wire
+from pyalgomate.barfeed.BasicBarEx import BasicBarEx
+from pyalgomate.barfeed.candles import decodeCandles, getCandleTopic
+from pyalgomate.barfeed.conflation import ConflatingQuoteBuffer
+from pyalgomate.barfeed.depth import DepthStore
+from pyalgomate.barfeed.latency import StampedBars, getLatencyTracker
+from pyalgomate.barfeed.publisher import OrderUpdateTopic
+from pyalgomate.barfeed.sharedquotes import DefaultName, SlotReader
+from pyalgomate.core import OptionType
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteMessage(object):
+    # t	tk	‘tk’ represents touchline acknowledgement
+    # e	NSE, BSE, NFO ..	Exchange name
+    # tk	22	Scrip Token
+    # pp	2 for NSE, BSE & 4 for CDS USDINR	Price precision
+    # ts		Trading Symbol
+    # ti		Tick size
+    # ls		Lot size
+    # lp		LTP
+    # pc		Percentage change
+    # v		volume
+    # o		Open price
+    # h		High price
+    # l		Low price
+    # c		Close price
+    # ap		Average trade price
+    # oi		Open interest
+    # poi		Previous day closing Open Interest
+    # toi		Total open interest for underlying
+    # bq1		Best Buy Quantity 1
+    # bp1		Best Buy Price 1
+    # sq1		Best Sell Quantity 1
+    # sp1		Best Sell Price 1
+
+    def __init__(self, eventDict, tokenMappings):
+        self.__eventDict = eventDict
+        self.__tokenMappings = tokenMappings
+
+    def __str__(self):
+        return f"{self.__eventDict}"
+
+    @property
+    def field(self):
+        return self.__eventDict["t"]
+
+    @property
+    def exchange(self):
+        return self.__eventDict["e"]
+
+    @property
+    def scriptToken(self):
+        return self.__eventDict["tk"]
+
+    @property
+    def dateTime(self):
+        return self.__eventDict["ft"]
+
+    @property
+    def price(self):
+        return float(self.__eventDict.get("lp", 0))
+
+    @property
+    def volume(self):
+        return float(self.__eventDict.get("v", 0))
+
+    @property
+    def openInterest(self):
+        return float(self.__eventDict.get("oi", 0))
+
+    @property
+    def bidPrice(self):
+        return float(self.__eventDict.get("bp1", 0))
+
+    @property
+    def bidQty(self):
+        return float(self.__eventDict.get("bq1", 0))
+
+    @property
+    def askPrice(self):
+        return float(self.__eventDict.get("sp1", 0))
+
+    @property
+    def askQty(self):
+        return float(self.__eventDict.get("sq1", 0))
+
+    @property
+    def seq(self):
+        return int(self.dateTime)
+
+    @property
+    def instrument(self):
+        return self.__tokenMappings[f"{self.exchange}|{self.scriptToken}"]
+
+    def getBar(self, dateTime=None) -> BasicBarEx:
+        open = high = low = close = self.price
+
+        return BasicBarEx(
+            dateTime or self.dateTime,
+            open,
+            high,
+            low,
+            close,
+            self.volume,
+            None,
+            bar.Frequency.TRADE,
+            {
+                "Instrument": self.instrument,
+                "Open Interest": self.openInterest,
+                "Message": self.__eventDict,
+            },
+        )
+
+
+class LiveQuoteFeed(BaseBarFeed):
+    """A real-time BarFeed of the quotes published over IPC, whatever the broker.
+
+    :param api: The broker API, returned by getApi.
+    :param tokenMappings: Instruments mapped to their exchange|token keys, e.g. NFO|43184.
+    :param instruments: The instruments to receive quotes for.
+    :param getTopicRoot: Returns the topic root of an instrument, as used by the publisher.
+    :param getOptionContract: Returns the option contract of an instrument or None.
+    :param candleIntervals: The intervals in seconds the publisher builds candles at, see
+        :meth:`subscribeCandles`.
+    """
+
+    MaxBatchSize = 1000
+
+    def __init__(
+        self,
+        api,
+        tokenMappings: dict,
+        instruments: list,
+        ipc_path=None,
+        timeout=10,
+        maxLen=None,
+        wireFormat="pickle",
+        incrementalBars=False,
+        metricsPort=None,
+        sharedQuotesName=DefaultName,
+        followSubscriptions=False,
+        getTopicRoot=wire.getDefaultTopicRoot,
+        getOptionContract=None,
+        candleIntervals=(),
+    ):
+        super(LiveQuoteFeed, self).__init__(bar.Frequency.TRADE, maxLen)
+        self.__getTopicRoot = getTopicRoot
+        self.__getOptionContract = getOptionContract
+        assert wireFormat in wire.WireFormats, f"Unknown wire format {wireFormat}"
+        self.__wireFormat = wireFormat
+        # When set, only the instruments that ticked since the previous Bars are emitted.
+        # Otherwise every subscribed instrument is emitted each time, as strategies used to expect.
+        self.__incrementalBars = incrementalBars
+        self.__instruments = instruments
+        self.__instrumentToTokenIdMapping = {
+            instrument: tokenMappings[instrument]
+            for instrument in self.__instruments
+            if instrument in tokenMappings
+        }
+        self.__tokenIdToInstrumentMappings = {
+            value: key for key, value in tokenMappings.items()
+        }
+        self.__tokenMappings = tokenMappings
+
+        if len(self.__instruments) != len(self.__instrumentToTokenIdMapping):
+            raise Exception(
+                f"Could not get tokens for the instruments {[instrument for instrument in self.__instruments if instrument not in tokenMappings]}"
+            )
+
+        self.__api = api
+
+        for key, value in self.__instrumentToTokenIdMapping.items():
+            self.registerDataSeries(key)
+
+        self.__stopped = False
+        self.__lastQuoteDateTime = None
+        self.__lastReceivedDateTime = None
+        self.__lastUpdateTime = None
+        self.__nextBarsTime = None
+
+        # ZeroMQ setup
+        self.__context = zmq.asyncio.Context()
+        self.__socket = self.__context.socket(zmq.SUB)
+
+        if ipc_path is None:
+            # Create a platform-independent IPC path
+            ipc_dir = tempfile.gettempdir()
+            ipc_file = "pyalgomate_ipc"
+            self.__ipc_path = os.path.join(ipc_dir, ipc_file)
+        else:
+            self.__ipc_path = ipc_path
+
+        # On Windows, we need to use tcp instead of ipc
+        if os.name == "nt":
+            self.__socket.connect(f"tcp://127.0.0.1:{self.__ipc_path.split(':')[-1]}")
+            self.__holdingsEndpoint = wire.getHoldingsEndpoint(f"tcp://127.0.0.1:{self.__ipc_path.split(':')[-1]}")
+        else:
+            self.__socket.connect(f"ipc://{self.__ipc_path}")
+            self.__holdingsEndpoint = wire.getHoldingsEndpoint(self.__ipc_path)
+
+        # The instruments held by each consumer, sent to the websocket client so that it keeps them
+        # subscribed. The socket is created on first use and guarded as consumers run in their threads.
+        self.__holdingsLock = threading.Lock()
+        self.__holdings = dict()
+        self.__heldInstruments = frozenset()
+        self.__holdingsContext = None
+        self.__holdingsSocket = None
+
+        # Subscribe to the topic of each instrument so that ZMQ filters out the other instruments
+        # before they reach Python
+        for instrument, tokenId in self.__instrumentToTokenIdMapping.items():
+            self.__socket.setsockopt(zmq.SUBSCRIBE, self.__getTopic(instrument, tokenId))
+        # Follow the instruments the websocket client subscribes to and unsubscribes from at runtime
+        if followSubscriptions:
+            self.__socket.setsockopt(zmq.SUBSCRIBE, wire.SubscriptionTopic)
+        self.__subscribedTokenIds = set(self.__instrumentToTokenIdMapping.values())
+        # Subscription changes made from other threads. The socket is only touched by the receive
+        # thread and the instruments only by the dispatcher thread.
+        self.__socketOptions = collections.deque()
+        self.__instrumentChanges = collections.deque()
+        # The deques of the consumers of the candles of each interval
+        self.__candleIntervals = set(int(interval) for interval in candleIntervals or ())
+        self.__candleSubscribers = dict()
+        # Order updates published by the websocket client, emitted from the dispatcher thread
+        self.__orderBookUpdateEvent = observer.Event()
+        self.__orderUpdates = collections.deque()
+        self.__orderUpdatesSubscribed = False
+
+        # Latest quote per token handed over from the receive thread to the dispatcher thread.
+        # Quotes that arrive before the previous ones were consumed replace them.
+        self.__quoteBuffer = ConflatingQuoteBuffer()
+        self.__dispatchers = []
+        self.__lastDispatchedQuoteDateTime = None
+        self.__barsSequence = 0
+        self.__barsDrainTime = time.monotonic()
+
+        self.__latestQuotes = {}
+        self.__latestOIs = {}
+        self.__dirtyKeys = set()
+        self.__lastBars = {}
+        # Depth is updated from the receive thread as it also comes in quotes without an LTP
+        self.__depth = DepthStore()
+        # Reads the quotes the websocket client keeps in shared memory when notified of a slot
+        self.__slotReader = SlotReader(sharedQuotesName)
+        self.__latencyTracker = getLatencyTracker()
+        if metricsPort is not None:
+            self.__latencyTracker.startServer(metricsPort)
+
+        # Thread to run the asyncio event loop
+        self.__loopThread = threading.Thread(target=self.__run_event_loop)
+        self.__loopThread.start()
+
+    def getApi(self):
+        return self.__api
+
+    def getCurrentDateTime(self):
+        return datetime.datetime.now()
+
+    def barsHaveAdjClose(self):
+        return False
+
+    def isIncremental(self):
+        return self.__incrementalBars
+
+    def getLastBar(self, instrument):
+        lastBar = self.__lastBars.get(instrument, None)
+        if lastBar is not None:
+            return lastBar
+
+        lastBarQuote = self.__latestQuotes.get(
+            self.__instrumentToTokenIdMapping.get(instrument, None), None
+        )
+        if lastBarQuote is not None:
+            return QuoteMessage(
+                lastBarQuote, self.__tokenIdToInstrumentMappings
+            ).getBar()
+        return None
+
+    def onDispatcherRegistered(self, dispatcher):
+        # The feed is shared by the strategies, each of them registers it with its own dispatcher
+        self.__dispatchers.append(dispatcher)
+
+    def __getTopic(self, instrument, tokenId):
+        exchange, token = tokenId.split("|")
+        return wire.getTopic(
+            wire.BaseTopics[self.__wireFormat], exchange, self.__getTopicRoot(instrument), token
+        )
+
+    def subscribeInstruments(self, instruments):
+        """Starts receiving the quotes of more instruments while running."""
+        for instrument in instruments:
+            tokenId = self.__tokenMappings.get(instrument, None)
+            if tokenId is None:
+                logger.warning(f"Could not get the token for {instrument}")
+                continue
+            self.__socketOptions.append((zmq.SUBSCRIBE, self.__getTopic(instrument, tokenId)))
+            self.__instrumentChanges.append((True, instrument))
+
+    def unsubscribeInstruments(self, instruments):
+        """Stops receiving the quotes of instruments. Their data series are kept."""
+        for instrument in instruments:
+            tokenId = self.__tokenMappings.get(instrument, None)
+            if tokenId is None:
+                continue
+            self.__socketOptions.append((zmq.UNSUBSCRIBE, self.__getTopic(instrument, tokenId)))
+            self.__instrumentChanges.append((False, instrument))
+
+    def setHeldInstruments(self, consumer, instruments):
+        """Sets the instruments a consumer of this feed holds positions or orders in.
+
+        The websocket client is told about the instruments held by all the consumers so that they stay
+        subscribed when they leave the band of strikes it follows.
+        """
+        with self.__holdingsLock:
+            instruments = frozenset(instruments)
+            if len(instruments):
+                self.__holdings[consumer] = instruments
+            else:
+                self.__holdings.pop(consumer, None)
+            heldInstruments = frozenset().union(*self.__holdings.values())
+            if heldInstruments == self.__heldInstruments:
+                return
+            self.__heldInstruments = heldInstruments
+
+            if self.__holdingsSocket is None:
+                self.__holdingsContext = zmq.Context()
+                self.__holdingsSocket = self.__holdingsContext.socket(zmq.PUSH)
+                self.__holdingsSocket.setsockopt(zmq.LINGER, 0)
+                self.__holdingsSocket.connect(self.__holdingsEndpoint)
+            # Sent when the websocket client connects if it is not running yet
+            self.__holdingsSocket.send(
+                json.dumps({"feed": f"{os.getpid()}/{id(self)}", "instruments": sorted(heldInstruments)}).encode()
+            )
+
+    def getHeldInstruments(self):
+        return self.__heldInstruments
+
+    def subscribeCandles(self, frequency):
+        """Returns a deque the Bars of the candles the publisher builds at frequency are appended to,
+        or None if it does not build them. Every call returns a new deque, one per consumer."""
+        if frequency not in self.__candleIntervals:
+            return None
+
+        candles = collections.deque()
+        subscribers = self.__candleSubscribers.get(frequency, None)
+        if subscribers is None:
+            subscribers = self.__candleSubscribers[frequency] = []
+            self.__socketOptions.append((zmq.SUBSCRIBE, getCandleTopic(frequency)))
+        subscribers.append(candles)
+        return candles
+
+    def __onCandles(self, message):
+        candles = decodeCandles(message)
+        if not len(candles):
+            return
+
+        # Built once and shared by the consumers
+        bars = dict()
+        for candle in candles.tolist():
+            (exchange, token, start, interval, open_, high, low, close, volume, oi) = candle
+            tokenId = wire.getKey(exchange, token)
+            if tokenId not in self.__subscribedTokenIds:
+                continue
+            instrument = self.__tokenIdToInstrumentMappings[tokenId]
+            bars[instrument] = BasicBarEx(
+                datetime.datetime.fromtimestamp(start),
+                open_,
+                high,
+                low,
+                close,
+                volume,
+                None,
+                interval,
+                {"Instrument": instrument, "Open Interest": oi},
+            )
+        if not len(bars):
+            return
+
+        bars = bar.Bars(bars)
+        for candleBars in self.__candleSubscribers.get(int(candles[0]["interval"]), []):
+            candleBars.append(bars)
+        for dispatcher in self.__dispatchers:
+            if hasattr(dispatcher, "wakeup"):
+                dispatcher.wakeup()
+
+    def __onSubscriptions(self, message):
+        subscriptions = json.loads(message)
+        self.subscribeInstruments(subscriptions["subscribed"])
+        self.unsubscribeInstruments(subscriptions["unsubscribed"])
+
+    def __applyInstrumentChanges(self):
+        while len(self.__instrumentChanges):
+            subscribed, instrument = self.__instrumentChanges.popleft()
+            tokenId = self.__tokenMappings[instrument]
+            if subscribed:
+                self.__instrumentToTokenIdMapping[instrument] = tokenId
+                self.__tokenIdToInstrumentMappings[tokenId] = instrument
+                self.__subscribedTokenIds.add(tokenId)
+                self.registerDataSeries(instrument)
+            else:
+                self.__instrumentToTokenIdMapping.pop(instrument, None)
+                self.__subscribedTokenIds.discard(tokenId)
+                self.__latestQuotes.pop(tokenId, None)
+                self.__latestOIs.pop(tokenId, None)
+                self.__dirtyKeys.discard(tokenId)
+                # A position can still be priced and exited until its instrument is subscribed again
+                if instrument not in self.__heldInstruments:
+                    self.__lastBars.pop(instrument, None)
+
+    def __run_event_loop(self):
+        asyncio.run(self.__async_main())
+
+    def __decode(self, topic, frame, batch):
+        # Ticks are read in place from the received frame, the other messages are small
+        message = frame.buffer if wire.isTickTopic(topic) else frame.bytes
+        if topic == wire.SubscriptionTopic:
+            self.__onSubscriptions(message)
+            return
+        if topic == OrderUpdateTopic:
+            self.__orderUpdates.append(json.loads(message))
+            for dispatcher in self.__dispatchers:
+                if hasattr(dispatcher, "wakeup"):
+                    dispatcher.wakeup()
+            return
+        if wire.isCandleTopic(topic):
+            self.__onCandles(message)
+            return
+
+        feedNs = time.time_ns()
+        # Binary ticks and shared quotes only carry the receive time, so this includes receiveToPublish
+        if wire.isTickTopic(topic):
+            quotes = [wire.tickToQuote(tick) for tick in wire.decodeTicks(message).tolist()]
+            publishNs = quotes[0]["ct"] if len(quotes) else None
+        elif wire.isSlotTopic(topic):
+            quotes = [wire.tickToQuote(self.__slotReader.read(message))]
+            publishNs = quotes[0]["ct"]
+        else:
+            quotes = [pickle.loads(message)]
+            publishNs = quotes[0].get("pt", None)
+
+        if publishNs is not None:
+            self.__latencyTracker.record("publishToFeed", feedNs - publishNs)
+
+        for quote in quotes:
+            quote["feedNs"] = feedNs
+            self.__depth.updateFromQuote(quote["e"] + "|" + quote["tk"], quote)
+            if float(quote.get("lp", 0)) > 0:
+                batch.append(quote)
+            else:
+                self.__quoteBuffer.drop()
+
+    async def __async_main(self):
+        while not self.__stopped:
+            while len(self.__socketOptions):
+                self.__socket.setsockopt(*self.__socketOptions.popleft())
+
+            # Wait for the first message without polling, the timeout only bounds how long stop() waits
+            if not await self.__socket.poll(timeout=100):
+                continue
+
+            # Drain what is already queued in one go. The batch is bounded so that a sustained burst
+            # still reaches the dispatcher regularly.
+            batch = []
+            for _ in range(self.MaxBatchSize):
+                try:
+                    topic, frame = await self.__socket.recv_multipart(flags=zmq.NOBLOCK, copy=False)
+                except zmq.Again:
+                    break
+                self.__decode(topic.bytes, frame, batch)
+
+            if not len(batch):
+                continue
+
+            self.__quoteBuffer.putMany(
+                (quote["e"] + "|" + quote["tk"], quote) for quote in batch
+            )
+            self.__lastQuoteDateTime = batch[-1]["ft"]
+            self.__lastReceivedDateTime = datetime.datetime.now()
+
+            for dispatcher in self.__dispatchers:
+                if hasattr(dispatcher, "wakeup"):
+                    dispatcher.wakeup()
+
+    def __applyQuotes(self):
+        self.__applyInstrumentChanges()
+        sequence, quotes = self.__quoteBuffer.drain()
+        if not len(quotes):
+            return
+
+        dispatchNs = time.time_ns()
+        for key, message in quotes.items():
+            if key not in self.__subscribedTokenIds:
+                # Received before it was unsubscribed
+                continue
+            self.__latencyTracker.record("feedToDispatch", dispatchNs - message["feedNs"])
+            self.__latestQuotes[key] = message
+            self.__dirtyKeys.add(key)
+            if message.get("oi", None) is not None:
+                self.__latestOIs[key] = float(message["oi"])
+
+        lastQuoteDateTime = max(message["ft"] for message in quotes.values())
+        if (
+            self.__lastDispatchedQuoteDateTime is None
+            or lastQuoteDateTime > self.__lastDispatchedQuoteDateTime
+        ):
+            self.__lastDispatchedQuoteDateTime = lastQuoteDateTime
+        self.__barsSequence = sequence
+        self.__barsDrainTime = time.monotonic()
+
+    def acknowledgeBars(self, consumer):
+        """Called by the consumers of this feed once they processed the current bars."""
+        self.__quoteBuffer.acknowledge(consumer, self.__barsSequence, self.__barsDrainTime)
+
+    def getBestBidAsk(self, instrument):
+        tokenId = self.__tokenMappings.get(instrument, None)
+        if tokenId is None:
+            return None, None
+        return self.__depth.getBestBidAsk(tokenId)
+
+    def getDepth(self, instrument):
+        """Returns (bid price, bid quantity, ask price, ask quantity) or None."""
+        tokenId = self.__tokenMappings.get(instrument, None)
+        if tokenId is None:
+            return None
+        return self.__depth.get(tokenId)
+
+    def getConflationStats(self):
+        ret = self.__quoteBuffer.getStats()
+        ret["consumerLag"] = self.__quoteBuffer.getConsumerLag()
+        return ret
+
+    def getNextBars(self):
+        def getBar(message, lastQuoteDateTime):
+            if not message.get("oi", None):
+                message["oi"] = self.__latestOIs.get(
+                    message["e"] + "|" + message["tk"], 0
+                )
+            bar = QuoteMessage(message, self.__tokenIdToInstrumentMappings).getBar(
+                lastQuoteDateTime
+            )
+            return bar.getInstrument(), bar
+
+        bars = None
+        self.__applyQuotes()
+        lastQuoteDateTime = self.__lastDispatchedQuoteDateTime
+        if self.__lastUpdateTime != lastQuoteDateTime:
+            self.__nextBarsTime = datetime.datetime.now()
+            self.__lastUpdateTime = lastQuoteDateTime
+            barDateTime = self.__nextBarsTime.replace(microsecond=0)
+            keys = self.__dirtyKeys if self.__incrementalBars else self.__latestQuotes.keys()
+            changedBars = dict(
+                getBar(self.__latestQuotes[key], barDateTime) for key in keys
+            )
+            self.__dirtyKeys = set()
+            self.__lastBars.update(changedBars)
+            if len(changedBars):
+                bars = StampedBars(changedBars, {"dispatch": time.time_ns()})
+        return bars
+
+    def peekDateTime(self):
+        return None
+
+    def start(self):
+        super(LiveQuoteFeed, self).start()
+        logger.info(f"{type(self).__name__} started")
+
+    def dispatch(self):
+        try:
+            ret = False
+            while len(self.__orderUpdates):
+                self.__orderBookUpdateEvent.emit(self.__orderUpdates.popleft())
+                ret = True
+            if super(LiveQuoteFeed, self).dispatch():
+                ret = True
+            return ret
+        except Exception as e:
+            logger.error(f"Exception: {e}")
+            logger.exception(traceback.format_exc())
+
+    def stop(self):
+        self.__stopped = True
+        self.__loopThread.join()
+        self.__socket.close()
+        self.__context.term()
+        with self.__holdingsLock:
+            if self.__holdingsSocket is not None:
+                self.__holdingsSocket.close()
+                self.__holdingsContext.term()
+                self.__holdingsSocket = None
+        self.__slotReader.close()
+
+    def join(self):
+        pass
+
+    def eof(self):
+        return self.__stopped
+
+    def getOrderBookUpdateEvent(self):
+        """Returns the event emitted with the order updates the websocket client publishes.
+
+        Handlers receive the order update as a dict, as sent by the broker.
+        The updates are only received once this is called.
+        """
+        if not self.__orderUpdatesSubscribed:
+            self.__orderUpdatesSubscribed = True
+            self.__socketOptions.append((zmq.SUBSCRIBE, OrderUpdateTopic))
+        return self.__orderBookUpdateEvent
+
+    def getLastUpdatedDateTime(self):
+        return self.__lastQuoteDateTime
+
+    def getLastReceivedDateTime(self):
+        return self.__lastReceivedDateTime
+
+    def getNextBarsDateTime(self):
+        return self.__nextBarsTime
+
+    def isDataFeedAlive(self, heartBeatInterval=5):
+        if self.__lastQuoteDateTime is None:
+            return False
+
+        currentDateTime = datetime.datetime.now()
+        timeSinceLastDateTime = currentDateTime - self.__lastQuoteDateTime
+        return timeSinceLastDateTime.total_seconds() <= heartBeatInterval
+
+    def findNearestPremiumOption(
+        self,
+        expiry: datetime.datetime,
+        optionType: OptionType,
+        premium: float,
+        time: datetime.datetime,
+    ) -> Optional[Tuple[str, float]]:
+        nearestOption = None
+        nearestPremium = None
+        minDifference = float("inf")
+        if self.__getOptionContract is None:
+            return nearestOption, nearestPremium
+
+        for tokenId, quote in self.__latestQuotes.items():
+            instrument = self.__tokenIdToInstrumentMappings[tokenId]
+            optionContract = self.__getOptionContract(instrument)
+
+            if (
+                optionContract is None
+                or optionContract.expiry != expiry
+                or optionContract.type
+                != ("c" if optionType == OptionType.CALL else "p")
+            ):
+                continue
+
+            close = QuoteMessage(quote, self.__tokenIdToInstrumentMappings).price
+
+            difference = abs(close - premium)
+
+            if difference < minDifference:
+                minDifference = difference
+                nearestOption = instrument
+                nearestPremium = close
+
+        return nearestOption, nearestPremium
@@ -0,0 +1,289 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Broker neutral publishing of quotes over IPC.
+
+The websocket client of each broker converts the ticks it receives into finvasia style quote dicts and
+hands them to a :class:`QuotePublisher`. Topics, wire formats, the shared quote table and the latency
+stamps are the same whatever the broker, so :class:`pyalgomate.barfeed.livefeed.LiveQuoteFeed`, the
+recorder and the replayer work with all of them.
+"""
+
+import datetime
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+import zmq
+
+from pyalgomate.barfeed import wire
+from pyalgomate.barfeed.candles import CandleAggregator, encodeCandles, getCandleTopic
+from pyalgomate.barfeed.latency import getLatencyTracker
+from pyalgomate.barfeed.sharedquotes import DefaultName, SharedQuoteTable
+
+logger = logging.getLogger(__name__)
+
+OrderUpdateTopic = b"ORDER_UPDATE"
+
+
+class QuotePublisher:
+    """Publishes quotes on an IPC endpoint.
+
+    A quote is a dict with the e (exchange) and tk (token) keys and any of ft (exchange time, epoch
+    or datetime), lp, v, oi, bp1, bq1, sp1, sq1 and ts. Quotes may be partial, they are merged per
+    token and the binary and shared wire formats carry the merged state.
+
+    :param ipc_path: The IPC path to bind. Defaults to pyalgomate_ipc in the temp directory.
+    :param wireFormat: One of :data:`pyalgomate.barfeed.wire.WireFormats`.
+    :param getTopicRoot: Returns the topic root of an instrument, see :func:`pyalgomate.barfeed.wire.getTopic`.
+    :param sharedQuotesName: The shared quote table to write to with the shared wire format.
+    :param sharedQuotesCapacity: The number of tokens the shared quote table can hold.
+    :param candleIntervals: Intervals in seconds to build candles of every token at and publish them
+        on the CANDLE topics, see :mod:`pyalgomate.barfeed.candles`.
+    :param candleDelay: Seconds to wait past the end of a period for late ticks before its candles
+        are published regardless.
+    """
+
+    def __init__(
+        self,
+        ipc_path=None,
+        wireFormat="pickle",
+        getTopicRoot=wire.getDefaultTopicRoot,
+        sharedQuotesName=DefaultName,
+        sharedQuotesCapacity=1024,
+        candleIntervals=None,
+        candleDelay=2,
+    ):
+        assert wireFormat in wire.WireFormats, f"Unknown wire format {wireFormat}"
+        self.__wireFormat = wireFormat
+        self.__getTopicRoot = getTopicRoot
+        self.__instruments = dict()
+        self.__topics = dict()
+        self.__quotes = dict()
+        self.__lastQuoteDateTime = None
+        self.__lastReceivedDateTime = None
+        self.__messageCount = 0
+        self.__rateWindowStart = time.time_ns()
+        self.__rateWindowCount = 0
+        self.__messageRate = 0.0
+        self.__latencyTracker = getLatencyTracker()
+        # ZMQ sockets are not thread safe and quotes, subscriptions and order updates may come from
+        # different threads
+        self.__lock = threading.Lock()
+
+        # With the shared wire format the quotes are written once to shared memory for every
+        # subscriber process and only the slot that changed is published
+        self.__sharedQuotes = (
+            SharedQuoteTable(sharedQuotesName, capacity=sharedQuotesCapacity, create=True)
+            if wireFormat == "shared"
+            else None
+        )
+
+        self.__context = zmq.Context()
+        self.__socket = self.__context.socket(zmq.PUB)
+
+        if ipc_path is None:
+            # Create a platform-independent IPC path
+            ipc_path = os.path.join(tempfile.gettempdir(), "pyalgomate_ipc")
+        self.__ipc_path = ipc_path
+
+        # On Windows, we need to use tcp instead of ipc
+        if os.name == "nt":
+            self.__socket.bind("tcp://127.0.0.1:*")
+            self.__ipc_path = self.__socket.getsockopt(zmq.LAST_ENDPOINT).decode()
+        else:
+            self.__socket.bind(f"ipc://{self.__ipc_path}")
+
+        # Candles are closed by ticks of the next period and, for the tokens that stopped ticking,
+        # by a timer
+        self.__candleAggregator = None
+        self.__candleLock = threading.Lock()
+        self.__candleDelay = candleDelay
+        self.__closed = threading.Event()
+        self.__holdingsHandlers = []
+        self.__holdingsThread = None
+        if candleIntervals:
+            self.__candleAggregator = CandleAggregator(candleIntervals)
+            self.__candleThread = threading.Thread(target=self.__closeElapsedCandles)
+            self.__candleThread.daemon = True
+            self.__candleThread.start()
+
+    def get_ipc_path(self):
+        return self.__ipc_path
+
+    def getWireFormat(self):
+        return self.__wireFormat
+
+    def setInstruments(self, instruments: dict):
+        """Sets the instruments of tokens, e.g. NFO|43184, which determine their topics."""
+        for key, instrument in instruments.items():
+            self.__instruments[key] = instrument
+            self.__topics.pop(key, None)
+
+    def removeInstruments(self, keys):
+        for key in keys:
+            self.__instruments.pop(key, None)
+            self.__quotes.pop(key, None)
+
+    def getQuotes(self):
+        """Returns the merged quote of each token published so far."""
+        return self.__quotes
+
+    def getLastQuoteDateTime(self):
+        return self.__lastQuoteDateTime
+
+    def getLastReceivedDateTime(self):
+        return self.__lastReceivedDateTime
+
+    def getMessageCount(self):
+        return self.__messageCount
+
+    def getMessageRate(self):
+        """Returns the quotes published per second, measured over the last second or so."""
+        return self.__messageRate
+
+    def getCandleIntervals(self):
+        return self.__candleAggregator.getIntervals() if self.__candleAggregator is not None else ()
+
+    def __getTopic(self, key):
+        topic = self.__topics.get(key, None)
+        if topic is None:
+            exchange, token = key.split("|")
+            instrument = self.__instruments.get(key, None)
+            root = self.__getTopicRoot(instrument) if instrument is not None else "_"
+            topic = self.__topics[key] = wire.getTopic(
+                wire.BaseTopics[self.__wireFormat], exchange, root, token
+            )
+        return topic
+
+    def publish(self, message, receiveNs=None):
+        """Publishes a quote.
+
+        :param message: The quote. Its ft is converted to a datetime and ct, the receive time, is set.
+        :param receiveNs: When the quote was received, in nanoseconds since the epoch. Defaults to now.
+        :returns: The merged quote of the token.
+        """
+        if receiveNs is None:
+            receiveNs = time.time_ns()
+        key = message["e"] + "|" + message["tk"]
+        self.__messageCount += 1
+        self.__rateWindowCount += 1
+        if receiveNs - self.__rateWindowStart >= 10**9:
+            self.__messageRate = self.__rateWindowCount * 1e9 / (receiveNs - self.__rateWindowStart)
+            self.__rateWindowStart = receiveNs
+            self.__rateWindowCount = 0
+
+        self.__lastReceivedDateTime = datetime.datetime.now()
+        message["ct"] = self.__lastReceivedDateTime
+        exchangeTime = message.get("ft", None)
+        if isinstance(exchangeTime, datetime.datetime):
+            self.__lastQuoteDateTime = exchangeTime
+        elif exchangeTime is not None:
+            self.__lastQuoteDateTime = datetime.datetime.fromtimestamp(int(exchangeTime))
+        else:
+            self.__lastQuoteDateTime = self.__lastReceivedDateTime.replace(microsecond=0)
+        message["ft"] = self.__lastQuoteDateTime
+        if exchangeTime is not None:
+            # The exchange time usually only has a resolution of a second
+            self.__latencyTracker.record(
+                "exchangeToReceive", receiveNs - int(self.__lastQuoteDateTime.timestamp() * 10**9)
+            )
+
+        symbolInfo = self.__quotes.get(key, None)
+        if symbolInfo is not None:
+            symbolInfo.update(message)
+        else:
+            symbolInfo = self.__quotes[key] = message
+
+        topic = self.__getTopic(key)
+        tick = None
+        if self.__wireFormat != "pickle" or self.__candleAggregator is not None:
+            # Parse once here so that subscribers receive ready to use values
+            tick = wire.quoteToTick(symbolInfo, receiveNs)
+        if self.__wireFormat == "binary":
+            payload = wire.TickStruct.pack(*tick)
+        elif self.__wireFormat == "shared":
+            payload = self.__sharedQuotes.encodeSlot(self.__sharedQuotes.write(tick))
+        else:
+            message["pt"] = time.time_ns()
+            payload = pickle.dumps(message)
+        with self.__lock:
+            self.__socket.send_multipart([topic, payload])
+        self.__latencyTracker.recordSince("receiveToPublish", receiveNs)
+
+        if self.__candleAggregator is not None:
+            with self.__candleLock:
+                closed = self.__candleAggregator.update(tick)
+            self.__publishCandles(closed)
+        return symbolInfo
+
+    def __publishCandles(self, closed):
+        for interval, candles in closed:
+            with self.__lock:
+                self.__socket.send_multipart([getCandleTopic(interval), encodeCandles(candles)])
+
+    def __closeElapsedCandles(self):
+        while not self.__closed.wait(0.25):
+            with self.__candleLock:
+                closed = self.__candleAggregator.closeElapsed(time.time() - self.__candleDelay)
+            try:
+                self.__publishCandles(closed)
+            except zmq.ZMQError:
+                # Closed meanwhile
+                break
+
+    def publishSubscriptions(self, subscribed, unsubscribed):
+        """Tells the feeds following subscriptions about instruments added or removed."""
+        message = json.dumps({"subscribed": subscribed, "unsubscribed": unsubscribed}).encode()
+        with self.__lock:
+            self.__socket.send_multipart([wire.SubscriptionTopic, message])
+
+    def addHoldingsHandler(self, handler):
+        """Registers a callable invoked with the id of a feed and the instruments held by its
+        strategies every time they change, see
+        :meth:`pyalgomate.barfeed.livefeed.LiveQuoteFeed.setHeldInstruments`."""
+        self.__holdingsHandlers.append(handler)
+        if self.__holdingsThread is None:
+            self.__holdingsThread = threading.Thread(target=self.__receiveHoldings)
+            self.__holdingsThread.daemon = True
+            self.__holdingsThread.start()
+
+    def __receiveHoldings(self):
+        socket = self.__context.socket(zmq.PULL)
+        try:
+            socket.bind(wire.getHoldingsEndpoint(self.__ipc_path))
+        except zmq.ZMQError as e:
+            logger.warning(f"Could not bind the endpoint of the held instruments. {e}")
+            socket.close()
+            return
+
+        try:
+            while not self.__closed.is_set():
+                if not socket.poll(250):
+                    continue
+                holdings = json.loads(socket.recv())
+                for handler in self.__holdingsHandlers:
+                    try:
+                        handler(holdings["feed"], holdings["instruments"])
+                    except Exception as e:
+                        logger.exception(f"Holdings handler failed. {e}")
+        finally:
+            socket.close(linger=0)
+
+    def publishOrderUpdate(self, message):
+        with self.__lock:
+            self.__socket.send_multipart([OrderUpdateTopic, json.dumps(message, default=str).encode()])
+
+    def close(self):
+        self.__closed.set()
+        with self.__lock:
+            self.__socket.close()
+        if self.__holdingsThread is not None:
+            self.__holdingsThread.join()
+        self.__context.term()
+        if self.__sharedQuotes is not None:
+            self.__sharedQuotes.close()
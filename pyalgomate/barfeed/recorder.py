@@ -0,0 +1,371 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Records every tick published by the websocket client.
+
+Ticks are appended as fixed size :data:`pyalgomate.barfeed.wire.TickDtype` records to a memory mapped
+log which is flushed to disk periodically. At the end of the day the log is rolled over into a
+compressed parquet dataset partitioned by date and root. The recorder is a plain subscriber of the
+publisher, if it falls behind ZMQ drops messages for it and the trading processes are not slowed down.
+"""
+
+import datetime
+import glob
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import zmq
+from dateutil import tz
+
+from pyalgomate.barfeed import wire
+from pyalgomate.barfeed.sharedquotes import DefaultName, SlotReader
+
+logger = logging.getLogger(__name__)
+
+LogMagic = b"PYAMTICK"
+LogVersion = 1
+LogHeader = struct.Struct("<8sIIQ")
+LogHeaderSize = 64
+
+
+class TickLog:
+    """Append only, memory mapped log of binary ticks.
+
+    The file grows in chunks. The record count in the header only moves forward on :meth:`flush`,
+    after the records themselves were synced, so a reader never sees a partially written record.
+
+    :param path: The log file. An existing log is opened for appending.
+    :param chunkSize: The number of bytes the file grows by when full.
+    """
+
+    def __init__(self, path, chunkSize=64 * 1024 * 1024):
+        self.__path = path
+        self.__chunkSize = chunkSize
+        self.__recordSize = wire.TickDtype.itemsize
+
+        exists = os.path.isfile(path) and os.path.getsize(path) >= LogHeaderSize
+        self.__file = open(path, "r+b" if exists else "w+b")
+        if exists:
+            magic, version, recordSize, count = LogHeader.unpack(self.__file.read(LogHeader.size))
+            if magic != LogMagic or version != LogVersion or recordSize != self.__recordSize:
+                raise Exception(f"{path} is not a tick log")
+        else:
+            count = 0
+            self.__file.write(
+                LogHeader.pack(LogMagic, LogVersion, self.__recordSize, count).ljust(LogHeaderSize, b"\0")
+            )
+            self.__file.truncate(LogHeaderSize + chunkSize)
+            self.__file.flush()
+
+        self.__mmap = mmap.mmap(self.__file.fileno(), 0)
+        self.__count = self.__flushedCount = count
+        self.__offset = LogHeaderSize + count * self.__recordSize
+
+    def getPath(self):
+        return self.__path
+
+    def __grow(self, size):
+        newSize = len(self.__mmap) + max(self.__chunkSize, size)
+        self.__mmap.flush()
+        self.__mmap.close()
+        self.__file.truncate(newSize)
+        self.__mmap = mmap.mmap(self.__file.fileno(), newSize)
+
+    def append(self, data):
+        """Appends one or more whole records, e.g. a binary tick frame as received."""
+        size = len(data)
+        if size % self.__recordSize:
+            raise ValueError(f"Expected a multiple of {self.__recordSize} bytes but got {size}")
+
+        end = self.__offset + size
+        if end > len(self.__mmap):
+            self.__grow(size)
+        self.__mmap[self.__offset:end] = data
+        self.__offset = end
+        self.__count += size // self.__recordSize
+
+    def flush(self):
+        if self.__count == self.__flushedCount:
+            return
+        self.__mmap.flush()
+        self.__mmap[: LogHeader.size] = LogHeader.pack(
+            LogMagic, LogVersion, self.__recordSize, self.__count
+        )
+        self.__mmap.flush(0, min(mmap.PAGESIZE, len(self.__mmap)))
+        self.__flushedCount = self.__count
+
+    def close(self):
+        self.flush()
+        self.__mmap.close()
+        self.__file.truncate(self.__offset)
+        self.__file.close()
+
+    def __len__(self):
+        return self.__count
+
+    @staticmethod
+    def read(path) -> np.ndarray:
+        """Returns the flushed records of a log as a structured array."""
+        with open(path, "rb") as f:
+            _, _, _, count = LogHeader.unpack(f.read(LogHeader.size))
+        return np.fromfile(path, dtype=wire.TickDtype, count=count, offset=LogHeaderSize)
+
+
+def getMetadataPath(logPath):
+    return os.path.splitext(logPath)[0] + ".json"
+
+
+def convertLogToParquet(logPath, directory, compression="zstd"):
+    """Writes the ticks of a log to a parquet dataset under directory partitioned by Date and Root.
+
+    :returns: The number of ticks written.
+    """
+    ticks = TickLog.read(logPath)
+    if not len(ticks):
+        return 0
+
+    metadata = dict(roots=dict(), symbols=dict())
+    metadataPath = getMetadataPath(logPath)
+    if os.path.isfile(metadataPath):
+        with open(metadataPath) as f:
+            metadata = json.load(f)
+
+    keys = pd.Series(
+        [wire.getKey(exchange, token) for exchange, token in zip(ticks["exchange"], ticks["token"])]
+    )
+    # Naive local times, like the quotes built by wire.tickToQuote
+    exchangeTimes = pd.to_datetime(ticks["exchangeTime"], unit="s", utc=True).tz_convert(tz.tzlocal()).tz_localize(None)
+    df = pd.DataFrame(
+        {
+            "Date": exchangeTimes.strftime("%Y-%m-%d"),
+            "Root": keys.map(metadata["roots"]).fillna("_").values,
+            "Ticker": keys.map(metadata["symbols"]).values,
+            "Token": keys.values,
+            "Date/Time": exchangeTimes,
+            "Receive Time": pd.to_datetime(ticks["receiveTime"], unit="ns", utc=True).tz_convert(tz.tzlocal()).tz_localize(None),
+            "LTP": ticks["ltp"],
+            "Volume": ticks["volume"],
+            "Open Interest": ticks["oi"],
+            "Bid": ticks["bidPrice"],
+            "Bid Qty": ticks["bidQty"],
+            "Ask": ticks["askPrice"],
+            "Ask Qty": ticks["askQty"],
+        }
+    )
+
+    df.to_parquet(directory, partition_cols=["Date", "Root"], compression=compression, index=False)
+    return len(df)
+
+
+class TickRecorder:
+    """Subscribes to the quote publisher and records every tick to a daily :class:`TickLog`.
+
+    All wire formats are accepted. Binary frames are appended as is, pickled quotes are merged per
+    token and encoded first and slot notifications are resolved from the shared quote table.
+
+    :param directory: Where the logs and the parquet dataset are written.
+    :param ipc_path: The IPC path of the publisher. Defaults to the websocket client's default.
+    :param flushInterval: Seconds between two syncs of the log to disk.
+    :param sharedQuotesName: The shared quote table of the publisher, for the shared wire format.
+    """
+
+    MaxBatchSize = 1000
+
+    def __init__(
+        self,
+        directory,
+        ipc_path=None,
+        flushInterval=1.0,
+        compression="zstd",
+        sharedQuotesName=DefaultName,
+    ):
+        self.__directory = directory
+        self.__flushInterval = flushInterval
+        self.__compression = compression
+        self.__stopped = False
+        self.__log = None
+        self.__date = None
+        self.__lastFlushTime = time.monotonic()
+        self.__topics = dict()
+        self.__quotes = dict()
+        self.__metadata = dict(roots=dict(), symbols=dict())
+        self.__metadataChanged = False
+        self.__rollovers = []
+        self.__received = 0
+        self.__slotReader = SlotReader(sharedQuotesName)
+
+        os.makedirs(directory, exist_ok=True)
+
+        if ipc_path is None:
+            ipc_path = os.path.join(tempfile.gettempdir(), "pyalgomate_ipc")
+
+        self.__context = zmq.Context()
+        self.__socket = self.__context.socket(zmq.SUB)
+        # Absorb bursts, beyond that ZMQ drops ticks for this subscriber only
+        self.__socket.setsockopt(zmq.RCVHWM, 1000000)
+        if os.name == "nt":
+            self.__socket.connect(f"tcp://127.0.0.1:{ipc_path.split(':')[-1]}")
+        else:
+            self.__socket.connect(f"ipc://{ipc_path}")
+        for baseTopic in wire.BaseTopics.values():
+            self.__socket.setsockopt(zmq.SUBSCRIBE, baseTopic)
+
+        self.__parquetDirectory = os.path.join(directory, "parquet")
+
+        # Roll over whatever was left behind by a previous run on an earlier day
+        today = datetime.date.today().strftime("%Y-%m-%d")
+        for logPath in sorted(glob.glob(os.path.join(directory, "ticks-*.log"))):
+            if today not in os.path.basename(logPath):
+                self.__startRollover(logPath)
+
+    def __getLogPath(self, date):
+        return os.path.join(self.__directory, f"ticks-{date.strftime('%Y-%m-%d')}.log")
+
+    def __openLog(self, date):
+        self.__date = date
+        logPath = self.__getLogPath(date)
+        self.__metadata = dict(roots=dict(), symbols=dict())
+        metadataPath = getMetadataPath(logPath)
+        if os.path.isfile(metadataPath):
+            with open(metadataPath) as f:
+                self.__metadata = json.load(f)
+        self.__log = TickLog(logPath)
+        logger.info(f"Recording ticks to {logPath} ({len(self.__log)} ticks already recorded)")
+
+    def __writeMetadata(self):
+        if not self.__metadataChanged or self.__log is None:
+            return
+        with open(getMetadataPath(self.__log.getPath()), "w") as f:
+            json.dump(self.__metadata, f)
+        self.__metadataChanged = False
+
+    def __startRollover(self, logPath):
+        def rollover():
+            try:
+                count = convertLogToParquet(logPath, self.__parquetDirectory, self.__compression)
+                os.remove(logPath)
+                if os.path.isfile(getMetadataPath(logPath)):
+                    os.remove(getMetadataPath(logPath))
+                logger.info(f"Rolled over {count} ticks from {logPath}")
+            except Exception as e:
+                logger.exception(f"Could not roll over {logPath}. {e}")
+
+        thread = threading.Thread(target=rollover)
+        thread.start()
+        self.__rollovers.append(thread)
+
+    def rollover(self):
+        if self.__log is None:
+            return
+        self.__writeMetadata()
+        self.__log.close()
+        self.__startRollover(self.__log.getPath())
+        self.__log = None
+
+    def __onTopic(self, topic):
+        # FEED_UPDATE/<exchange>/<root>/<token>/
+        parts = topic.decode().split(wire.TopicSeparator)
+        key = None
+        if len(parts) >= 4:
+            key = f"{parts[1]}|{parts[3]}"
+            if self.__metadata["roots"].get(key, None) != parts[2]:
+                self.__metadata["roots"][key] = parts[2]
+                self.__metadataChanged = True
+        self.__topics[topic] = key
+        return key
+
+    def __onMessage(self, topic, message):
+        if wire.isTickTopic(topic):
+            if topic not in self.__topics:
+                self.__onTopic(topic)
+            self.__log.append(message)
+            return
+        if wire.isSlotTopic(topic):
+            if topic not in self.__topics:
+                self.__onTopic(topic)
+            self.__log.append(wire.TickStruct.pack(*self.__slotReader.read(message)))
+            return
+
+        quote = pickle.loads(message)
+        key = quote["e"] + "|" + quote["tk"]
+        if topic not in self.__topics:
+            self.__onTopic(topic)
+        merged = self.__quotes.get(key, None)
+        if merged is None:
+            merged = self.__quotes[key] = dict()
+        merged.update(quote)
+        if "ts" in quote:
+            symbol = f"{quote['e']}|{quote['ts']}"
+            if self.__metadata["symbols"].get(key, None) != symbol:
+                self.__metadata["symbols"][key] = symbol
+                self.__metadataChanged = True
+        self.__log.append(wire.encodeTick(merged))
+
+    def run(self):
+        poller = zmq.Poller()
+        poller.register(self.__socket, zmq.POLLIN)
+
+        try:
+            while not self.__stopped:
+                today = datetime.date.today()
+                if self.__date != today:
+                    self.rollover()
+                    self.__openLog(today)
+
+                if poller.poll(100):
+                    # Bounded so that a sustained burst still lets the log be flushed and rolled over
+                    for _ in range(self.MaxBatchSize):
+                        try:
+                            topic, message = self.__socket.recv_multipart(flags=zmq.NOBLOCK)
+                        except zmq.Again:
+                            break
+                        self.__onMessage(topic, message)
+                        self.__received += 1
+
+                if time.monotonic() - self.__lastFlushTime >= self.__flushInterval:
+                    self.__log.flush()
+                    self.__writeMetadata()
+                    self.__lastFlushTime = time.monotonic()
+        finally:
+            if self.__log is not None:
+                self.__writeMetadata()
+                self.__log.close()
+                self.__log = None
+            self.__socket.close()
+            self.__context.term()
+            self.__slotReader.close()
+            for thread in self.__rollovers:
+                thread.join()
+
+    def stop(self):
+        self.__stopped = True
+
+    def getReceivedCount(self):
+        return self.__received
+
+
+if __name__ == "__main__":
+    import click
+
+    @click.command()
+    @click.option("--directory", default="ticks", help="Where the ticks are recorded")
+    @click.option("--ipc-path", default=None, help="IPC path of the websocket client")
+    @click.option("--flush-interval", default=1.0, type=click.FLOAT, help="Seconds between syncs to disk")
+    def main(directory, ipc_path, flush_interval):
+        logging.basicConfig(level=logging.INFO)
+        recorder = TickRecorder(directory, ipc_path, flush_interval)
+        try:
+            recorder.run()
+        except KeyboardInterrupt:
+            pass
+
+    main()
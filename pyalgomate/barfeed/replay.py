@@ -0,0 +1,254 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Replays recorded ticks on the IPC endpoint of the websocket client.
+
+Anything that subscribes to the live publisher, :class:`pyalgomate.barfeed.livefeed.LiveQuoteFeed`
+and the tick recorder included, works unchanged against a replay. This allows paper trading and
+load testing the live code paths outside market hours and reproducing a session tick for tick.
+"""
+
+import datetime
+import json
+import logging
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import zmq
+from dateutil import tz
+
+from pyalgomate.barfeed import wire
+from pyalgomate.barfeed.recorder import TickLog, getMetadataPath
+from pyalgomate.barfeed.sharedquotes import DefaultName, SharedQuoteTable
+
+logger = logging.getLogger(__name__)
+
+
+def _toEpoch(dateTimes):
+    """Returns the nanoseconds since the epoch of naive local times, whatever their resolution."""
+    dateTimes = pd.to_datetime(dateTimes).dt.tz_localize(tz.tzlocal())
+    return ((dateTimes - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(1, "ns")).values
+
+
+def loadTicks(source):
+    """Loads the ticks of a tick log or of a parquet file/dataset written by the recorder.
+
+    :returns: A tuple with the ticks as a :data:`pyalgomate.barfeed.wire.TickDtype` array sorted by
+        receive time, the roots and the trading symbols keyed by exchange|token.
+    """
+    if os.path.isfile(source) and source.endswith(".log"):
+        ticks = TickLog.read(source)
+        metadata = dict(roots=dict(), symbols=dict())
+        if os.path.isfile(getMetadataPath(source)):
+            with open(getMetadataPath(source)) as f:
+                metadata = json.load(f)
+        roots, symbols = metadata["roots"], metadata["symbols"]
+    else:
+        df = pd.read_parquet(source)
+        tokens = df["Token"].astype(str).str.split("|", n=1, expand=True)
+        ticks = np.zeros(len(df), dtype=wire.TickDtype)
+        ticks["exchange"] = tokens[0].map(wire.exchangeCodes).values
+        ticks["token"] = tokens[1].astype(int).values
+        # The recorder writes naive local times
+        ticks["exchangeTime"] = _toEpoch(df["Date/Time"]) // 10**9
+        ticks["receiveTime"] = _toEpoch(df["Receive Time"])
+        for field, column in (
+            ("ltp", "LTP"),
+            ("volume", "Volume"),
+            ("oi", "Open Interest"),
+            ("bidPrice", "Bid"),
+            ("bidQty", "Bid Qty"),
+            ("askPrice", "Ask"),
+            ("askQty", "Ask Qty"),
+        ):
+            ticks[field] = df[column].values
+
+        keys = df["Token"].astype(str)
+        roots = dict(zip(keys, df["Root"].astype(str)))
+        symbols = {
+            key: symbol for key, symbol in zip(keys, df["Ticker"]) if isinstance(symbol, str)
+        }
+
+    order = np.argsort(ticks["receiveTime"], kind="stable")
+    return ticks[order], roots, symbols
+
+
+class TickReplayer:
+    """Publishes recorded ticks with the same topics and wire format as the websocket client.
+
+    :param source: A tick log or a parquet file/dataset written by the recorder.
+    :param ipc_path: The IPC path to bind. Defaults to the websocket client's default.
+    :param speed: 1 replays in real time, N replays N times faster preserving the relative gaps
+        between ticks. None or 0 publishes as fast as possible.
+    :param wireFormat: "pickle", "binary" or "shared", as for the websocket client.
+    :param shiftTimes: Moves the timestamps so that the first tick is stamped now. Live code treats
+        quotes older than a few seconds as a dead feed.
+    :param startTime: Skips the ticks before this time of the day.
+    :param endTime: Stops at this time of the day.
+    :param sharedQuotesName: The shared quote table to write to with the shared wire format.
+    """
+
+    def __init__(
+        self,
+        source,
+        ipc_path=None,
+        speed=1.0,
+        wireFormat="pickle",
+        shiftTimes=True,
+        startTime: datetime.time = None,
+        endTime: datetime.time = None,
+        sharedQuotesName=DefaultName,
+    ):
+        assert wireFormat in wire.WireFormats, f"Unknown wire format {wireFormat}"
+        self.__speed = speed
+        self.__wireFormat = wireFormat
+        self.__shiftTimes = shiftTimes
+        self.__stopped = False
+        self.__published = 0
+        self.__maxDelay = 0.0
+
+        self.__ticks, self.__roots, self.__symbols = loadTicks(source)
+        if startTime is not None or endTime is not None:
+            # In local time, like the quotes built by wire.tickToQuote
+            timesOfDay = pd.to_datetime(self.__ticks["exchangeTime"], unit="s", utc=True).tz_convert(tz.tzlocal()).time
+            mask = np.ones(len(self.__ticks), dtype=bool)
+            if startTime is not None:
+                mask &= timesOfDay >= startTime
+            if endTime is not None:
+                mask &= timesOfDay <= endTime
+            self.__ticks = self.__ticks[mask]
+        logger.info(f"Loaded {len(self.__ticks)} ticks from {source}")
+
+        self.__sharedQuotes = None
+        if wireFormat == "shared":
+            capacity = len(np.unique(self.__ticks[["exchange", "token"]]))
+            self.__sharedQuotes = SharedQuoteTable(sharedQuotesName, max(capacity, 1), create=True)
+
+        if ipc_path is None:
+            ipc_path = os.path.join(tempfile.gettempdir(), "pyalgomate_ipc")
+        self.__ipc_path = ipc_path
+
+        self.__context = zmq.Context()
+        self.__socket = self.__context.socket(zmq.PUB)
+        self.__socket.setsockopt(zmq.SNDHWM, 0)
+        if os.name == "nt":
+            self.__socket.bind("tcp://127.0.0.1:*")
+            self.__ipc_path = self.__socket.getsockopt(zmq.LAST_ENDPOINT).decode()
+        else:
+            self.__socket.bind(f"ipc://{self.__ipc_path}")
+
+    def get_ipc_path(self):
+        return self.__ipc_path
+
+    def __len__(self):
+        return len(self.__ticks)
+
+    def getPublishedCount(self):
+        return self.__published
+
+    def getMaxDelay(self):
+        """Returns how far, in seconds, publishing fell behind the replay schedule."""
+        return self.__maxDelay
+
+    def __getTopics(self):
+        baseTopic = wire.BaseTopics[self.__wireFormat]
+        topics = dict()
+        for exchange, token in set(zip(self.__ticks["exchange"].tolist(), self.__ticks["token"].tolist())):
+            key = wire.getKey(exchange, token)
+            topics[(exchange, token)] = wire.getTopic(
+                baseTopic, wire.exchangeNames[exchange], self.__roots.get(key, "_"), token
+            )
+        return topics
+
+    def run(self, waitForSubscribers=1.0):
+        """Publishes all the ticks, or until stop() is called.
+
+        :param waitForSubscribers: Seconds to wait after binding so that subscribers connect first.
+        """
+        ticks = self.__ticks.copy()
+        if not len(ticks):
+            return
+
+        if self.__shiftTimes:
+            nowNs = time.time_ns()
+            ticks["receiveTime"] += nowNs - ticks["receiveTime"][0]
+            ticks["exchangeTime"] += nowNs // 10**9 - ticks["exchangeTime"][0]
+
+        topics = self.__getTopics()
+        time.sleep(waitForSubscribers)
+
+        offsets = (ticks["receiveTime"] - ticks["receiveTime"][0]) / 1e9
+        start = time.perf_counter()
+        for i, tick in enumerate(ticks.tolist()):
+            if self.__stopped:
+                break
+
+            if self.__speed:
+                delay = start + offsets[i] / self.__speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif -delay > self.__maxDelay:
+                    self.__maxDelay = -delay
+
+            topic = topics[(tick[0], tick[1])]
+            if self.__wireFormat == "binary":
+                payload = wire.TickStruct.pack(*tick)
+            elif self.__wireFormat == "shared":
+                payload = self.__sharedQuotes.encodeSlot(self.__sharedQuotes.write(tick))
+            else:
+                quote = wire.tickToQuote(tick)
+                quote["ct"] = datetime.datetime.fromtimestamp(tick[3] / 1e9)
+                symbol = self.__symbols.get(quote["e"] + "|" + quote["tk"], None)
+                if symbol is not None:
+                    quote["ts"] = symbol.split("|", 1)[1]
+                quote["pt"] = time.time_ns()
+                payload = pickle.dumps(quote)
+
+            self.__socket.send_multipart([topic, payload])
+            self.__published += 1
+
+        logger.info(
+            f"Published {self.__published} ticks in {time.perf_counter() - start:.2f}s, "
+            f"max delay {self.__maxDelay * 1000:.1f}ms"
+        )
+
+    def stop(self):
+        self.__stopped = True
+
+    def close(self):
+        self.__socket.close()
+        self.__context.term()
+        if self.__sharedQuotes is not None:
+            self.__sharedQuotes.close()
+
+
+if __name__ == "__main__":
+    import click
+
+    def parseTime(ctx, param, value):
+        if value is None:
+            return value
+        return datetime.datetime.strptime(value, "%H:%M:%S").time()
+
+    @click.command()
+    @click.option("--source", required=True, help="Tick log or parquet written by the recorder")
+    @click.option("--speed", default=1.0, type=click.FLOAT, help="Replay speed, 0 for as fast as possible")
+    @click.option("--ipc-path", default=None, help="IPC path to publish on")
+    @click.option("--wire-format", default="pickle", type=click.Choice(wire.WireFormats))
+    @click.option("--start-time", default=None, callback=parseTime, help="HH:MM:SS to start from")
+    @click.option("--end-time", default=None, callback=parseTime, help="HH:MM:SS to stop at")
+    def main(source, speed, ipc_path, wire_format, start_time, end_time):
+        logging.basicConfig(level=logging.INFO)
+        replayer = TickReplayer(source, ipc_path, speed, wire_format, startTime=start_time, endTime=end_time)
+        try:
+            replayer.run()
+        except KeyboardInterrupt:
+            replayer.stop()
+        finally:
+            replayer.close()
+
+    main()
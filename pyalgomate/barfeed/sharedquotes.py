@@ -0,0 +1,240 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Latest quote of every token in shared memory, written by the websocket client and read in place by
+the feeds of any number of strategy processes.
+
+Each token gets a fixed slot holding a :data:`pyalgomate.barfeed.wire.TickDtype` record guarded by a
+version counter, seqlock style. The writer makes the version odd, writes the record and makes it even
+again. Readers copy the record and retry when the version was odd or moved meanwhile, so they never
+block the writer and never see a torn record. Subscribers are only notified of the slot that changed,
+so the ingestion side does the same work however many processes read the table.
+"""
+
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from pyalgomate.barfeed import wire
+
+DefaultName = "pyalgomate_quotes"
+
+TableMagic = b"PYAMQUOT"
+TableVersion = 1
+# magic, version, capacity, count, id
+TableHeader = struct.Struct("<8sIIQQ")
+TableHeaderSize = 64
+CountOffset = 16
+
+# slot, table id
+SlotStruct = struct.Struct("<IQ")
+VersionStruct = struct.Struct("<Q")
+
+
+# Tables created by this process, their resource tracker registration must stay
+_createdNames = set()
+
+
+def _attach(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    sharedMemory = shared_memory.SharedMemory(name=name)
+    if name in _createdNames:
+        return sharedMemory
+    # Otherwise the resource tracker of a reader unlinks the table when the reader exits. Readers are
+    # separate processes, a multiprocessing child would share and confuse the writer's tracker.
+    resource_tracker.unregister(sharedMemory._name, "shared_memory")
+    return sharedMemory
+
+
+class SharedQuoteTable:
+    """Fixed size table of the latest tick per token in shared memory.
+
+    There must be a single writer, the process that created the table. Slots are assigned in the
+    order tokens are first written and never move, readers learn about new ones from the count in
+    the header.
+
+    :param name: The name of the shared memory block.
+    :param capacity: The number of slots. Only needed to create the table.
+    :param create: True to create the table, replacing a stale one, False to attach to it.
+    """
+
+    def __init__(self, name=DefaultName, capacity=None, create=False):
+        self.__name = name
+        self.__create = create
+        self.__slots = dict()
+
+        if create:
+            assert capacity, "Missing capacity"
+            size = TableHeaderSize + capacity * (8 + wire.TickDtype.itemsize)
+            try:
+                self.__sharedMemory = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # Left behind by a writer that did not exit cleanly
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+                self.__sharedMemory = shared_memory.SharedMemory(name=name, create=True, size=size)
+            _createdNames.add(name)
+            self.__id = time.time_ns()
+            self.__sharedMemory.buf[: TableHeader.size] = TableHeader.pack(
+                TableMagic, TableVersion, capacity, 0, self.__id
+            )
+        else:
+            self.__sharedMemory = _attach(name)
+            magic, version, capacity, _, self.__id = TableHeader.unpack_from(self.__sharedMemory.buf)
+            if magic != TableMagic or version != TableVersion:
+                self.__sharedMemory.close()
+                raise Exception(f"{name} is not a shared quote table")
+
+        self.__capacity = capacity
+        self.__ticksOffset = TableHeaderSize + capacity * VersionStruct.size
+        self.__buffer = self.__sharedMemory.buf
+        self.__count = np.ndarray((1,), dtype="<u8", buffer=self.__buffer, offset=CountOffset)
+        self.__versions = np.ndarray(
+            (capacity,), dtype="<u8", buffer=self.__buffer, offset=TableHeaderSize
+        )
+        self.__ticks = np.ndarray(
+            (capacity,), dtype=wire.TickDtype, buffer=self.__buffer, offset=self.__ticksOffset
+        )
+
+    def getName(self):
+        return self.__name
+
+    def getCapacity(self):
+        return self.__capacity
+
+    def getId(self):
+        """Identifies this incarnation of the table, a restarted writer creates a new one."""
+        return self.__id
+
+    def __len__(self):
+        return int(self.__count[0])
+
+    def __refresh(self):
+        count = int(self.__count[0])
+        for slot in range(len(self.__slots), count):
+            tick = self.__ticks[slot]
+            self.__slots[wire.getKey(int(tick["exchange"]), int(tick["token"]))] = slot
+
+    def getSlot(self, key):
+        """Returns the slot of an exchange|token key, or None if it was never written."""
+        slot = self.__slots.get(key, None)
+        if slot is None:
+            self.__refresh()
+            slot = self.__slots.get(key, None)
+        return slot
+
+    def __addSlot(self, key, tick):
+        slot = int(self.__count[0])
+        if slot == self.__capacity:
+            raise Exception(f"Shared quote table {self.__name} is full ({self.__capacity} slots)")
+        self.__ticks[slot] = tick
+        # Publish the slot only once its key is in place
+        self.__count[0] = slot + 1
+        self.__slots[key] = slot
+        return slot
+
+    def write(self, tick: tuple) -> int:
+        """Writes a tick, a tuple in TickDtype field order, to the slot of its token.
+
+        :returns: The slot.
+        """
+        key = wire.getKey(tick[0], tick[1])
+        slot = self.__slots.get(key, None)
+        if slot is None:
+            slot = self.__addSlot(key, tick)
+        # struct on the raw buffer is several times faster than numpy for single records
+        versionOffset = TableHeaderSize + slot * VersionStruct.size
+        version = VersionStruct.unpack_from(self.__buffer, versionOffset)[0]
+        VersionStruct.pack_into(self.__buffer, versionOffset, version + 1)
+        wire.TickStruct.pack_into(
+            self.__buffer, self.__ticksOffset + slot * wire.TickStruct.size, *tick
+        )
+        VersionStruct.pack_into(self.__buffer, versionOffset, version + 2)
+        return slot
+
+    def update(self, quote: dict, receiveTime: int = None) -> int:
+        """Writes a merged quote dict, see :func:`pyalgomate.barfeed.wire.quoteToTick`.
+
+        :returns: The slot.
+        """
+        return self.write(wire.quoteToTick(quote, receiveTime))
+
+    def encodeSlot(self, slot) -> bytes:
+        """Returns the notification message for a slot."""
+        return SlotStruct.pack(slot, self.__id)
+
+    def read(self, slot) -> tuple:
+        """Returns a consistent copy of the tick in a slot as a tuple in TickDtype field order."""
+        buffer = self.__buffer
+        versionOffset = TableHeaderSize + slot * VersionStruct.size
+        tickOffset = self.__ticksOffset + slot * wire.TickStruct.size
+        while True:
+            version = VersionStruct.unpack_from(buffer, versionOffset)[0]
+            if version & 1:
+                continue
+            tick = wire.TickStruct.unpack_from(buffer, tickOffset)
+            if VersionStruct.unpack_from(buffer, versionOffset)[0] == version:
+                return tick
+
+    def readMany(self, slots) -> np.ndarray:
+        """Returns a consistent copy of the ticks in the given slots as a structured array."""
+        slots = np.asarray(slots, dtype=np.intp)
+        ticks = np.empty(len(slots), dtype=wire.TickDtype)
+        pending = np.arange(len(slots))
+        while len(pending):
+            versions = self.__versions[slots[pending]]
+            ticks[pending] = self.__ticks[slots[pending]]
+            consistent = (versions & 1 == 0) & (self.__versions[slots[pending]] == versions)
+            pending = pending[~consistent]
+        return ticks
+
+    def get(self, key):
+        """Returns the latest tick of an exchange|token key, or None if it was never written."""
+        slot = self.getSlot(key)
+        return self.read(slot) if slot is not None else None
+
+    def snapshot(self) -> np.ndarray:
+        """Returns a consistent copy of every written slot."""
+        return self.readMany(range(len(self)))
+
+    def close(self):
+        # The views must go before the memory can be released
+        self.__count = self.__versions = self.__ticks = self.__buffer = None
+        self.__sharedMemory.close()
+        if self.__create:
+            self.__sharedMemory.unlink()
+            _createdNames.discard(self.__name)
+
+
+class SlotReader:
+    """Resolves slot notifications to ticks on the subscriber side.
+
+    Attaches to the table on the first notification, so subscribers may start before the writer,
+    and again whenever a notification comes from a table the writer recreated.
+    """
+
+    def __init__(self, name=DefaultName):
+        self.__name = name
+        self.__table = None
+
+    def getTable(self) -> SharedQuoteTable:
+        return self.__table
+
+    def read(self, message) -> tuple:
+        """Returns the tick, a tuple in TickDtype field order, of the slot in a notification."""
+        slot, tableId = SlotStruct.unpack(message)
+        if self.__table is None or self.__table.getId() != tableId:
+            self.close()
+            self.__table = SharedQuoteTable(self.__name)
+        return self.__table.read(slot)
+
+    def close(self):
+        if self.__table is not None:
+            self.__table.close()
+            self.__table = None
@@ -0,0 +1,176 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Fixed layout binary tick messages and topics for the quote publisher/subscriber channel.
+
+A tick carries the already parsed, merged state of one instrument so subscribers neither unpickle
+nor convert strings to floats. Several ticks may be packed back to back in one frame and a frame
+can be decoded without copying with :func:`decodeTicks`.
+"""
+
+import datetime
+import re
+import struct
+import time
+
+import numpy as np
+
+TickTopic = b"FEED_TICK"
+QuoteTopic = b"FEED_UPDATE"
+# Only carries the slot of the token in the shared quote table, see pyalgomate.barfeed.sharedquotes
+SlotTopic = b"FEED_SLOT"
+# Instruments added to or removed from the websocket subscriptions, as JSON
+SubscriptionTopic = b"SUBSCRIPTIONS"
+# Closed candles of an interval, see pyalgomate.barfeed.candles
+CandleTopic = b"CANDLE"
+TopicSeparator = "/"
+
+WireFormats = ("pickle", "binary", "shared")
+BaseTopics = {"pickle": QuoteTopic, "binary": TickTopic, "shared": SlotTopic}
+
+TickDtype = np.dtype(
+    [
+        ("exchange", "u1"),
+        ("token", "<u4"),
+        ("exchangeTime", "<i8"),
+        ("receiveTime", "<i8"),
+        ("ltp", "<f8"),
+        ("volume", "<f8"),
+        ("oi", "<f8"),
+        ("bidPrice", "<f8"),
+        ("bidQty", "<f8"),
+        ("askPrice", "<f8"),
+        ("askQty", "<f8"),
+    ]
+)
+
+TickStruct = struct.Struct("<BIqqddddddd")
+
+assert TickStruct.size == TickDtype.itemsize
+
+exchangeCodes = {"NSE": 1, "NFO": 2, "BSE": 3, "BFO": 4, "CDS": 5, "MCX": 6}
+exchangeNames = {code: name for name, code in exchangeCodes.items()}
+
+
+def getTopic(baseTopic: bytes, exchange: str = None, root: str = None, token: str = None) -> bytes:
+    """Builds a hierarchical topic such as b"FEED_UPDATE/NFO/BANKNIFTY/43184/".
+
+    ZMQ subscriptions match on prefixes, so leaving out the trailing parts gives the topic to
+    subscribe to a whole root or exchange. Every level ends with the separator so that a root or
+    token never matches another one it is a prefix of, e.g. NIFTY and NIFTYNXT50.
+    """
+    parts = [baseTopic.decode()]
+    for part in (exchange, root, token):
+        if part is None:
+            break
+        parts.append(str(part))
+    return (TopicSeparator.join(parts) + TopicSeparator).encode()
+
+
+def getDefaultTopicRoot(instrument: str) -> str:
+    """Returns the leading letters of the symbol, e.g. BANKNIFTY for NFO|BANKNIFTY24OCT50000CE or
+    NFO:BANKNIFTY24O1650000CE. Brokers with better knowledge of their symbols provide their own."""
+    m = re.match(r"[A-Z&]+", re.split(r"[|:]", instrument)[-1])
+    return m.group(0) if m is not None else "_"
+
+
+def isTickTopic(topic: bytes) -> bool:
+    return topic.startswith(TickTopic)
+
+
+def isSlotTopic(topic: bytes) -> bool:
+    return topic.startswith(SlotTopic)
+
+
+def isCandleTopic(topic: bytes) -> bool:
+    return topic.startswith(CandleTopic)
+
+
+def getHoldingsEndpoint(ipc_path: str) -> str:
+    """Returns the endpoint the feeds send the instruments held by their strategies to, next to the
+    endpoint of the quotes. ipc_path is an IPC path or, on Windows, a tcp endpoint."""
+    if ipc_path.startswith("tcp://"):
+        host, port = ipc_path.rsplit(":", 1)
+        return f"{host}:{int(port) + 1}"
+    return f"ipc://{ipc_path}_holdings"
+
+
+def _toFloat(value):
+    return float(value) if value not in (None, "") else 0.0
+
+
+def quoteToTick(quote: dict, receiveTime: int = None) -> tuple:
+    """Converts a merged finvasia style quote dict into a tuple in TickDtype field order.
+
+    :param quote: A dict with the e, tk, ft, lp, v, oi, bp1, bq1, sp1 and sq1 keys. ft may be an
+        epoch or a datetime.
+    :param receiveTime: The receive time in nanoseconds since the epoch. Defaults to now.
+    """
+    exchangeTime = quote.get("ft", 0)
+    if isinstance(exchangeTime, datetime.datetime):
+        exchangeTime = exchangeTime.timestamp()
+
+    return (
+        exchangeCodes[quote["e"]],
+        int(quote["tk"]),
+        int(exchangeTime or 0),
+        time.time_ns() if receiveTime is None else receiveTime,
+        _toFloat(quote.get("lp")),
+        _toFloat(quote.get("v")),
+        _toFloat(quote.get("oi")),
+        _toFloat(quote.get("bp1")),
+        _toFloat(quote.get("bq1")),
+        _toFloat(quote.get("sp1")),
+        _toFloat(quote.get("sq1")),
+    )
+
+
+def encodeTick(quote: dict, receiveTime: int = None) -> bytes:
+    """Encodes a merged finvasia style quote dict into a binary tick, see :func:`quoteToTick`."""
+    return TickStruct.pack(*quoteToTick(quote, receiveTime))
+
+
+def encodeTicks(quotes) -> bytes:
+    """Packs several quotes into a single frame."""
+    return b"".join(encodeTick(quote) for quote in quotes)
+
+
+def decodeTicks(buffer) -> np.ndarray:
+    """Returns a read only structured array view over the ticks in the buffer.
+
+    The buffer may be bytes, a memoryview or the ``buffer`` of a :class:`zmq.Frame` received with
+    ``copy=False``, in which case no copy is made.
+    """
+    return np.frombuffer(buffer, dtype=TickDtype)
+
+
+def iterTicks(buffer):
+    """Yields each tick in the buffer as a plain tuple in TickDtype field order.
+
+    This is cheaper than :func:`decodeTicks` for the common case of a frame holding a single tick.
+    """
+    return TickStruct.iter_unpack(buffer)
+
+
+def getKey(exchange: int, token: int) -> str:
+    return f"{exchangeNames[exchange]}|{token}"
+
+
+def tickToQuote(tick: tuple) -> dict:
+    """Converts one tick, as returned by ``decodeTicks(buffer).tolist()``, into the quote dict
+    the feeds work with."""
+    (exchange, token, exchangeTime, receiveTime, ltp, volume, oi, bidPrice, bidQty, askPrice,
+     askQty) = tick
+    return {
+        "e": exchangeNames[exchange],
+        "tk": str(token),
+        "ft": datetime.datetime.fromtimestamp(exchangeTime),
+        "ct": receiveTime,
+        "lp": ltp,
+        "v": volume,
+        "oi": oi,
+        "bp1": bidPrice,
+        "bq1": bidQty,
+        "sp1": askPrice,
+        "sq1": askQty,
+    }
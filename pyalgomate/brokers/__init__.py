@@ -7,14 +7,16 @@ import datetime
 import re
 import pandas as pd
 import logging
+from functools import lru_cache
 from typing import List
 
 from pyalgotrade import broker
-from pyalgotrade.broker import fillstrategy
 from pyalgomate.core import backtesting
+from pyalgomate.core.fillstrategy import BidAskFillStrategy
 from pyalgomate.utils import UnderlyingIndex
 import pyalgomate.utils as utils
 from pyalgomate.backtesting.DataFrameFeed import DataFrameFeed
+from pyalgomate.brokers.symboltable import SymbolTable
 
 from pyalgomate.strategies import OptionContract
 
@@ -77,6 +79,67 @@ def getOptionSymbol(underlyingInstrument, expiry, strikePrice, callOrPut):
     return f'{underlyingInstrument}{expiry.strftime("%d%b%y").upper()}{callOrPut.upper()}{strikePrice}'
 
 
+optionSymbolPatterns = (
+    re.compile(r"([A-Z\|]+)(\d{2})([A-Z]{3})(\d{2})([CP])(\d+)"),
+    re.compile(r"([A-Z]+)(\d+)(CE|PE)"),
+    re.compile(r"([A-Z]+)(\d{2})([A-Z]{3})(\d+)(CE|PE)"),
+)
+
+monthAbbreviations = {
+    month.upper(): index
+    for index, month in enumerate(
+        ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
+        start=1,
+    )
+}
+
+
+def parseOptionContract(symbol):
+    m = optionSymbolPatterns[0].match(symbol)
+
+    if m is not None:
+        day = int(m.group(2))
+        month = monthAbbreviations.get(m.group(3), None)
+        if month is None:
+            raise ValueError(f"Invalid month <{m.group(3)}> in symbol <{symbol}>")
+        year = int(m.group(4)) + 2000
+        expiry = datetime.date(year, month, day)
+        return OptionContract(
+            symbol,
+            int(m.group(6)),
+            expiry,
+            "c" if m.group(5) == "C" else "p",
+            m.group(1),
+        )
+
+    m = optionSymbolPatterns[1].match(symbol)
+
+    if m is None:
+        m = optionSymbolPatterns[2].match(symbol)
+        if m is None:
+            return None
+        return OptionContract(
+            symbol,
+            int(m.group(4)),
+            None,
+            "c" if m.group(5) == "CE" else "p",
+            m.group(1),
+        )
+
+    return OptionContract(
+        symbol,
+        int(m.group(2)),
+        None,
+        "c" if m.group(3) == "CE" else "p",
+        m.group(1),
+    )
+
+
+@lru_cache(maxsize=None)
+def getSymbolTable() -> SymbolTable:
+    return SymbolTable(parseOptionContract)
+
+
 class QuantityTraits(broker.InstrumentTraits):
     def roundQuantity(self, quantity):
         return round(quantity, 2)
@@ -120,44 +183,7 @@ class BacktestingBroker(backtesting.Broker):
         )
 
     def getOptionContract(self, symbol):
-        m = re.match(r"([A-Z\|]+)(\d{2})([A-Z]{3})(\d{2})([CP])(\d+)", symbol)
-
-        if m is not None:
-            day = int(m.group(2))
-            month = m.group(3)
-            year = int(m.group(4)) + 2000
-            expiry = datetime.date(
-                year, datetime.datetime.strptime(month, "%b").month, day
-            )
-            return OptionContract(
-                symbol,
-                int(m.group(6)),
-                expiry,
-                "c" if m.group(5) == "C" else "p",
-                m.group(1),
-            )
-
-        m = re.match(r"([A-Z]+)(\d+)(CE|PE)", symbol)
-
-        if m is None:
-            m = re.match(r"([A-Z]+)(\d{2})([A-Z]{3})(\d+)(CE|PE)", symbol)
-            if m is None:
-                return None
-            return OptionContract(
-                symbol,
-                int(m.group(4)),
-                None,
-                "c" if m.group(5) == "CE" else "p",
-                m.group(1),
-            )
-
-        return OptionContract(
-            symbol,
-            int(m.group(2)),
-            None,
-            "c" if m.group(3) == "CE" else "p",
-            m.group(1),
-        )
+        return getSymbolTable().get(symbol)
 
     def getHistoricalData(
         self, exchangeSymbol: str, startTime: datetime.datetime, interval: str
@@ -177,7 +203,11 @@ class BacktestingBroker(backtesting.Broker):
     def __init__(self, cash, barFeed, fee=0.0025):
         commission = backtesting.TradePercentage(fee)
         super(BacktestingBroker, self).__init__(cash, barFeed, commission)
-        self.setFillStrategy(fillstrategy.DefaultStrategy(volumeLimit=None))
+        # Fills at the bid/ask when the data has Bid and Ask columns, like the default otherwise
+        self.setFillStrategy(BidAskFillStrategy(volumeLimit=None))
+
+        if isinstance(barFeed, DataFrameFeed):
+            getSymbolTable().build(barFeed.getTickers())
 
     def getInstrumentTraits(self, instrument):
         return QuantityTraits()
@@ -262,11 +292,29 @@ def getFeed(
     elif broker == "Finvasia":
         import pyalgomate.brokers.finvasia as finvasia
 
-        return finvasia.getFeed(creds[broker], registerOptions, underlyings)
+        return finvasia.getFeed(
+            creds[broker],
+            registerOptions,
+            underlyings,
+            candleIntervals=config.get("CandleIntervals", ()),
+            # The websocket client moves the strikes around the ATM when StrikeCount is set
+            followSubscriptions=config.get("StrikeCount", None) is not None,
+            # Read by the websocket client too, both ends have to agree
+            wireFormat=config.get("WireFormat", "pickle"),
+            # Only the instruments that ticked are in the Bars, for strategies that do not expect all of them
+            incrementalBars=config.get("IncrementalBars", False),
+        )
     elif broker == "Zerodha":
         import pyalgomate.brokers.zerodha as zerodha
 
-        return zerodha.getFeed(creds[broker], registerOptions, underlyings)
+        return zerodha.getFeed(
+            creds[broker],
+            registerOptions,
+            underlyings,
+            candleIntervals=config.get("CandleIntervals", ()),
+            wireFormat=config.get("WireFormat", "pickle"),
+            incrementalBars=config.get("IncrementalBars", False),
+        )
     elif broker == "Kotak":
         from neo_api_client import NeoAPI
         import pyalgomate.brokers.kotak as kotak
@@ -334,7 +382,13 @@ def getFeed(
             optionSymbols = list(dict.fromkeys(optionSymbols))
             tokenMappings += getTokenMappings(api, underlying, optionSymbols)
 
-        barFeed = LiveTradeFeed(api, tokenMappings)
+        barFeed = LiveTradeFeed(
+            api,
+            tokenMappings,
+            wireFormat=config.get("WireFormat", "pickle"),
+            incrementalBars=config.get("IncrementalBars", False),
+            candleIntervals=config.get("CandleIntervals", ()),
+        )
 
     return barFeed, api
 
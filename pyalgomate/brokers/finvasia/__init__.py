@@ -17,7 +17,9 @@ import requests
 from NorenRestApiPy.NorenApi import NorenApi as ShoonyaApi
 
 import pyalgomate.utils as utils
+from pyalgomate.barfeed import wire
 from pyalgomate.brokers import getDefaultUnderlyings, getExpiryDates
+from pyalgomate.brokers.symboltable import SymbolTable
 from pyalgomate.utils import UnderlyingIndex
 
 logger = logging.getLogger()
@@ -198,6 +200,7 @@ def getApiAndTokenMappings(cred, registerOptions, underlyings):
         optionSymbols = list(dict.fromkeys(optionSymbols))
 
         instruments = underlyings + futureSymbols + optionSymbols
+        getSymbolTable().build(instruments)
 
         filteredTokenMappings = {
             tokenMappings[instrument]: instrument for instrument in instruments if instrument in tokenMappings}
@@ -206,35 +209,50 @@ def getApiAndTokenMappings(cred, registerOptions, underlyings):
     else:
         exit(1)
 
-def getFeed(cred, registerOptions, underlyings):
+def getFeed(cred, registerOptions, underlyings, candleIntervals=(), followSubscriptions=False, wireFormat="pickle",
+            incrementalBars=False):
     from .feed import LiveTradeFeed
 
     logger.info('Creating feed object')
     api, tokenMappings = getApiAndTokenMappings(
         cred, registerOptions, underlyings)
-    return LiveTradeFeed(api, getTokenMappings(), tokenMappings.values()), api
+    return LiveTradeFeed(api, getTokenMappings(), tokenMappings.values(), candleIntervals=candleIntervals,
+                         followSubscriptions=followSubscriptions, wireFormat=wireFormat,
+                         incrementalBars=incrementalBars), api
 
-@lru_cache
-def getOptionContract(symbol):
+optionSymbolPatterns = (
+    re.compile(r"([A-Z\|]+)(\d{2})([A-Z]{3})(\d{2})([CP])(\d+)"),
+    re.compile(r"([A-Z\|]+)(\d{2})([A-Z]{3})(\d+)([CP])E"),
+    re.compile(r"([A-Z\|]+)(\d{2})(\d|[OND])(\d{2})(\d+)([CP])E"),
+)
+
+
+def getUnderlyingForOptionPrefix(optionPrefix):
+    for underlying, underlyingDetails in underlyingMapping.items():
+        if underlyingDetails['optionPrefix'] == optionPrefix:
+            return underlying
+    return None
+
+
+def parseOptionContract(symbol):
     from .broker import OptionContract
 
-    m = re.match(r"([A-Z\|]+)(\d{2})([A-Z]{3})(\d{2})([CP])(\d+)", symbol)
+    m = optionSymbolPatterns[0].match(symbol)
 
     if m is None:
-        m = re.match(r"([A-Z\|]+)(\d{2})([A-Z]{3})(\d+)([CP])E", symbol)
+        m = optionSymbolPatterns[1].match(symbol)
 
         if m is not None:
-            optionPrefix = m.group(1)
-            for underlying, underlyingDetails in underlyingMapping.items():
-                if underlyingDetails['optionPrefix'] == optionPrefix:
-                    index = underlyingDetails['index']
-                    month = datetime.datetime.strptime(m.group(3), '%b').month
-                    year = int(m.group(2)) + 2000
-                    expiry = utils.getNearestMonthlyExpiryDate(
-                        datetime.date(year, month, 1), index)
-                    return OptionContract(symbol, int(m.group(4)), expiry, "c" if m.group(5) == "C" else "p", underlying)
-
-        m = re.match(r"([A-Z\|]+)(\d{2})(\d|[OND])(\d{2})(\d+)([CP])E", symbol)
+            underlying = getUnderlyingForOptionPrefix(m.group(1))
+            if underlying is not None:
+                index = underlyingMapping[underlying]['index']
+                month = datetime.datetime.strptime(m.group(3), '%b').month
+                year = int(m.group(2)) + 2000
+                expiry = utils.getNearestMonthlyExpiryDate(
+                    datetime.date(year, month, 1), index)
+                return OptionContract(symbol, int(m.group(4)), expiry, "c" if m.group(5) == "C" else "p", underlying)
+
+        m = optionSymbolPatterns[2].match(symbol)
 
         if m is None:
             return None
@@ -252,10 +270,10 @@ def getOptionContract(symbol):
 
         year = int(m.group(2)) + 2000
         expiry = datetime.date(year, month, day)
-        optionPrefix = m.group(1)
-        for underlying, underlyingDetails in underlyingMapping.items():
-            if underlyingDetails['optionPrefix'] == optionPrefix:
-                return OptionContract(symbol, int(m.group(5)), expiry, "c" if m.group(6) == "C" else "p", underlying)
+        underlying = getUnderlyingForOptionPrefix(m.group(1))
+        if underlying is not None:
+            return OptionContract(symbol, int(m.group(5)), expiry, "c" if m.group(6) == "C" else "p", underlying)
+        return None
 
     day = int(m.group(2))
     month = m.group(3)
@@ -263,11 +281,32 @@ def getOptionContract(symbol):
     expiry = datetime.date(
         year, datetime.datetime.strptime(month, '%b').month, day)
 
-    optionPrefix = m.group(1)
+    underlying = getUnderlyingForOptionPrefix(m.group(1))
+    if underlying is not None:
+        return OptionContract(symbol, int(m.group(6)), expiry, "c" if m.group(5) == "C" else "p", underlying)
+    return None
 
-    for underlying, underlyingDetails in underlyingMapping.items():
-        if underlyingDetails['optionPrefix'] == optionPrefix:
-            return OptionContract(symbol, int(m.group(6)), expiry, "c" if m.group(5) == "C" else "p", underlying)
+
+@lru_cache(maxsize=None)
+def getSymbolTable() -> SymbolTable:
+    return SymbolTable(parseOptionContract)
+
+
+def getOptionContract(symbol):
+    return getSymbolTable().get(symbol)
+
+
+def getTopicRoot(instrument):
+    """Returns the root under which the quotes of an instrument are published, e.g. BANKNIFTY for
+    NSE|NIFTY BANK and for all the BANKNIFTY futures and options."""
+    if instrument in underlyingMapping:
+        return underlyingMapping[instrument]['optionPrefix'].split('|')[1]
+
+    optionContract = getOptionContract(instrument)
+    if optionContract is not None and optionContract.underlying in underlyingMapping:
+        return underlyingMapping[optionContract.underlying]['optionPrefix'].split('|')[1]
+
+    return wire.getDefaultTopicRoot(instrument)
 
 
 def getFutureSymbol(underlyingIndex: UnderlyingIndex, expiry: datetime.date):
@@ -26,6 +26,7 @@ from pyalgomate.brokers import BacktestingBroker, QuantityTraits
 from pyalgomate.core import broker
 from pyalgomate.core.broker import Order
 from pyalgomate.core.dispatcher import LiveAsyncDispatcher
+from pyalgomate.core.fillstrategy import BidAskFillStrategy
 from pyalgomate.strategies import OptionContract
 from pyalgomate.utils import UnderlyingIndex
 from pyalgomate.brokers.finvasia import getFutureSymbol
@@ -186,6 +187,7 @@ class PaperTradingBroker(BacktestingBroker):
 
     def __init__(self, cash, barFeed, fee=0.0025):
         super().__init__(cash, barFeed, fee)
+        self.setFillStrategy(BidAskFillStrategy(barFeed))
 
         self.__api = barFeed.getApi()
         self.loop = LiveAsyncDispatcher().loop
@@ -0,0 +1,208 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Keeps a band of strikes around the ATM of each underlying subscribed on the websocket.
+"""
+
+import logging
+import threading
+
+import pyalgomate.brokers.finvasia as finvasia
+
+logger = logging.getLogger(__name__)
+
+
+class StrikeSubscriptionManager:
+    """Follows the underlyings on a :class:`pyalgomate.brokers.finvasia.wsclient.WebSocketClient`
+    and subscribes to the calls and puts of strikeCount strikes either side of the ATM.
+
+    The band is moved once the ATM drifts rebalanceStrikes strikes away from its centre, so an
+    underlying oscillating around a strike does not churn subscriptions. Strikes leaving the band
+    are unsubscribed unless pinned. The instruments the strategies hold positions or orders in are
+    pinned by their feeds, see :meth:`pyalgomate.barfeed.livefeed.LiveQuoteFeed.setHeldInstruments`,
+    and subscribed again if they already left the band. Feeds created with followSubscriptions pick
+    up the changes.
+
+    :param wsClient: The websocket client publishing the quotes.
+    :param underlyings: The underlyings to follow, e.g. NSE|NIFTY BANK.
+    :param expiries: The expiries to keep subscribed per underlying. Defaults to the expiries of the
+        options of each underlying the websocket client is subscribed to when the manager is created.
+    :param strikeCount: The number of strikes either side of the ATM.
+    :param rebalanceStrikes: How many strikes the ATM may drift before the band is moved.
+    :param tokenMappings: Instruments mapped to their tokens. Defaults to the scrip master.
+    :param symbolTable: The option contracts of the instruments. Defaults to the Finvasia one.
+    """
+
+    def __init__(
+        self,
+        wsClient,
+        underlyings,
+        expiries: dict = None,
+        strikeCount=10,
+        rebalanceStrikes=2,
+        tokenMappings: dict = None,
+        symbolTable=None,
+    ):
+        self.__wsClient = wsClient
+        self.__strikeCount = strikeCount
+        self.__rebalanceStrikes = rebalanceStrikes
+        self.__tokenMappings = (
+            tokenMappings if tokenMappings is not None else finvasia.getTokenMappings()
+        )
+        self.__symbolTable = symbolTable if symbolTable is not None else finvasia.getSymbolTable()
+        self.__lock = threading.Lock()
+        self.__pinned = set()
+        # The instruments held by the strategies of each feed
+        self.__holdings = dict()
+        self.__centres = dict()
+        self.__subscribed = {underlying: set() for underlying in underlyings}
+        self.__subscribeCount = 0
+        self.__unsubscribeCount = 0
+
+        self.__underlyingTokens = {
+            self.__tokenMappings[underlying]: underlying
+            for underlying in underlyings
+            if underlying in self.__tokenMappings
+        }
+        if len(self.__underlyingTokens) != len(underlyings):
+            raise Exception(
+                f"Could not get tokens for the underlyings {[underlying for underlying in underlyings if underlying not in self.__tokenMappings]}"
+            )
+
+        # Take over the options subscribed at startup, the first rebalance trims them to the band
+        self.__expiries = {underlying: set() for underlying in underlyings}
+        for instrument in wsClient.getTokenMappings().values():
+            optionContract = self.__symbolTable.get(instrument)
+            if optionContract is None or optionContract.underlying not in self.__subscribed:
+                continue
+            self.__subscribed[optionContract.underlying].add(instrument)
+            self.__expiries[optionContract.underlying].add(optionContract.expiry)
+        if expiries is not None:
+            for underlying, underlyingExpiries in expiries.items():
+                self.__expiries[underlying] = set(underlyingExpiries)
+
+        wsClient.addQuoteHandler(self.onQuote)
+        wsClient.addHoldingsHandler(self.onHoldings)
+
+    def pin(self, instrument):
+        """Keeps an instrument subscribed even when it leaves the band."""
+        with self.__lock:
+            self.__pinned.add(instrument)
+        self.__subscribeHeld([instrument])
+
+    def unpin(self, instrument):
+        """Lets an instrument be unsubscribed again at the next rebalance if it is out of the band."""
+        with self.__lock:
+            self.__pinned.discard(instrument)
+
+    def onHoldings(self, feed, instruments):
+        """Pins the instruments held by the strategies of a feed instead of the ones it held before."""
+        with self.__lock:
+            if len(instruments):
+                self.__holdings[feed] = set(instruments)
+            else:
+                self.__holdings.pop(feed, None)
+        self.__subscribeHeld(instruments)
+
+    def getPinned(self):
+        with self.__lock:
+            return self.__getPinned()
+
+    def __getPinned(self):
+        return self.__pinned.union(*self.__holdings.values())
+
+    def __subscribeHeld(self, instruments):
+        # Held instruments unsubscribed before they were pinned
+        subscribed = set(self.__wsClient.getTokenMappings().values())
+        missing = [
+            instrument
+            for instrument in instruments
+            if instrument not in subscribed and instrument in self.__tokenMappings
+        ]
+        if not len(missing):
+            return
+
+        with self.__lock:
+            for instrument in missing:
+                optionContract = self.__symbolTable.get(instrument)
+                if optionContract is not None and optionContract.underlying in self.__subscribed:
+                    self.__subscribed[optionContract.underlying].add(instrument)
+
+        logger.info(f"Subscribing to the held instruments {', '.join(missing)}")
+        self.__wsClient.subscribe({self.__tokenMappings[instrument]: instrument for instrument in missing})
+        self.__subscribeCount += len(missing)
+
+    def getAtm(self, underlying):
+        return self.__centres.get(underlying, None)
+
+    def getBand(self, underlying, atm):
+        """Returns the option instruments of the band around an ATM strike."""
+        from .broker import getOptionSymbol  # Lazy import
+
+        strikeDifference = finvasia.underlyingMapping[underlying]["strikeDifference"]
+        instruments = []
+        for expiry in sorted(self.__expiries[underlying]):
+            for n in range(-self.__strikeCount, self.__strikeCount + 1):
+                strike = atm + n * strikeDifference
+                for callOrPut in ("C", "P"):
+                    instrument = getOptionSymbol(underlying, expiry, strike, callOrPut)
+                    if instrument in self.__tokenMappings:
+                        instruments.append(instrument)
+        return instruments
+
+    def onQuote(self, token, quote):
+        underlying = self.__underlyingTokens.get(token, None)
+        if underlying is None:
+            return
+
+        ltp = float(quote.get("lp", 0) or 0)
+        if ltp <= 0:
+            return
+
+        strikeDifference = finvasia.underlyingMapping[underlying]["strikeDifference"]
+        atm = int(round(ltp / strikeDifference)) * strikeDifference
+        centre = self.__centres.get(underlying, None)
+        if centre is not None and abs(atm - centre) < self.__rebalanceStrikes * strikeDifference:
+            return
+
+        self.rebalance(underlying, atm)
+
+    def rebalance(self, underlying, atm):
+        """Subscribes to the band around atm and unsubscribes from the strikes that left it."""
+        band = set(self.getBand(underlying, atm))
+        with self.__lock:
+            subscribed = self.__subscribed[underlying]
+            toSubscribe = band - subscribed
+            toUnsubscribe = subscribed - band - self.__getPinned()
+            self.__subscribed[underlying] = (subscribed | toSubscribe) - toUnsubscribe
+            self.__centres[underlying] = atm
+
+        logger.info(
+            f"{underlying} ATM is {atm}. Subscribing to {len(toSubscribe)} and unsubscribing from "
+            f"{len(toUnsubscribe)} options"
+        )
+        if len(toSubscribe):
+            self.__symbolTable.build(toSubscribe)
+            self.__wsClient.subscribe(
+                {self.__tokenMappings[instrument]: instrument for instrument in toSubscribe}
+            )
+            self.__subscribeCount += len(toSubscribe)
+        if len(toUnsubscribe):
+            self.__wsClient.unsubscribe(
+                [self.__tokenMappings[instrument] for instrument in toUnsubscribe]
+            )
+            self.__unsubscribeCount += len(toUnsubscribe)
+
+    def getSubscribed(self, underlying):
+        with self.__lock:
+            return set(self.__subscribed[underlying])
+
+    def getStats(self):
+        return {
+            "subscriptions": self.__wsClient.getSubscriptionCount(),
+            "messageRate": round(self.__wsClient.getMessageRate(), 1),
+            "atm": dict(self.__centres),
+            "options": {underlying: len(subscribed) for underlying, subscribed in self.__subscribed.items()},
+            "subscribed": self.__subscribeCount,
+            "unsubscribed": self.__unsubscribeCount,
+        }
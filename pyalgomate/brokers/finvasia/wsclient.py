@@ -4,7 +4,6 @@
 
 import os
 import sys
-import tempfile
 
 sys.path.append(
     os.path.join(
@@ -13,53 +12,55 @@ sys.path.append(
     )
 )
 
-import datetime
-import json
 import logging
-import pickle
 import threading
 import time
 
 import yaml
-import zmq
 from NorenRestApiPy.NorenApi import NorenApi
 
 import pyalgomate.brokers.finvasia as finvasia
+from pyalgomate.barfeed.latency import getLatencyTracker
+from pyalgomate.barfeed.publisher import QuotePublisher
+from pyalgomate.barfeed.sharedquotes import DefaultName
 
 logger = logging.getLogger(__name__)
 
 
 class WebSocketClient:
 
-    def __init__(self, api, tokenMappings, ipc_path=None):
+    def __init__(
+        self,
+        api,
+        tokenMappings,
+        ipc_path=None,
+        wireFormat="pickle",
+        metricsPort=None,
+        sharedQuotesName=DefaultName,
+        candleIntervals=None,
+    ):
         assert len(tokenMappings), "Missing subscriptions"
-        self.__quotes = dict()
-        self.__lastQuoteDateTime = None
-        self.__lastReceivedDateTime = None
         self.__api: NorenApi = api
-        self.__tokenMappings = tokenMappings
+        self.__tokenMappings = dict(tokenMappings)
+        self.__subscriptionLock = threading.Lock()
+        self.__quoteHandlers = []
+        self.__latencyTracker = getLatencyTracker()
+        if metricsPort is not None:
+            self.__latencyTracker.startServer(metricsPort)
         self.__pendingSubscriptions = list()
         self.__connected = False
         self.__connectionOpened = threading.Event()
 
-        # Set up ZeroMQ publisher using IPC
-        self.__context = zmq.Context()
-        self.__socket = self.__context.socket(zmq.PUB)
-
-        if ipc_path is None:
-            # Create a platform-independent IPC path
-            ipc_dir = tempfile.gettempdir()
-            ipc_file = "pyalgomate_ipc"
-            self.__ipc_path = os.path.join(ipc_dir, ipc_file)
-        else:
-            self.__ipc_path = ipc_path
-
-        # On Windows, we need to use tcp instead of ipc
-        if os.name == "nt":
-            self.__socket.bind("tcp://127.0.0.1:*")
-            self.__ipc_path = self.__socket.getsockopt(zmq.LAST_ENDPOINT).decode()
-        else:
-            self.__socket.bind(f"ipc://{self.__ipc_path}")
+        # Leave room in the shared quote table for the instruments subscribed later on
+        self.__publisher = QuotePublisher(
+            ipc_path,
+            wireFormat,
+            getTopicRoot=finvasia.getTopicRoot,
+            sharedQuotesName=sharedQuotesName,
+            sharedQuotesCapacity=max(2 * len(tokenMappings), 1024),
+            candleIntervals=candleIntervals,
+        )
+        self.__publisher.setInstruments(self.__tokenMappings)
 
         self.periodicThread = threading.Thread(target=self.periodicPrint)
         self.periodicThread.daemon = True
@@ -78,8 +79,7 @@ class WebSocketClient:
         try:
             if self.__connected:
                 self.__api.close_websocket()
-                self.__socket.close()
-                self.__context.term()
+                self.__publisher.close()
         except Exception as e:
             logger.error("Failed to close connection: %s" % e)
 
@@ -99,7 +99,7 @@ class WebSocketClient:
             if {
                 pendingSubscription
                 for pendingSubscription in self.__pendingSubscriptions
-            }.issubset(self.__quotes.keys()):
+            }.issubset(self.__publisher.getQuotes().keys()):
                 self.__pendingSubscriptions.clear()
                 return True
             time.sleep(1)
@@ -109,7 +109,8 @@ class WebSocketClient:
     def onOpened(self):
         logger.info("Websocket connected")
         self.__connected = True
-        self.__pendingSubscriptions = list(self.__tokenMappings.keys())
+        with self.__subscriptionLock:
+            self.__pendingSubscriptions = list(self.__tokenMappings.keys())
         for channel in self.__pendingSubscriptions:
             logger.info("Subscribing to channel %s." % channel)
             self.__api.subscribe(channel)
@@ -128,39 +129,95 @@ class WebSocketClient:
     def onUnknownEvent(self, event):
         logger.warning("Unknown event: %s." % event)
 
+    def getTokenMappings(self):
+        """Returns the subscribed tokens mapped to their instruments."""
+        with self.__subscriptionLock:
+            return dict(self.__tokenMappings)
+
+    def getSubscriptionCount(self):
+        return len(self.__tokenMappings)
+
+    def getMessageCount(self):
+        return self.__publisher.getMessageCount()
+
+    def getMessageRate(self):
+        """Returns the quotes received per second, measured over the last second or so."""
+        return self.__publisher.getMessageRate()
+
+    def addQuoteHandler(self, handler):
+        """Registers a callable invoked with the token and the merged quote on every quote."""
+        self.__quoteHandlers.append(handler)
+
+    def addHoldingsHandler(self, handler):
+        """Registers a callable invoked with a feed id and the instruments its strategies hold."""
+        self.__publisher.addHoldingsHandler(handler)
+
+    def subscribe(self, tokenMappings: dict):
+        """Subscribes to more tokens while running.
+
+        :param tokenMappings: The tokens, e.g. NFO|43184, mapped to their instruments.
+        """
+        with self.__subscriptionLock:
+            tokenMappings = {
+                token: instrument
+                for token, instrument in tokenMappings.items()
+                if token not in self.__tokenMappings
+            }
+            self.__tokenMappings.update(tokenMappings)
+        if not len(tokenMappings):
+            return
+
+        logger.info(f"Subscribing to {', '.join(tokenMappings.values())}")
+        self.__publisher.setInstruments(tokenMappings)
+        if self.__connected:
+            self.__api.subscribe(list(tokenMappings.keys()))
+        self.__publisher.publishSubscriptions(list(tokenMappings.values()), [])
+
+    def unsubscribe(self, tokens):
+        """Unsubscribes from tokens, e.g. NFO|43184, while running."""
+        with self.__subscriptionLock:
+            instruments = {
+                token: self.__tokenMappings.pop(token)
+                for token in tokens
+                if token in self.__tokenMappings
+            }
+        if not len(instruments):
+            return
+
+        logger.info(f"Unsubscribing from {', '.join(instruments.values())}")
+        if self.__connected:
+            self.__api.unsubscribe(list(instruments.keys()))
+        self.__publisher.removeInstruments(instruments.keys())
+        self.__publisher.publishSubscriptions([], list(instruments.values()))
+
     def onQuoteUpdate(self, message):
         key = message["e"] + "|" + message["tk"]
-        self.__lastReceivedDateTime = datetime.datetime.now()
-        message["ct"] = self.__lastReceivedDateTime
-        self.__lastQuoteDateTime = (
-            datetime.datetime.fromtimestamp(int(message["ft"]))
-            if "ft" in message
-            else self.__lastReceivedDateTime.replace(microsecond=0)
-        )
-        message["ft"] = self.__lastQuoteDateTime
-
-        if key in self.__quotes:
-            symbolInfo = self.__quotes[key]
-            symbolInfo.update(message)
-            self.__quotes[key] = symbolInfo
-        else:
-            self.__quotes[key] = message
+        symbolInfo = self.__publisher.publish(message)
 
-        self.__socket.send_multipart([b"FEED_UPDATE", pickle.dumps(message)])
+        for handler in self.__quoteHandlers:
+            try:
+                handler(key, symbolInfo)
+            except Exception as e:
+                logger.exception(f"Quote handler failed. {e}")
 
     def onOrderUpdate(self, message):
         logger.info(f"Order update: {message}")
-        self.__socket.send_multipart([b"ORDER_UPDATE", json.dumps(message).encode()])
+        self.__publisher.publishOrderUpdate(message)
 
     def periodicPrint(self):
         while True:
             logger.info(
-                f"Last Quote: {self.__lastQuoteDateTime}\tLast Received: {self.__lastReceivedDateTime}"
+                f"Last Quote: {self.__publisher.getLastQuoteDateTime()}\tLast Received: "
+                f"{self.__publisher.getLastReceivedDateTime()}"
+            )
+            logger.info(
+                f"Subscriptions: {self.getSubscriptionCount()}\tMessage rate: {self.getMessageRate():.1f}/s"
             )
+            logger.info(f"Latency\n{self.__latencyTracker.format()}")
             time.sleep(60)
 
     def get_ipc_path(self):
-        return self.__ipc_path
+        return self.__publisher.get_ipc_path()
 
 
 if __name__ == "__main__":
@@ -203,13 +260,34 @@ if __name__ == "__main__":
         logger.error("Broker not supported")
         exit(1)
 
-    wsClient = WebSocketClient(api, tokenMappings)
+    # Build the candles the strategies resample to once, here, e.g. CandleIntervals: [60, 300]
+    # WireFormat is read by the feeds of the strategies too, both ends have to agree
+    wsClient = WebSocketClient(
+        api,
+        tokenMappings,
+        wireFormat=config.get("WireFormat", "pickle"),
+        candleIntervals=config.get("CandleIntervals", None),
+    )
     logger.info(f"IPC path: {wsClient.get_ipc_path()}")
     wsClient.startClient()
     if not wsClient.waitInitialized():
         exit(1)
     else:
         logger.info("Initialization complete!")
+
+    # Keep a band of strikes around the ATM instead of the strikes around the startup LTP
+    if config.get("StrikeCount", None) is not None:
+        from pyalgomate.brokers.finvasia.subscriptions import StrikeSubscriptionManager
+
+        subscriptionManager = StrikeSubscriptionManager(
+            wsClient,
+            [
+                instrument
+                for instrument in tokenMappings.values()
+                if instrument in finvasia.underlyingMapping
+            ],
+            strikeCount=config["StrikeCount"],
+        )
     try:
         while True:
             time.sleep(1)
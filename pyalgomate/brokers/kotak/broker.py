@@ -10,8 +10,10 @@ import logging
 import datetime
 import six
 import re
+from functools import lru_cache
 from pyalgotrade import broker
 from pyalgomate.brokers import BacktestingBroker, QuantityTraits
+from pyalgomate.brokers.symboltable import SymbolTable
 from pyalgomate.strategies import OptionContract
 import pyalgomate.utils as utils
 from neo_api_client import NeoAPI
@@ -196,6 +198,48 @@ def getTokenMappings(api, underlying, symbols):
 #         return pd.DataFrame(columns=['Date/Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Open Interest'])
 
 
+optionSymbolPatterns = (
+    re.compile(r"([A-Z\:]+)(\d{2})([A-Z]{3})(\d+)([CP])E"),
+    re.compile(r"([A-Z\:]+)(\d{2})(\d|[OND])(\d{2})(\d+)([CP])E"),
+)
+
+
+def parseOptionContract(symbol):
+    m = optionSymbolPatterns[0].match(symbol)
+
+    if m is not None:
+        month = datetime.datetime.strptime(m.group(3), '%b').month
+        year = int(m.group(2)) + 2000
+        expiry = utils.getNearestMonthlyExpiryDate(
+            datetime.date(year, month, 1))
+        return OptionContract(symbol, int(m.group(4)), expiry, "c" if m.group(5) == "C" else "p", m.group(1).replace('NFO:BANKNIFTY', 'NSE:NIFTY BANK').replace('NFO:NIFTY', 'NSE:NIFTY 50'))
+
+    m = optionSymbolPatterns[1].match(symbol)
+
+    if m is None:
+        return None
+
+    day = int(m.group(4))
+    month = m.group(3)
+    if month == 'O':
+        month = 10
+    elif month == 'N':
+        month = 11
+    elif month == 'D':
+        month = 12
+    else:
+        month = int(month)
+
+    year = int(m.group(2)) + 2000
+    expiry = datetime.date(year, month, day)
+    return OptionContract(symbol, int(m.group(5)), expiry, "c" if m.group(6) == "C" else "p", m.group(1).replace('NFO:BANKNIFTY', 'NSE:NIFTY BANK').replace('NFO:NIFTY', 'NSE:NIFTY 50'))
+
+
+@lru_cache(maxsize=None)
+def getSymbolTable() -> SymbolTable:
+    return SymbolTable(parseOptionContract)
+
+
 class PaperTradingBroker(BacktestingBroker):
     """A Kotak paper trading broker.
     """
@@ -220,34 +264,7 @@ class PaperTradingBroker(BacktestingBroker):
         return getOptionSymbol(underlyingInstrument, expiry, ceStrikePrice, 'C'), getOptionSymbol(underlyingInstrument, expiry, peStrikePrice, 'P')
 
     def getOptionContract(self, symbol):
-        m = re.match(r"([A-Z\:]+)(\d{2})([A-Z]{3})(\d+)([CP])E", symbol)
-
-        if m is not None:
-            month = datetime.datetime.strptime(m.group(3), '%b').month
-            year = int(m.group(2)) + 2000
-            expiry = utils.getNearestMonthlyExpiryDate(
-                datetime.date(year, month, 1))
-            return OptionContract(symbol, int(m.group(4)), expiry, "c" if m.group(5) == "C" else "p", m.group(1).replace('NFO:BANKNIFTY', 'NSE:NIFTY BANK').replace('NFO:NIFTY', 'NSE:NIFTY 50'))
-
-        m = re.match(r"([A-Z\:]+)(\d{2})(\d|[OND])(\d{2})(\d+)([CP])E", symbol)
-
-        if m is None:
-            return None
-
-        day = int(m.group(4))
-        month = m.group(3)
-        if month == 'O':
-            month = 10
-        elif month == 'N':
-            month = 11
-        elif month == 'D':
-            month = 12
-        else:
-            month = int(month)
-
-        year = int(m.group(2)) + 2000
-        expiry = datetime.date(year, month, day)
-        return OptionContract(symbol, int(m.group(5)), expiry, "c" if m.group(6) == "C" else "p", m.group(1).replace('NFO:BANKNIFTY', 'NSE:NIFTY BANK').replace('NFO:NIFTY', 'NSE:NIFTY 50'))
+        return getSymbolTable().get(symbol)
 
 
 class TradeEvent(object):
@@ -398,34 +415,7 @@ class LiveBroker(broker.Broker):
         return getOptionSymbol(underlyingInstrument, expiry, ceStrikePrice, 'C'), getOptionSymbol(underlyingInstrument, expiry, peStrikePrice, 'P')
 
     def getOptionContract(self, symbol):
-        m = re.match(r"([A-Z\:]+)(\d{2})([A-Z]{3})(\d+)([CP])E", symbol)
-
-        if m is not None:
-            month = datetime.datetime.strptime(m.group(3), '%b').month
-            year = int(m.group(2)) + 2000
-            expiry = utils.getNearestMonthlyExpiryDate(
-                datetime.date(year, month, 1))
-            return OptionContract(symbol, int(m.group(4)), expiry, "c" if m.group(5) == "C" else "p", m.group(1).replace('NFO:BANKNIFTY', 'NSE:NIFTY BANK').replace('NFO:NIFTY', 'NSE:NIFTY 50'))
-
-        m = re.match(r"([A-Z\:]+)(\d{2})(\d|[OND])(\d{2})(\d+)([CP])E", symbol)
-
-        if m is None:
-            return None
-
-        day = int(m.group(4))
-        month = m.group(3)
-        if month == 'O':
-            month = 10
-        elif month == 'N':
-            month = 11
-        elif month == 'D':
-            month = 12
-        else:
-            month = int(month)
-
-        year = int(m.group(2)) + 2000
-        expiry = datetime.date(year, month, day)
-        return OptionContract(symbol, int(m.group(5)), expiry, "c" if m.group(6) == "C" else "p", m.group(1).replace('NFO:BANKNIFTY', 'NSE:NIFTY BANK').replace('NFO:NIFTY', 'NSE:NIFTY 50'))
+        return getSymbolTable().get(symbol)
 
     # def getHistoricalData(self, exchangeSymbol: str, startTime: datetime.datetime, interval: str) -> pd.DataFrame():
     #     return getHistoricalData(self.__api, exchangeSymbol, startTime, interval)
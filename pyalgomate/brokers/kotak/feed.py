@@ -2,16 +2,13 @@
 .. moduleauthor:: Sai Krishna
 """
 
-import datetime
 import logging
-import six
-import queue
-import traceback
 
 from pyalgotrade import bar
-from pyalgomate.barfeed import BaseBarFeed
-from pyalgotrade import observer
+from pyalgomate.barfeed.livefeed import LiveQuoteFeed
+from pyalgomate.barfeed.sharedquotes import DefaultName
 from pyalgomate.brokers.kotak import wsclient
+from pyalgomate.brokers.kotak.broker import getSymbolTable
 
 logger = logging.getLogger(__name__)
 
@@ -74,173 +71,85 @@ class TradeBar(bar.Bar):
         return not self.__trade.isBuy()
 
 
-class LiveTradeFeed(BaseBarFeed):
+class LiveTradeFeed(LiveQuoteFeed):
+    """A real-time BarFeed of the Neo quotes published by
+    :class:`pyalgomate.brokers.kotak.wsclient.WebSocketClient`.
 
-    """A real-time BarFeed that builds bars from live trades.
-
-    :param instruments: A list of currency pairs.
-    :type instruments: list of :class:`pyalgotrade.instrument.Instrument` or a string formatted like
-        QUOTE_SYMBOL/PRICE_CURRENCY..
-    :param maxLen: The maximum number of values that the :class:`pyalgotrade.dataseries.bards.BarDataSeries` will hold.
-        Once a bounded length is full, when new items are added, a corresponding number of items are discarded
-        from the opposite end. If None then dataseries.DEFAULT_MAX_LEN is used.
-    :type maxLen: int.
-
-    .. note::
-        Note that a Bar will be created for every trade, so open, high, low and close values will all be the same.
+    :param api: The logged in Neo API.
+    :param tokenMappings: A list of dicts with the instrument_token, exchange_segment and instrument.
+    :param startPublisher: Runs the websocket client in this process, as the feed used to. When False
+        the feed subscribes to a websocket client running as a separate process on ipc_path.
+    :param candleIntervals: The intervals in seconds the websocket client builds candles at. Strategies
+        resampling to them receive these candles instead of grouping the ticks themselves.
     """
 
-    QUEUE_TIMEOUT = 0.01
-
-    def __init__(self, api, tokenMappings, timeout=10, maxLen=None):
-        super(LiveTradeFeed, self).__init__(bar.Frequency.TRADE, maxLen)
-        self.__tradeBars = queue.Queue()
-        self.__channels = tokenMappings
-        self.__api = api
+    def __init__(
+        self,
+        api,
+        tokenMappings,
+        timeout=10,
+        maxLen=None,
+        ipc_path=None,
+        wireFormat="pickle",
+        startPublisher=True,
+        incrementalBars=False,
+        metricsPort=None,
+        sharedQuotesName=DefaultName,
+        candleIntervals=(),
+    ):
         self.__timeout = timeout
+        self.__wsClient = None
+        if startPublisher:
+            self.__wsClient = wsclient.WebSocketClient(
+                api, tokenMappings, ipc_path, wireFormat, sharedQuotesName, candleIntervals
+            )
+            ipc_path = self.__wsClient.get_ipc_path()
+
+        super(LiveTradeFeed, self).__init__(
+            api,
+            {
+                tokenMapping['instrument']: wsclient.getKey(tokenMapping)
+                for tokenMapping in tokenMappings
+            },
+            [tokenMapping['instrument'] for tokenMapping in tokenMappings],
+            ipc_path=ipc_path,
+            timeout=timeout,
+            maxLen=maxLen,
+            wireFormat=wireFormat,
+            incrementalBars=incrementalBars,
+            metricsPort=metricsPort,
+            sharedQuotesName=sharedQuotesName,
+            getOptionContract=getSymbolTable().get,
+            candleIntervals=candleIntervals,
+        )
+
+    def getWebSocketClient(self) -> wsclient.WebSocketClient:
+        return self.__wsClient
+
+    # This may raise.
+    def start(self):
+        super(LiveTradeFeed, self).start()
+        if self.__wsClient is None:
+            return
 
-        for tokenMapping in tokenMappings:
-            self.registerDataSeries(tokenMapping['instrument'])
-
-        self.__thread = None
-        self.__enableReconnection = False
-        self.__stopped = False
-        self.__orderBookUpdateEvent = observer.Event()
-        self.__lastDataTime = None
-
-    def getApi(self):
-        return self.__api
-
-    # Factory method for testing purposes.
-    def buildWebSocketClientThread(self):
-        return wsclient.WebSocketClientThread(self.__api, self.__channels)
-
-    def getCurrentDateTime(self):
-        return datetime.datetime.now()
-
-    def enableReconection(self, enableReconnection):
-        self.__enableReconnection = enableReconnection
-
-    def __initializeClient(self):
         logger.info("Initializing websocket client")
-        initialized = False
-        try:
-            # Start the thread that runs the client.
-            self.__thread = self.buildWebSocketClientThread()
-            self.__thread.start()
-        except Exception as e:
-            logger.error("Error connecting : %s" % str(e))
-
+        self.__wsClient.startClient()
         logger.info("Waiting for websocket initialization to complete")
-        while not initialized and not self.__stopped:
-            initialized = self.__thread.waitInitialized(self.__timeout)
+        initialized = False
+        while not initialized and not self.eof():
+            initialized = self.__wsClient.waitInitialized(self.__timeout)
 
-        if initialized:
-            logger.info("Initialization completed")
-        else:
+        if not initialized:
             logger.error("Initialization failed")
-        return initialized
-
-    def __onDisconnected(self):
-        if self.__enableReconnection:
-            logger.info("Reconnecting")
-            while not self.__stopped and not self.__initializeClient():
-                pass
-        elif not self.__stopped:
-            logger.info("Stopping")
-            self.__stopped = True
-
-    def __dispatchImpl(self, eventFilter):
-        ret = False
-        try:
-            eventType, eventData = self.__thread.getQueue().get(
-                True, LiveTradeFeed.QUEUE_TIMEOUT)
-            if eventFilter is not None and eventType not in eventFilter:
-                return False
-
-            ret = True
-            if eventType == wsclient.WebSocketClient.Event.TRADE:
-                self.__onTrade(eventData)
-                self.__lastDataTime = datetime.datetime.now()
-            elif eventType == wsclient.WebSocketClient.Event.ORDER_BOOK_UPDATE:
-                self.__orderBookUpdateEvent.emit(eventData)
-            elif eventType == wsclient.WebSocketClient.Event.DISCONNECTED:
-                self.__onDisconnected()
-            else:
-                ret = False
-                logger.error(
-                    "Invalid event received to dispatch: %s - %s" % (eventType, eventData))
-        except six.moves.queue.Empty:
-            pass
-        return ret
-
-    def __onTrade(self, trade):
-        self.__tradeBars.put(
-            {trade.getExtraColumns().get("Instrument"): trade})
-
-    def barsHaveAdjClose(self):
-        return False
-
-    def getNextBars(self):
-        if self.__tradeBars.qsize() > 0:
-            return bar.Bars(self.__tradeBars.get())
-
-        return None
-
-    def peekDateTime(self):
-        # Return None since this is a realtime subject.
-        return None
-
-    def start(self):
-        if self.__thread is not None:
-            logger.info("Already running!")
-            return
-
-        super(LiveTradeFeed, self).start()
-        if not self.__initializeClient():
-            self.__stopped = True
             raise Exception("Initialization failed")
-
-    def dispatch(self):
-        # Note that we may return True even if we didn't dispatch any Bar
-        # event.
-        ret = False
-        if self.__dispatchImpl(None):
-            ret = True
-        if super(LiveTradeFeed, self).dispatch():
-            ret = True
-        return ret
+        logger.info("Initialization completed")
 
     # This should not raise.
     def stop(self):
-        pass
-
-    # This should not raise.
-    def join(self):
-        if self.__thread is not None:
-            self.__thread.join()
-
-    def eof(self):
-        return self.__stopped
-
-    def getOrderBookUpdateEvent(self):
-        """
-        Returns the event that will be emitted when the orderbook gets updated.
-
-        Eventh handlers should receive one parameter:
-         1. A :class:`pyalgotrade.bitstamp.wsclient.OrderBookUpdate` instance.
-
-        :rtype: :class:`pyalgotrade.observer.Event`.
-        """
-        return self.__orderBookUpdateEvent
-
-    def getLastUpdatedDateTime(self):
-        return self.__lastDataTime
-
-    def isDataFeedAlive(self, heartBeatInterval=5):
-        if self.__lastDataTime is None:
-            return False
-
-        currentDateTime = datetime.datetime.now()
-        timeSinceLastDateTime = currentDateTime - self.__lastDataTime
-        return timeSinceLastDateTime.total_seconds() <= heartBeatInterval
+        super(LiveTradeFeed, self).stop()
+        try:
+            if self.__wsClient is not None:
+                logger.info("Stopping websocket client.")
+                self.__wsClient.stopClient()
+        except Exception as e:
+            logger.error("Error shutting down client: %s" % (str(e)))
@@ -3,14 +3,29 @@
 """
 
 import threading
-import queue
 import logging
 import datetime
+import time
 
-from pyalgotrade import bar
+from pyalgomate.barfeed.publisher import QuotePublisher
+from pyalgomate.barfeed.sharedquotes import DefaultName
 
 logger = logging.getLogger(__name__)
 
+segmentExchanges = {
+    "nse_cm": "NSE",
+    "nse_fo": "NFO",
+    "bse_cm": "BSE",
+    "bse_fo": "BFO",
+    "cde_fo": "CDS",
+    "mcx_fo": "MCX",
+}
+
+
+def getKey(tokenMapping):
+    """Returns the exchange|token key of a token mapping, e.g. NFO|43184."""
+    return f"{segmentExchanges[tokenMapping['exchange_segment']]}|{tokenMapping['instrument_token']}"
+
 
 class SubscribeEvent(object):
     def __init__(self, eventDict):
@@ -68,41 +83,45 @@ class SubscribeEvent(object):
     # @property
     # def instrument(self): return f"{self.tradingSymbol}"
 
-    def TradeBar(self, instrument):
-        open = high = low = close = self.price
+    def getQuote(self, exchange, instrument):
+        """Returns the quote for :class:`pyalgomate.barfeed.publisher.QuotePublisher`.
 
-        return bar.BasicBar(self.dateTime,
-                            open,
-                            high,
-                            low,
-                            close,
-                            self.volume,
-                            None,
-                            bar.Frequency.TRADE,
-                            {
-                                "Instrument": instrument,
-                                "Open Interest": self.openInterest,
-                                "Date/Time": self.tickDateTime
-                            })
+        Depth is not mapped, the touchline fields of the Neo feed carry no best bid and ask.
+        """
+        quote = {"e": exchange, "tk": self.scriptToken, "ts": instrument}
+        if self.__eventDict.get('fdtm') is not None:
+            quote["ft"] = self.tickDateTime
+        # Updates only carry the fields that changed, the publisher merges them per token
+        if 'ltp' in self.__eventDict:
+            quote["lp"] = self.price
+        if 'v' in self.__eventDict:
+            quote["v"] = self.volume
+        if 'oi' in self.__eventDict:
+            quote["oi"] = self.openInterest
+        return quote
 
 
 class WebSocketClient:
     """
-    This websocket client class is designed to be running in a separate thread and for that reason
-    events are pushed into a queue.
+    Receives the quotes of the Neo websocket and publishes them over IPC, with the same topics and
+    wire formats as :class:`pyalgomate.brokers.finvasia.wsclient.WebSocketClient`.
+
+    :param api: The logged in Neo API.
+    :param tokenMappings: A list of dicts with the instrument_token, exchange_segment and instrument.
+    :param ipc_path: The IPC path to bind. Defaults to pyalgomate_ipc in the temp directory.
+    :param wireFormat: One of :data:`pyalgomate.barfeed.wire.WireFormats`.
+    :param sharedQuotesName: The shared quote table to write to with the shared wire format.
+    :param candleIntervals: Intervals in seconds to publish the candles of every token at.
     """
 
-    class Event:
-        DISCONNECTED = 1
-        TRADE = 2
-        ORDER_BOOK_UPDATE = 3
-
-    def __init__(self, queue, api, tokenMappings):
+    def __init__(self, api, tokenMappings, ipc_path=None, wireFormat="pickle", sharedQuotesName=DefaultName,
+                 candleIntervals=None):
         assert len(tokenMappings), "Missing subscriptions"
-        self.__queue = queue
         self.__api = api
         self.__tokenIdMappings = {
             tokenMapping['instrument_token']: tokenMapping['instrument'] for tokenMapping in tokenMappings}
+        self.__tokenExchanges = {
+            tokenMapping['instrument_token']: segmentExchanges[tokenMapping['exchange_segment']] for tokenMapping in tokenMappings}
         self.__tokenMappings = [{'instrument_token': tokenMapping['instrument_token'],
                                  'exchange_segment': tokenMapping['exchange_segment']} for tokenMapping in tokenMappings]
         self.__pending_subscriptions = [
@@ -110,6 +129,24 @@ class WebSocketClient:
 
         self.__connected = False
         self.__initialized = threading.Event()
+        self.__publisher = QuotePublisher(
+            ipc_path,
+            wireFormat,
+            sharedQuotesName=sharedQuotesName,
+            sharedQuotesCapacity=max(2 * len(tokenMappings), 1024),
+            candleIntervals=candleIntervals,
+        )
+        self.__publisher.setInstruments(
+            {getKey(tokenMapping): tokenMapping['instrument'] for tokenMapping in tokenMappings})
+
+    def get_ipc_path(self):
+        return self.__publisher.get_ipc_path()
+
+    def getLastQuoteDateTime(self):
+        return self.__publisher.getLastQuoteDateTime()
+
+    def getMessageRate(self):
+        return self.__publisher.getMessageRate()
 
     def startClient(self):
         self.__api.on_message = self.onQuoteUpdate
@@ -121,15 +158,16 @@ class WebSocketClient:
     def stopClient(self):
         try:
             if self.__connected:
-                self.close()
+                self.__api.un_subscribe(self.__tokenMappings)
         except Exception as e:
             logger.error("Failed to close connection: %s" % e)
+        self.__publisher.close()
 
     def setInitialized(self):
         assert self.isConnected()
         self.__initialized.set()
 
-    def waitInitialized(self, timeout):
+    def waitInitialized(self, timeout=10):
         logger.info(
             f"Waiting for WebSocketClient waitInitialized with timeout of {timeout}")
         return self.__initialized.wait(timeout)
@@ -145,7 +183,6 @@ class WebSocketClient:
             self.__connected = False
 
         logger.info("Websocket disconnected")
-        # self.__queue.put((WebSocketClient.Event.DISCONNECTED, None))
 
     def onError(self, exception):
         import traceback
@@ -158,23 +195,22 @@ class WebSocketClient:
     def onUnknownEvent(self, event):
         logger.warning("Unknown event: %s." % event)
 
-    def onTrade(self, trade):
-        if trade.getPrice() > 0:
-            self.__queue.put((WebSocketClient.Event.TRADE, trade))
-
     def onQuoteUpdate(self, messages):
         try:
             if not self.__connected:
                 self.__connected = True
 
             logger.debug(messages)
+            receiveNs = time.time_ns()
             for message in messages:
                 subscribeEvent = SubscribeEvent(message)
+                instrument = self.__tokenIdMappings.get(subscribeEvent.scriptToken, None)
+                if instrument is None:
+                    continue
                 if subscribeEvent.scriptToken in self.__pending_subscriptions:
                     self.__onSubscriptionSucceeded(subscribeEvent)
-                subscribeEvent.dateTime = datetime.datetime.now()
-                self.onTrade(subscribeEvent.TradeBar(
-                    self.__tokenIdMappings[subscribeEvent.scriptToken]))
+                self.__publisher.publish(
+                    subscribeEvent.getQuote(self.__tokenExchanges[subscribeEvent.scriptToken], instrument), receiveNs)
         except Exception as e:
             logger.exception("Unhandled exception %s" % e)
 
@@ -187,50 +223,3 @@ class WebSocketClient:
 
         if not self.__pending_subscriptions:
             self.setInitialized()
-
-
-class WebSocketClientThreadBase(threading.Thread):
-    def __init__(self, wsCls, *args, **kwargs):
-        super(WebSocketClientThreadBase, self).__init__()
-        self.__queue = queue.Queue()
-        self.__wsClient = None
-        self.__wsCls = wsCls
-        self.__args = args
-        self.__kwargs = kwargs
-
-    def getQueue(self):
-        return self.__queue
-
-    def waitInitialized(self, timeout):
-        return self.__wsClient is not None and self.__wsClient.waitInitialized(timeout)
-
-    def run(self):
-        # We create the WebSocketClient right in the thread, instead of doing so in the constructor,
-        # because it has thread affinity.
-        try:
-            self.__wsClient = self.__wsCls(
-                self.__queue, *self.__args, **self.__kwargs)
-            logger.debug("Running websocket client")
-            self.__wsClient.startClient()
-        except Exception as e:
-            logger.exception("Unhandled exception %s" % e)
-            self.__wsClient.stopClient()
-
-    def stop(self):
-        try:
-            if self.__wsClient is not None:
-                logger.debug("Stopping websocket client from wsclient.stop()")
-                self.__wsClient.stopClient()
-        except Exception as e:
-            logger.error(
-                "Error stopping websocket client from wsclient.stop() exception catch: %s" % e)
-
-
-class WebSocketClientThread(WebSocketClientThreadBase):
-    """
-    This thread class is responsible for running a WebSocketClient.
-    """
-
-    def __init__(self, api, tokenMappings):
-        super(WebSocketClientThread, self).__init__(
-            WebSocketClient, api, tokenMappings)
@@ -0,0 +1,88 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+"""
+
+import logging
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolTable:
+    """Parses each trading symbol once and serves the resulting option contract from a dict.
+
+    Contracts are interned: repeated lookups of the same symbol return the same
+    :class:`pyalgomate.strategies.OptionContract` object. Symbols that are not options are
+    remembered as well so they are not parsed again.
+
+    :param parser: A function taking a trading symbol and returning an OptionContract or None.
+    """
+
+    def __init__(self, parser):
+        self.__parser = parser
+        self.__lock = threading.Lock()
+        self.__contracts = dict()
+        self.__byKey = dict()
+        self.__chains = dict()
+
+    def __add(self, symbol):
+        contract = self.__parser(symbol)
+        with self.__lock:
+            existing = self.__contracts.get(symbol, None)
+            if existing is not None or symbol in self.__contracts:
+                return existing
+
+            self.__contracts[symbol] = contract
+            if contract is not None:
+                if isinstance(contract.underlying, str):
+                    contract.underlying = sys.intern(contract.underlying)
+                key = (contract.underlying, contract.expiry, contract.strike, contract.type)
+                self.__byKey[key] = contract
+                self.__chains.setdefault((contract.underlying, contract.expiry), []).append(
+                    contract
+                )
+        return contract
+
+    def build(self, symbols):
+        """Bulk parses the given symbols. Already known symbols are skipped.
+
+        :returns: The number of option contracts in the table.
+        """
+        for symbol in symbols:
+            if symbol not in self.__contracts:
+                self.__add(symbol)
+        logger.debug(f"Symbol table has {len(self.__byKey)} option contracts")
+        return len(self.__byKey)
+
+    def get(self, symbol):
+        """Returns the option contract for the symbol or None if it is not an option."""
+        try:
+            return self.__contracts[symbol]
+        except KeyError:
+            return self.__add(symbol)
+
+    def find(self, underlying, expiry, strike, type):
+        """Reverse lookup of a contract by (underlying, expiry, strike, type), type being 'c' or 'p'."""
+        return self.__byKey.get((underlying, expiry, strike, type), None)
+
+    def getChain(self, underlying, expiry):
+        """Returns the known contracts of an expiry sorted by strike and type."""
+        with self.__lock:
+            chain = list(self.__chains.get((underlying, expiry), []))
+        chain.sort(key=lambda contract: (contract.strike, contract.type))
+        return chain
+
+    def getExpiries(self, underlying):
+        with self.__lock:
+            return sorted(
+                expiry
+                for (chainUnderlying, expiry) in self.__chains.keys()
+                if chainUnderlying == underlying and expiry is not None
+            )
+
+    def __contains__(self, symbol):
+        return symbol in self.__contracts
+
+    def __len__(self):
+        return len(self.__contracts)
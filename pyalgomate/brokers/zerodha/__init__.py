@@ -4,14 +4,14 @@
 import logging
 import pyotp
 from pyalgomate.brokers.zerodha.kiteext import KiteExt
-from pyalgomate.brokers.zerodha.broker import getZerodhaTokensList, getOptionSymbols, getUnderlyingDetails
+from pyalgomate.brokers.zerodha.broker import getZerodhaTokensList, getOptionSymbols, getUnderlyingDetails, getSymbolTable
 from pyalgomate.brokers.zerodha.feed import ZerodhaLiveFeed
 from pyalgomate.brokers import getDefaultUnderlyings, getExpiryDates
 
 logger = logging.getLogger()
 
 
-def getFeed(cred, registerOptions, underlyings):
+def getApiAndTokenMappings(cred, registerOptions, underlyings):
     api = KiteExt()
     twoFA = pyotp.TOTP(cred['factor2']).now()
     api.login_with_credentials(
@@ -45,7 +45,14 @@ def getFeed(cred, registerOptions, underlyings):
                 underlying, monthlyExpiry, ltp, 10, strikeDifference)
 
     optionSymbols = list(dict.fromkeys(optionSymbols))
+    getSymbolTable().build(optionSymbols)
 
     tokenMappings = getZerodhaTokensList(api, underlyings + optionSymbols)
 
-    return ZerodhaLiveFeed(api, tokenMappings), api
+    return api, tokenMappings
+
+
+def getFeed(cred, registerOptions, underlyings, candleIntervals=(), wireFormat="pickle", incrementalBars=False):
+    api, tokenMappings = getApiAndTokenMappings(cred, registerOptions, underlyings)
+    return ZerodhaLiveFeed(api, tokenMappings, candleIntervals=candleIntervals, wireFormat=wireFormat,
+                           incrementalBars=incrementalBars), api
@@ -8,12 +8,14 @@ import datetime
 import six
 import calendar
 import re
+from functools import lru_cache
 import pandas as pd
 
 from .kiteext import KiteExt
 
 from pyalgotrade import broker
 from pyalgomate.brokers import BacktestingBroker, QuantityTraits
+from pyalgomate.brokers.symboltable import SymbolTable
 from pyalgomate.strategies import OptionContract
 import pyalgomate.utils as utils
 from pyalgomate.utils import UnderlyingIndex
@@ -147,6 +149,55 @@ def getHistoricalData(api, exchangeSymbol: str, startTime: datetime.datetime, in
         return pd.DataFrame(columns=['Date/Time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Open Interest'])
 
 
+optionSymbolPatterns = (
+    re.compile(r"([A-Z\:]+)(\d{2})([A-Z]{3})(\d+)([CP])E"),
+    re.compile(r"([A-Z\:]+)(\d{2})(\d|[OND])(\d{2})(\d+)([CP])E"),
+)
+
+
+def parseOptionContract(symbol):
+    m = optionSymbolPatterns[0].match(symbol)
+
+    if m is not None:
+        month = datetime.datetime.strptime(m.group(3), '%b').month
+        year = int(m.group(2)) + 2000
+        expiry = utils.getNearestMonthlyExpiryDate(
+            datetime.date(year, month, 1))
+        optionPrefix = m.group(1)
+        for underlying, underlyingDetails in underlyingMapping.items():
+            if underlyingDetails['optionPrefix'] == optionPrefix:
+                return OptionContract(symbol, int(m.group(4)), expiry, "c" if m.group(5) == "C" else "p",
+                                      underlying)
+
+    m = optionSymbolPatterns[1].match(symbol)
+
+    if m is None:
+        return None
+
+    day = int(m.group(4))
+    month = m.group(3)
+    if month == 'O':
+        month = 10
+    elif month == 'N':
+        month = 11
+    elif month == 'D':
+        month = 12
+    else:
+        month = int(month)
+
+    year = int(m.group(2)) + 2000
+    expiry = datetime.date(year, month, day)
+    optionPrefix = m.group(1)
+    for underlying, underlyingDetails in underlyingMapping.items():
+        if underlyingDetails['optionPrefix'] == optionPrefix:
+            return OptionContract(symbol, int(m.group(5)), expiry, "c" if m.group(6) == "C" else "p", underlying)
+
+
+@lru_cache(maxsize=None)
+def getSymbolTable() -> SymbolTable:
+    return SymbolTable(parseOptionContract)
+
+
 class ZerodhaPaperTradingBroker(BacktestingBroker):
     """A Zerodha paper trading broker.
     """
@@ -177,41 +228,7 @@ class ZerodhaPaperTradingBroker(BacktestingBroker):
                                                                                                   'P')
 
     def getOptionContract(self, symbol):
-        m = re.match(r"([A-Z\:]+)(\d{2})([A-Z]{3})(\d+)([CP])E", symbol)
-
-        if m is not None:
-            month = datetime.datetime.strptime(m.group(3), '%b').month
-            year = int(m.group(2)) + 2000
-            expiry = utils.getNearestMonthlyExpiryDate(
-                datetime.date(year, month, 1))
-            optionPrefix = m.group(1)
-            for underlying, underlyingDetails in underlyingMapping.items():
-                if underlyingDetails['optionPrefix'] == optionPrefix:
-                    return OptionContract(symbol, int(m.group(4)), expiry, "c" if m.group(5) == "C" else "p",
-                                          underlying)
-
-        m = re.match(r"([A-Z\:]+)(\d{2})(\d|[OND])(\d{2})(\d+)([CP])E", symbol)
-
-        if m is None:
-            return None
-
-        day = int(m.group(4))
-        month = m.group(3)
-        if month == 'O':
-            month = 10
-        elif month == 'N':
-            month = 11
-        elif month == 'D':
-            month = 12
-        else:
-            month = int(month)
-
-        year = int(m.group(2)) + 2000
-        expiry = datetime.date(year, month, day)
-        optionPrefix = m.group(1)
-        for underlying, underlyingDetails in underlyingMapping.items():
-            if underlyingDetails['optionPrefix'] == optionPrefix:
-                return OptionContract(symbol, int(m.group(5)), expiry, "c" if m.group(6) == "C" else "p", underlying)
+        return getSymbolTable().get(symbol)
 
 
 class TradeEvent(object):
@@ -355,41 +372,7 @@ class ZerodhaLiveBroker(broker.Broker):
                                                                                                   'P')
 
     def getOptionContract(self, symbol):
-        m = re.match(r"([A-Z\:]+)(\d{2})([A-Z]{3})(\d+)([CP])E", symbol)
-
-        if m is not None:
-            month = datetime.datetime.strptime(m.group(3), '%b').month
-            year = int(m.group(2)) + 2000
-            expiry = utils.getNearestMonthlyExpiryDate(
-                datetime.date(year, month, 1))
-            optionPrefix = m.group(1)
-            for underlying, underlyingDetails in underlyingMapping.items():
-                if underlyingDetails['optionPrefix'] == optionPrefix:
-                    return OptionContract(symbol, int(m.group(4)), expiry, "c" if m.group(5) == "C" else "p",
-                                          underlying)
-
-        m = re.match(r"([A-Z\:]+)(\d{2})(\d|[OND])(\d{2})(\d+)([CP])E", symbol)
-
-        if m is None:
-            return None
-
-        day = int(m.group(4))
-        month = m.group(3)
-        if month == 'O':
-            month = 10
-        elif month == 'N':
-            month = 11
-        elif month == 'D':
-            month = 12
-        else:
-            month = int(month)
-
-        year = int(m.group(2)) + 2000
-        expiry = datetime.date(year, month, day)
-        optionPrefix = m.group(1)
-        for underlying, underlyingDetails in underlyingMapping.items():
-            if underlyingDetails['optionPrefix'] == optionPrefix:
-                return OptionContract(symbol, int(m.group(5)), expiry, "c" if m.group(6) == "C" else "p", underlying)
+        return getSymbolTable().get(symbol)
 
     def getHistoricalData(self, exchangeSymbol: str, startTime: datetime.datetime, interval: str) -> pd.DataFrame():
         return getHistoricalData(self.__api, exchangeSymbol, startTime, interval)
@@ -3,43 +3,96 @@
 """
 
 import threading
-import queue
 import logging
-import datetime
-import pytz
+import time
+
+import yaml
+
 from .kiteext import KiteExt
 
-from pyalgotrade import bar
+from pyalgomate.barfeed.publisher import QuotePublisher
+from pyalgomate.barfeed.sharedquotes import DefaultName
 
 logger = logging.getLogger(__name__)
 
 
+def getKey(tokenId, instrument):
+    """Returns the exchange|token key of a Kite instrument token, e.g. NFO|43184 for NFO:BANKNIFTY..."""
+    return f"{instrument.split(':')[0]}|{tokenId}"
+
+
+def tickToQuote(key, instrument, tick):
+    """Converts a Kite ticker tick into a quote for :class:`pyalgomate.barfeed.publisher.QuotePublisher`."""
+    exchange, token = key.split("|")
+    quote = {
+        "e": exchange,
+        "tk": token,
+        "ts": instrument.split(":", 1)[-1],
+        "lp": tick["last_price"],
+        "v": tick.get("volume_traded", 0),
+        "oi": tick.get("oi", 0),
+    }
+    exchangeTime = tick.get("exchange_timestamp", None) or tick.get("last_trade_time", None)
+    if exchangeTime is not None:
+        quote["ft"] = exchangeTime
+
+    depth = tick.get("depth", None)
+    if depth:
+        if len(depth.get("buy", [])):
+            quote["bp1"] = depth["buy"][0]["price"]
+            quote["bq1"] = depth["buy"][0]["quantity"]
+        if len(depth.get("sell", [])):
+            quote["sp1"] = depth["sell"][0]["price"]
+            quote["sq1"] = depth["sell"][0]["quantity"]
+    return quote
+
+
 class WebSocketClient:
     """
-    This websocket client class is designed to be running in a separate thread and for that reason
-    events are pushed into a queue.
+    Receives the ticks of the Kite ticker in its own thread and publishes them over IPC, with the
+    same topics and wire formats as :class:`pyalgomate.brokers.finvasia.wsclient.WebSocketClient`.
+
+    :param api: The logged in Kite API.
+    :param tokenMappings: Instrument tokens mapped to their instruments, e.g. NFO:BANKNIFTY...
+    :param ipc_path: The IPC path to bind. Defaults to pyalgomate_ipc in the temp directory.
+    :param wireFormat: One of :data:`pyalgomate.barfeed.wire.WireFormats`.
+    :param sharedQuotesName: The shared quote table to write to with the shared wire format.
+    :param candleIntervals: Intervals in seconds to publish the candles of every token at.
     """
 
-    class Event:
-        DISCONNECTED = 1
-        TRADE = 2
-        ORDER_BOOK_UPDATE = 3
-
-    def __init__(self, queue, api: KiteExt, tokenMappings):
+    def __init__(self, api: KiteExt, tokenMappings, ipc_path=None, wireFormat="pickle", sharedQuotesName=DefaultName,
+                 candleIntervals=None):
         assert len(tokenMappings), "Missing subscriptions"
-        self.__queue = queue
         self.__api = api
         self.__kws = None
         self.__tokenMappings = tokenMappings
+        self.__keys = {tokenId: getKey(tokenId, instrument) for tokenId, instrument in tokenMappings.items()}
         self.__pending_subscriptions = list(tokenMappings.keys())
         self.__connected = False
         self.__initialized = threading.Event()
-        self.__lastReceivedDateTime = None
-        self.__lastQuoteDateTime = None
+        self.__publisher = QuotePublisher(
+            ipc_path,
+            wireFormat,
+            sharedQuotesName=sharedQuotesName,
+            sharedQuotesCapacity=max(2 * len(tokenMappings), 1024),
+            candleIntervals=candleIntervals,
+        )
+        self.__publisher.setInstruments(
+            {self.__keys[tokenId]: instrument for tokenId, instrument in tokenMappings.items()}
+        )
+
+    def get_ipc_path(self):
+        return self.__publisher.get_ipc_path()
+
+    def getTokenMappings(self):
+        return self.__tokenMappings
 
     def getLastQuoteDateTime(self):
-        return self.__lastQuoteDateTime
-    
+        return self.__publisher.getLastQuoteDateTime()
+
+    def getMessageRate(self):
+        return self.__publisher.getMessageRate()
+
     def startClient(self):
         self.__kws = self.__api.kws()
         # Assign the callbacks.
@@ -47,21 +100,23 @@ class WebSocketClient:
         self.__kws.on_order_update = self.onOrderBookUpdate
         self.__kws.on_connect = self.onOpened
         self.__kws.on_close = self.onClosed
+        self.__kws.on_error = self.onError
 
         self.__kws.connect(threaded=True)
 
     def stopClient(self):
         try:
             if self.__connected:
-                self.close()
+                self.__kws.close()
         except Exception as e:
             logger.error("Failed to close connection: %s" % e)
+        self.__publisher.close()
 
     def setInitialized(self):
         assert self.isConnected()
         self.__initialized.set()
 
-    def waitInitialized(self, timeout):
+    def waitInitialized(self, timeout=10):
         logger.info(
             f"Waiting for WebSocketClient waitInitialized with timeout of {timeout}")
         return self.__initialized.wait(timeout)
@@ -84,50 +139,27 @@ class WebSocketClient:
             self.__connected = False
 
         logger.info("Closed. Code: %s. Reason: %s." % (code, reason))
-        self.__queue.put((WebSocketClient.Event.DISCONNECTED, None))
 
     def onError(self, ws, code, reason):
         logger.error(f'Ticker errored out. code = {code}, reason = {reason}')
 
-    def onUnknownEvent(self, event):
-        logger.warning("Unknown event: %s." % event)
-
-    def onTrade(self, trade):
-        if trade.getPrice() > 0:
-            self.__queue.put((WebSocketClient.Event.TRADE, trade))
-
     def onQuoteUpdate(self, ws, ticks):
         logger.debug(ticks)
-        self.__lastReceivedDateTime = datetime.datetime.now()
-        self.__lastQuoteDateTime = self.__lastReceivedDateTime.replace(microsecond=0)
+        receiveNs = time.time_ns()
 
         for tick in ticks:
             tokenId = tick['instrument_token']
-            instrument = self.__tokenMappings[tokenId]
-            ltp = tick['last_price']
-            volume = tick.get('volume_traded', 0)
+            instrument = self.__tokenMappings.get(tokenId, None)
+            if instrument is None:
+                continue
 
             if tokenId in self.__pending_subscriptions:
                 self.__onSubscriptionSucceeded(tokenId)
 
-            basicBar = bar.BasicBar(datetime.datetime.now(),
-                                    ltp,
-                                    ltp,
-                                    ltp,
-                                    ltp,
-                                    volume,
-                                    None,
-                                    bar.Frequency.TRADE,
-                                    {
-                "Instrument": instrument,
-                "Open Interest": tick.get('oi', 0),
-                "Date/Time": tick.get('last_trade_time', datetime.datetime.now())
-            })
-
-            self.onTrade(basicBar)
-
-    def onOrderBookUpdate(self, message):
-        hello = True
+            self.__publisher.publish(tickToQuote(self.__keys[tokenId], instrument, tick), receiveNs)
+
+    def onOrderBookUpdate(self, ws, data):
+        self.__publisher.publishOrderUpdate(data)
 
     def __onSubscriptionSucceeded(self, tokenId):
         logger.info(f"Subscription succeeded for <{self.__tokenMappings[tokenId]}>")
@@ -138,50 +170,38 @@ class WebSocketClient:
             self.setInitialized()
 
 
-class WebSocketClientThreadBase(threading.Thread):
-    def __init__(self, wsCls, *args, **kwargs):
-        super(WebSocketClientThreadBase, self).__init__()
-        self.__queue = queue.Queue()
-        self.__wsClient = None
-        self.__wsCls = wsCls
-        self.__args = args
-        self.__kwargs = kwargs
-
-    def getWsClient(self) -> WebSocketClient:
-        return self.__wsClient
-        
-    def getQueue(self):
-        return self.__queue
-
-    def waitInitialized(self, timeout):
-        return self.__wsClient is not None and self.__wsClient.waitInitialized(timeout)
-
-    def run(self):
-        # We create the WebSocketClient right in the thread, instead of doing so in the constructor,
-        # because it has thread affinity.
-        try:
-            self.__wsClient = self.__wsCls(
-                self.__queue, *self.__args, **self.__kwargs)
-            logger.debug("Running websocket client")
-            self.__wsClient.startClient()
-        except Exception as e:
-            logger.exception("Unhandled exception %s" % e)
-            self.__wsClient.stopClient()
-
-    def stop(self):
-        try:
-            if self.__wsClient is not None:
-                logger.debug("Stopping websocket client")
-                self.__wsClient.stopClient()
-        except Exception as e:
-            logger.error("Error stopping websocket client: %s" % e)
-
-
-class WebSocketClientThread(WebSocketClientThreadBase):
-    """
-    This thread class is responsible for running a WebSocketClient.
-    """
-
-    def __init__(self, api, tokenMappings):
-        super(WebSocketClientThread, self).__init__(
-            WebSocketClient, api, tokenMappings)
+if __name__ == "__main__":
+    import pyalgomate.brokers.zerodha as zerodha
+
+    logging.basicConfig(level=logging.INFO)
+
+    with open("cred.yml") as f:
+        creds = yaml.load(f, Loader=yaml.FullLoader)
+
+    with open("strategies.yaml", "r") as file:
+        config = yaml.safe_load(file)
+
+    api, tokenMappings = zerodha.getApiAndTokenMappings(
+        creds["Zerodha"], registerOptions=["Weekly"], underlyings=config["Underlyings"]
+    )
+
+    # Build the candles the strategies resample to once, here, e.g. CandleIntervals: [60, 300]
+    # WireFormat is read by the feeds of the strategies too, both ends have to agree
+    wsClient = WebSocketClient(
+        api,
+        tokenMappings,
+        wireFormat=config.get("WireFormat", "pickle"),
+        candleIntervals=config.get("CandleIntervals", None),
+    )
+    logger.info(f"IPC path: {wsClient.get_ipc_path()}")
+    wsClient.startClient()
+    if not wsClient.waitInitialized():
+        exit(1)
+    else:
+        logger.info("Initialization complete!")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        wsClient.stopClient()
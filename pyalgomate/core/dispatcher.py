@@ -5,9 +5,8 @@ import os
 import platform
 import signal
 import sys
-import time
 from datetime import datetime, timedelta
-from threading import Thread
+from threading import Event, Thread
 from typing import (
     Any,
     Callable,
@@ -53,6 +52,7 @@ class Dispatcher(object):
         self.__startEvent = observer.Event()
         self.__idleEvent = observer.Event()
         self.__currDateTime = None
+        self.__wakeupEvent = Event()
 
     # Returns the current event datetime. It may be None for events from realtime subjects.
     def getCurrentDateTime(self):
@@ -66,6 +66,12 @@ class Dispatcher(object):
 
     def stop(self):
         self.__stop = True
+        self.__wakeupEvent.set()
+
+    # Realtime subjects call this from their own threads when new events are available so they
+    # get dispatched right away instead of on the next poll.
+    def wakeup(self):
+        self.__wakeupEvent.set()
 
     def getSubjects(self):
         return self.__subjects
@@ -133,12 +139,13 @@ class Dispatcher(object):
             self.__startEvent.emit()
 
             while not self.__stop:
+                self.__wakeupEvent.clear()
                 eof, eventsDispatched = self.__dispatch()
                 if eof:
                     self.__stop = True
                 elif not eventsDispatched:
                     self.__idleEvent.emit()
-                time.sleep(0.01)
+                self.__wakeupEvent.wait(0.01)
         finally:
             # There are no more events.
             self.__currDateTime = None
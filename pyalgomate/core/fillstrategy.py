@@ -0,0 +1,71 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+"""
+
+from pyalgotrade import broker
+from pyalgotrade.broker import fillstrategy
+
+
+class BidAskFillStrategy(fillstrategy.DefaultStrategy):
+    """Fills market and limit orders against the best bid/ask instead of the bar prices.
+
+    Buys fill at the ask and sells at the bid. A limit order fills when the touch crosses its limit.
+    The slippage model is applied to the touch price of market orders, like the default strategy
+    applies it to the bar price.
+    The bid/ask comes from the Bid and Ask extra columns of the bar or, when the bar has none,
+    from the feed's :meth:`getBestBidAsk`. Without either, orders fill like with the default strategy.
+
+    :param barFeed: An optional feed to take the bid/ask from, e.g. the live feed in paper trading.
+    """
+
+    def __init__(self, barFeed=None, volumeLimit=None):
+        super(BidAskFillStrategy, self).__init__(volumeLimit=volumeLimit)
+        self.__barFeed = barFeed
+
+    def setSlippageModel(self, slippageModel):
+        super(BidAskFillStrategy, self).setSlippageModel(slippageModel)
+        self.__slippageModel = slippageModel
+
+    def __getBidAsk(self, order, bar):
+        extra = bar.getExtraColumns()
+        bid, ask = extra.get("Bid", None), extra.get("Ask", None)
+        if not (bid and bid > 0 and ask and ask > 0) and self.__barFeed is not None:
+            bid, ask = self.__barFeed.getBestBidAsk(order.getInstrument())
+        return (bid if bid and bid > 0 else None), (ask if ask and ask > 0 else None)
+
+    @staticmethod
+    def __isBuy(order):
+        return order.getAction() in [broker.Order.Action.BUY, broker.Order.Action.BUY_TO_COVER]
+
+    def fillMarketOrder(self, broker_, order, bar):
+        fillInfo = super(BidAskFillStrategy, self).fillMarketOrder(broker_, order, bar)
+        if fillInfo is None:
+            return None
+
+        bid, ask = self.__getBidAsk(order, bar)
+        price = ask if self.__isBuy(order) else bid
+        if price is None:
+            return fillInfo
+        price = self.__slippageModel.calculatePrice(
+            order, price, fillInfo.getQuantity(), bar, self.getVolumeUsed().get(order.getInstrument(), 0.0)
+        )
+        return fillstrategy.FillInfo(price, fillInfo.getQuantity())
+
+    def fillLimitOrder(self, broker_, order, bar):
+        bid, ask = self.__getBidAsk(order, bar)
+        if self.__isBuy(order):
+            price = ask if ask is not None and ask <= order.getLimitPrice() else None
+            touch = ask
+        else:
+            price = bid if bid is not None and bid >= order.getLimitPrice() else None
+            touch = bid
+
+        if touch is None:
+            return super(BidAskFillStrategy, self).fillLimitOrder(broker_, order, bar)
+        if price is None:
+            return None
+
+        fillInfo = super(BidAskFillStrategy, self).fillMarketOrder(broker_, order, bar)
+        if fillInfo is None:
+            return None
+        return fillstrategy.FillInfo(price, fillInfo.getQuantity())
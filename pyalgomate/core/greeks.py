@@ -0,0 +1,212 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+"""
+
+import concurrent.futures
+import datetime
+import logging
+import threading
+import time
+
+import numpy as np
+from py_vollib_vectorized import get_all_greeks, vectorized_implied_volatility
+
+logger = logging.getLogger(__name__)
+
+
+def calculateGreeks(prices, underlyingPrices, strikes, expiries, types):
+    """Solves implied volatility and the greeks for a batch of options.
+
+    This is a plain module level function so it can be shipped to a worker
+    thread or a worker process.
+
+    :returns: A tuple of (iv, greeks) where greeks is a dict of numpy arrays
+        keyed by delta/gamma/theta/vega, or None if the batch could not be solved.
+    """
+    if len(prices) == 0:
+        return np.array([]), {
+            "delta": np.array([]),
+            "gamma": np.array([]),
+            "theta": np.array([]),
+            "vega": np.array([]),
+        }
+
+    try:
+        iv = vectorized_implied_volatility(
+            prices,
+            underlyingPrices,
+            strikes,
+            expiries,
+            0.0,
+            types,
+            q=0,
+            model="black_scholes_merton",
+            return_as="numpy",
+            on_error="ignore",
+        )
+
+        greeks = get_all_greeks(
+            types,
+            underlyingPrices,
+            strikes,
+            expiries,
+            0.0,
+            iv,
+            0.0,
+            model="black_scholes",
+            return_as="dict",
+        )
+    except Exception as e:
+        logger.debug(f"Could not calculate greeks. {e}")
+        return None
+
+    return iv, greeks
+
+
+class GreeksSnapshot:
+    """A completed set of greeks along with the time of the quotes it was computed from."""
+
+    def __init__(self, sequence, dateTime, optionData, computeDuration, quotesAt):
+        self.sequence = sequence
+        self.dateTime = dateTime
+        self.optionData = optionData
+        self.computeDuration = computeDuration
+        # The time.monotonic() at which the input quotes were taken
+        self.quotesAt = quotesAt
+
+    def getAge(self):
+        """Returns the number of seconds since the quotes of this snapshot were taken, including
+        the time it took to compute it."""
+        return time.monotonic() - self.quotesAt
+
+    def __repr__(self):
+        return f"GreeksSnapshot(sequence={self.sequence}, dateTime={self.dateTime}, options={len(self.optionData)}, age={self.getAge():.3f})"
+
+
+class BackgroundGreeksCalculator:
+    """Computes greeks away from the dispatcher thread.
+
+    Only one computation is kept in flight. Submissions that arrive while the worker is
+    busy are skipped since the next submission will carry fresher quotes anyway.
+
+    :param useProcess: Run the solver in a worker process instead of a worker thread.
+    :param buildFn: Called on completion with (inputs, iv, greeks) and returns the option data dict.
+    """
+
+    def __init__(self, buildFn, useProcess=False):
+        self.__buildFn = buildFn
+        self.__executor = (
+            concurrent.futures.ProcessPoolExecutor(max_workers=1)
+            if useProcess
+            else concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="greeks"
+            )
+        )
+        self.__lock = threading.Lock()
+        self.__inFlight = False
+        self.__sequence = 0
+        self.__snapshot = None
+
+        self.__submitted = 0
+        self.__skipped = 0
+        self.__completed = 0
+        self.__failed = 0
+        self.__maxAge = 0.0
+        self.__totalComputeDuration = 0.0
+
+    def isInFlight(self):
+        with self.__lock:
+            return self.__inFlight
+
+    def submit(self, dateTime: datetime.datetime, inputs):
+        """Schedules a computation for the given inputs.
+
+        :param inputs: A tuple of (optionContracts, prices, underlyingPrices, strikes, expiries, types, ois).
+        :returns: True if the computation was scheduled, False if one is still in flight.
+        """
+        # The inputs are collected right before they are submitted
+        quotesAt = time.monotonic()
+        with self.__lock:
+            if self.__inFlight:
+                self.__skipped += 1
+                return False
+            self.__inFlight = True
+            self.__sequence += 1
+            sequence = self.__sequence
+            self.__submitted += 1
+
+        _, prices, underlyingPrices, strikes, expiries, types, _ = inputs
+        try:
+            future = self.__executor.submit(
+                calculateGreeks, prices, underlyingPrices, strikes, expiries, types
+            )
+        except RuntimeError as e:
+            logger.warning(f"Greeks worker is not accepting work. {e}")
+            with self.__lock:
+                self.__inFlight = False
+                self.__failed += 1
+            return False
+
+        future.add_done_callback(
+            lambda f: self.__onDone(f, sequence, dateTime, inputs, quotesAt)
+        )
+        return True
+
+    def __onDone(self, future, sequence, dateTime, inputs, quotesAt):
+        snapshot = None
+        try:
+            result = future.result()
+            if result is not None:
+                iv, greeks = result
+                snapshot = GreeksSnapshot(
+                    sequence,
+                    dateTime,
+                    self.__buildFn(inputs, iv, greeks),
+                    time.monotonic() - quotesAt,
+                    quotesAt,
+                )
+        except Exception as e:
+            logger.exception(f"Exception while calculating greeks in background. {e}")
+
+        with self.__lock:
+            self.__inFlight = False
+            if snapshot is None:
+                self.__failed += 1
+                return
+
+            if self.__snapshot is not None:
+                self.__maxAge = max(self.__maxAge, self.__snapshot.getAge())
+            self.__snapshot = snapshot
+            self.__completed += 1
+            self.__totalComputeDuration += snapshot.computeDuration
+
+    def getSnapshot(self) -> GreeksSnapshot:
+        """Returns the most recent completed snapshot or None."""
+        with self.__lock:
+            return self.__snapshot
+
+    def getMetrics(self):
+        with self.__lock:
+            age = self.__snapshot.getAge() if self.__snapshot is not None else None
+            return {
+                "submitted": self.__submitted,
+                "skipped": self.__skipped,
+                "completed": self.__completed,
+                "failed": self.__failed,
+                "inFlight": self.__inFlight,
+                "snapshotAge": age,
+                "maxSnapshotAge": max(self.__maxAge, age or 0.0),
+                "lastComputeDuration": (
+                    self.__snapshot.computeDuration
+                    if self.__snapshot is not None
+                    else None
+                ),
+                "avgComputeDuration": (
+                    self.__totalComputeDuration / self.__completed
+                    if self.__completed
+                    else None
+                ),
+            }
+
+    def shutdown(self, wait=False):
+        self.__executor.shutdown(wait=wait)
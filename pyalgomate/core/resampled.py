@@ -1,4 +1,5 @@
 import datetime
+import threading
 from pyalgotrade.dataseries import resampled
 from pyalgotrade import resamplebase
 from pyalgotrade.resamplebase import DayRange, MonthRange, TimeRange
@@ -82,56 +83,141 @@ class BarsGrouper(resamplebase.Grouper):
 
 
 class ResampledBars():
+    """Groups the bars of a feed into bars of a coarser frequency and calls back with them once closed.
+
+    The running open, high, low, close and volume of each instrument are kept in preallocated lists
+    indexed by a slot per instrument. Adding a bar is a few comparisons, looking up the bar in progress
+    of an instrument only builds that bar and the closed bars are built once, when the period closes.
+    """
+
+    InitialCapacity = 256
+
     def __init__(self, barFeed, frequency, callback):
         self.__barFeed = barFeed
         self.__frequency = frequency
         self.__callback = callback
         self.__values = []
-        self.__grouper = None
-        self.__range = None
         self.__lastBars: bar.Bars = None
 
+        self.__slots = {}
+        self.__instruments = []
+        self.__periods = [-1] * self.InitialCapacity
+        self.__opens = [0.0] * self.InitialCapacity
+        self.__highs = [0.0] * self.InitialCapacity
+        self.__lows = [0.0] * self.InitialCapacity
+        self.__closes = [0.0] * self.InitialCapacity
+        self.__volumes = [0.0] * self.InitialCapacity
+        self.__adjCloses = [None] * self.InitialCapacity
+        self.__useAdjValues = [False] * self.InitialCapacity
+        # Slots with a bar in the current period, in the order of their first bar
+        self.__active = []
+
+        self.__period = 0
+        self.__begin = None
+        self.__end = None
+        self.__closeAt = None
+        # A period is closed as soon as the next bar of the feed would be past its end
+        barFeedFrequency = barFeed.getFrequency() if barFeed is not None else None
+        self.__lookAhead = datetime.timedelta(
+            seconds=barFeedFrequency if barFeedFrequency is not None and barFeedFrequency > 0 else 0)
+
     def getFrequency(self):
         return self.__frequency
 
     def getBar(self, instrument) -> bar.Bar:
-        if self.__grouper is not None:
-            return self.__grouper.getGrouped().getBar(instrument)
-
-        return None
+        slot = self.__slots.get(instrument)
+        if slot is None or self.__begin is None or self.__periods[slot] != self.__period:
+            return None
+        return self.__getBar(slot)
 
     def getLastBars(self) -> bar.Bars:
         return self.__lastBars
 
-    def addBars(self, dateTime, value):
-        if self.__range is None:
-            self.__range = build_range(
-                dateTime, self.getFrequency())
-        if self.__grouper is None:
-            self.__grouper = BarsGrouper(
-                self.__range.getBeginning(), value, self.getFrequency())
-        if self.__range is not None and self.__range.belongs(dateTime):
-            self.__grouper.addValue(value)
-
-        barFeedFrequency = self.__barFeed.getFrequency()
-        nextDateTime = dateTime + datetime.timedelta(
-            seconds=barFeedFrequency if barFeedFrequency is not None and barFeedFrequency > 0 else 0)
+    def __getBar(self, slot):
+        ret = bar.BasicBar(self.__begin, self.__opens[slot], self.__highs[slot], self.__lows[slot],
+                           self.__closes[slot], self.__volumes[slot], self.__adjCloses[slot], self.__frequency)
+        if self.__useAdjValues[slot]:
+            ret.setUseAdjustedValue(True)
+        return ret
+
+    def __addInstrument(self, instrument):
+        slot = len(self.__instruments)
+        if slot == len(self.__periods):
+            # Double the capacity
+            self.__periods.extend([-1] * slot)
+            for values in (self.__opens, self.__highs, self.__lows, self.__closes, self.__volumes):
+                values.extend([0.0] * slot)
+            self.__adjCloses.extend([None] * slot)
+            self.__useAdjValues.extend([False] * slot)
+        self.__instruments.append(instrument)
+        self.__slots[instrument] = slot
+        return slot
+
+    def __openPeriod(self, dateTime):
+        range_ = build_range(dateTime, self.__frequency)
+        self.__period += 1
+        self.__begin = range_.getBeginning()
+        self.__end = range_.getEnding()
+        self.__closeAt = self.__end - self.__lookAhead
+
+    def __closePeriod(self):
+        if len(self.__active):
+            getBar = self.__getBar
+            instruments = self.__instruments
+            self.__values.append(bar.Bars({instruments[slot]: getBar(slot) for slot in self.__active}))
+        self.__active = []
+        self.__begin = self.__end = self.__closeAt = None
 
-        if (self.__grouper is not None) and (self.__range is not None) and (not self.__range.belongs(nextDateTime)):
-            self.__values.append(self.__grouper.getGrouped())
-            self.__grouper = None
-            self.__range = None
-
-        if len(self.__values):
+    def addBars(self, dateTime, value):
+        if self.__begin is not None and not (self.__begin <= dateTime < self.__end):
+            self.__closePeriod()
+        if self.__begin is None:
+            self.__openPeriod(dateTime)
+
+        period = self.__period
+        slots = self.__slots
+        periods = self.__periods
+        highs = self.__highs
+        lows = self.__lows
+        closes = self.__closes
+        volumes = self.__volumes
+        adjCloses = self.__adjCloses
+        for instrument, bar_ in value.items():
+            slot = slots.get(instrument)
+            if slot is None:
+                slot = self.__addInstrument(instrument)
+            if periods[slot] != period:
+                periods[slot] = period
+                self.__opens[slot] = bar_.getOpen()
+                highs[slot] = bar_.getHigh()
+                lows[slot] = bar_.getLow()
+                closes[slot] = bar_.getClose()
+                volumes[slot] = bar_.getVolume()
+                adjCloses[slot] = bar_.getAdjClose()
+                self.__useAdjValues[slot] = bar_.getUseAdjValue()
+                self.__active.append(slot)
+            else:
+                high = bar_.getHigh()
+                if high > highs[slot]:
+                    highs[slot] = high
+                low = bar_.getLow()
+                if low < lows[slot]:
+                    lows[slot] = low
+                closes[slot] = bar_.getClose()
+                adjCloses[slot] = bar_.getAdjClose()
+                volumes[slot] += bar_.getVolume()
+
+        if dateTime >= self.__closeAt:
+            self.__closePeriod()
+
+        while len(self.__values):
             self.sendBars()
 
     def checkNow(self, dateTime):
-        if (self.__grouper is not None) and (self.__range is not None) and (not self.__range.belongs(dateTime)):
-            self.__values.append(self.__grouper.getGrouped())
-            self.__grouper = None
-            self.__range = None
+        if self.__begin is not None and dateTime is not None and not (self.__begin <= dateTime < self.__end):
+            self.__closePeriod()
 
-        if len(self.__values):
+        while len(self.__values):
             self.sendBars()
 
     def sendBars(self):
@@ -139,6 +225,208 @@ class ResampledBars():
         self.__callback(self.__lastBars)
 
 
+class PublishedBars():
+    """Hands the candles built by the quote publisher to a callback, in place of
+    :class:`ResampledBars` grouping the bars of the feed again.
+
+    :param candles: The deque returned by the subscribeCandles method of the feed.
+    """
+
+    def __init__(self, candles, frequency, callback):
+        self.__candles = candles
+        self.__frequency = frequency
+        self.__callback = callback
+        self.__lastBars: bar.Bars = None
+
+    def getFrequency(self):
+        return self.__frequency
+
+    def getBar(self, instrument) -> bar.Bar:
+        # Candles are only received once closed
+        return None
+
+    def getLastBars(self) -> bar.Bars:
+        return self.__lastBars
+
+    def addBars(self, dateTime, value):
+        self.checkNow(dateTime)
+
+    def checkNow(self, dateTime):
+        while len(self.__candles):
+            self.sendBars()
+
+    def sendBars(self):
+        self.__lastBars = self.__candles.popleft()
+        self.__callback(self.__lastBars)
+
+
+class ResamplingHub():
+    """Resamples the bars of a feed once per frequency for all the strategies sharing the feed.
+
+    The finest frequency subscribed to groups the bars of the feed and every coarser one groups the
+    closed bars of the coarsest subscribed frequency dividing it, e.g. 15 minutes from 5 minutes and
+    5 minutes from 1 minute. Closed bars update the indicators registered for their frequency in the
+    indicator manager, then the subscribers are called back.
+
+    Frequencies the feed builds candles for, see the subscribeCandles method of
+    :class:`pyalgomate.barfeed.BaseBarFeed`, are taken from the feed instead of being grouped.
+
+    Frequencies subscribed to once bars were added are grouped from the best frequency already
+    running, the running ones are not rewired.
+
+    :param indicatorManager: A :class:`pyalgomate.technical.indicator.IndicatorManager`, timeframes
+        being frequencies in seconds. Defaults to a new one.
+    """
+
+    def __init__(self, barFeed, indicatorManager=None):
+        self.__barFeed = barFeed
+        self.__indicatorManager = indicatorManager
+        self.__lock = threading.RLock()
+        self.__resampledBars = {}
+        self.__callbacks = {}
+        # Frequencies grouped from the bars of the feed and those grouped from each frequency
+        self.__roots = []
+        self.__children = {}
+        self.__candles = {}
+        self.__started = False
+        self.__lastValue = None
+
+    def getIndicatorManager(self):
+        if self.__indicatorManager is None:
+            from pyalgomate.technical.indicator import IndicatorManager  # Lazy import
+
+            self.__indicatorManager = IndicatorManager()
+        return self.__indicatorManager
+
+    def getFrequencies(self):
+        return sorted(self.__resampledBars.keys())
+
+    def getSourceFrequency(self, frequency):
+        """Returns the frequency the bars of a frequency are grouped from, None for the feed."""
+        for source, children in self.__children.items():
+            if frequency in children:
+                return source
+        return None
+
+    def subscribe(self, frequency, callback):
+        """Calls back with the bars of frequency once closed.
+
+        :rtype: :class:`HubSubscription`.
+        """
+        with self.__lock:
+            if frequency not in self.__callbacks:
+                self.__callbacks[frequency] = []
+                if self.__started:
+                    self.__addFrequency(frequency)
+                else:
+                    self.__build()
+            self.__callbacks[frequency].append(callback)
+        return HubSubscription(self, frequency, callback)
+
+    def unsubscribe(self, frequency, callback):
+        with self.__lock:
+            self.__callbacks[frequency].remove(callback)
+
+    def __subscribeCandles(self, frequency):
+        # Subscribed once, the deques are kept when rebuilding
+        if frequency not in self.__candles:
+            subscribeCandles = getattr(self.__barFeed, "subscribeCandles", None)
+            self.__candles[frequency] = subscribeCandles(frequency) if subscribeCandles is not None else None
+        return self.__candles[frequency]
+
+    def __addFrequency(self, frequency):
+        candles = self.__subscribeCandles(frequency)
+        if candles is not None:
+            self.__roots.append(frequency)
+            self.__resampledBars[frequency] = PublishedBars(
+                candles, frequency, lambda bars: self.__onClosed(frequency, bars))
+            return
+
+        sources = [source for source in self.__resampledBars if source < frequency and frequency % source == 0]
+        if len(sources):
+            source = max(sources)
+            self.__children.setdefault(source, []).append(frequency)
+            barFeed = self.__resampledBars[source]
+        else:
+            self.__roots.append(frequency)
+            barFeed = self.__barFeed
+        self.__resampledBars[frequency] = ResampledBars(
+            barFeed, frequency, lambda bars: self.__onClosed(frequency, bars))
+
+    def __build(self):
+        self.__resampledBars = {}
+        self.__roots = []
+        self.__children = {}
+        for frequency in sorted(self.__callbacks):
+            self.__addFrequency(frequency)
+
+    def __onClosed(self, frequency, bars):
+        indicatorManager = self.__indicatorManager
+        if indicatorManager is not None:
+            for instrument, bar_ in bars.items():
+                if indicatorManager.is_instrument_registered(frequency, instrument):
+                    indicatorManager.update_data(frequency, instrument, bar_.getDateTime(), bar_.getOpen(),
+                                                 bar_.getHigh(), bar_.getLow(), bar_.getClose(), bar_.getVolume())
+
+        for callback in list(self.__callbacks[frequency]):
+            callback(bars)
+
+        for child in self.__children.get(frequency, []):
+            self.__resampledBars[child].addBars(bars.getDateTime(), bars)
+
+    def getBar(self, frequency, instrument) -> bar.Bar:
+        resampledBars = self.__resampledBars.get(frequency)
+        return resampledBars.getBar(instrument) if resampledBars is not None else None
+
+    def getLastBars(self, frequency) -> bar.Bars:
+        resampledBars = self.__resampledBars.get(frequency)
+        return resampledBars.getLastBars() if resampledBars is not None else None
+
+    def addBars(self, dateTime, value):
+        with self.__lock:
+            # Every strategy on the feed hands over the same bars
+            if value is self.__lastValue:
+                return
+            self.__lastValue = value
+            self.__started = True
+            for frequency in self.__roots:
+                self.__resampledBars[frequency].addBars(dateTime, value)
+
+    def checkNow(self, dateTime):
+        with self.__lock:
+            # Finer frequencies first, so that the bars they close reach the coarser ones
+            for frequency in sorted(self.__resampledBars):
+                self.__resampledBars[frequency].checkNow(dateTime)
+
+
+class HubSubscription():
+    """The subscription of a callback to a frequency of a :class:`ResamplingHub`, used by strategies
+    like a :class:`ResampledBars`."""
+
+    def __init__(self, hub: ResamplingHub, frequency, callback):
+        self.__hub = hub
+        self.__frequency = frequency
+        self.__callback = callback
+
+    def getFrequency(self):
+        return self.__frequency
+
+    def getBar(self, instrument) -> bar.Bar:
+        return self.__hub.getBar(self.__frequency, instrument)
+
+    def getLastBars(self) -> bar.Bars:
+        return self.__hub.getLastBars(self.__frequency)
+
+    def addBars(self, dateTime, value):
+        self.__hub.addBars(dateTime, value)
+
+    def checkNow(self, dateTime):
+        self.__hub.checkNow(dateTime)
+
+    def unsubscribe(self):
+        self.__hub.unsubscribe(self.__frequency, self.__callback)
+
+
 if __name__ == "__main__":
     dateTime = datetime.datetime.now()
     intradayRange = IntraDayRange(dateTime, 75 * bar.Frequency.MINUTE)
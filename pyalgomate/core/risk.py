@@ -0,0 +1,174 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+"""
+
+import logging
+import math
+import threading
+from functools import lru_cache
+
+from pyalgotrade import broker
+
+logger = logging.getLogger(__name__)
+
+GreekNames = ("delta", "gamma", "theta", "vega")
+
+
+class RiskAggregator:
+    """Maintains portfolio greeks across all the strategies running in this process.
+
+    Net positions are updated from order fills and greeks from the strategies' option data.
+    Only the instruments whose quantity or greeks changed are touched, and their contribution
+    is moved in and out of the (underlying, expiry) bucket they belong to.
+    Instruments that are not options (futures, underlying) contribute a delta of 1 per unit.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__strategyQuantities = dict()
+        self.__quantities = dict()
+        self.__buckets = dict()
+        self.__instrumentBuckets = dict()
+        self.__bucketSizes = dict()
+        self.__greeks = dict()
+        self.__contributions = dict()
+
+    def __applyContribution(self, instrument):
+        bucketKey = self.__instrumentBuckets[instrument]
+        bucket = self.__buckets.setdefault(bucketKey, [0.0] * len(GreekNames))
+        old = self.__contributions.pop(instrument, None)
+        if old is not None:
+            for i in range(len(GreekNames)):
+                bucket[i] -= old[i]
+
+        quantity = self.__quantities.get(instrument, 0)
+        greeks = self.__greeks.get(instrument, None)
+        if quantity != 0 and greeks is not None:
+            new = tuple(quantity * greek for greek in greeks)
+            for i in range(len(GreekNames)):
+                bucket[i] += new[i]
+            self.__contributions[instrument] = new
+
+        if quantity == 0:
+            del self.__quantities[instrument]
+            del self.__instrumentBuckets[instrument]
+            self.__greeks.pop(instrument, None)
+            self.__bucketSizes[bucketKey] -= 1
+            if self.__bucketSizes[bucketKey] == 0:
+                del self.__bucketSizes[bucketKey]
+                del self.__buckets[bucketKey]
+
+    def onFill(self, strategyName, instrument, quantity, optionContract=None):
+        """Records a fill. Quantity is positive for buys and negative for sells."""
+        with self.__lock:
+            key = (strategyName, instrument)
+            strategyQuantity = self.__strategyQuantities.get(key, 0) + quantity
+            if strategyQuantity == 0:
+                self.__strategyQuantities.pop(key, None)
+            else:
+                self.__strategyQuantities[key] = strategyQuantity
+
+            if instrument not in self.__instrumentBuckets:
+                if optionContract is not None:
+                    self.__instrumentBuckets[instrument] = (
+                        optionContract.underlying,
+                        optionContract.expiry,
+                    )
+                else:
+                    self.__instrumentBuckets[instrument] = (instrument, None)
+                    self.__greeks[instrument] = (1.0, 0.0, 0.0, 0.0)
+                bucketKey = self.__instrumentBuckets[instrument]
+                self.__bucketSizes[bucketKey] = self.__bucketSizes.get(bucketKey, 0) + 1
+            self.__quantities[instrument] = self.__quantities.get(instrument, 0) + quantity
+            self.__applyContribution(instrument)
+
+    def onOrderEvent(self, strategyName, orderEvent: broker.OrderEvent, optionContract=None):
+        if orderEvent.getEventType() not in (
+            broker.OrderEvent.Type.PARTIALLY_FILLED,
+            broker.OrderEvent.Type.FILLED,
+        ):
+            return
+
+        execInfo = orderEvent.getEventInfo()
+        if execInfo is None:
+            return
+
+        order = orderEvent.getOrder()
+        quantity = execInfo.getQuantity() if order.isBuy() else -execInfo.getQuantity()
+        self.onFill(strategyName, order.getInstrument(), quantity, optionContract)
+
+    def updateGreeks(self, optionData: dict):
+        """Updates the greeks of the held instruments from a dict of
+        :class:`pyalgomate.strategies.OptionGreeks` keyed by symbol.
+        Greeks that are not finite are ignored and the previous ones are kept.
+
+        :returns: The number of instruments whose contribution changed.
+        """
+        changed = 0
+        with self.__lock:
+            for instrument in list(self.__quantities.keys()):
+                optionGreeks = optionData.get(instrument, None)
+                if optionGreeks is None:
+                    continue
+                greeks = (
+                    optionGreeks.delta,
+                    optionGreeks.gamma,
+                    optionGreeks.theta,
+                    optionGreeks.vega,
+                )
+                # A NaN would never leave the bucket and never compare equal, treated as missing
+                if not all(math.isfinite(greek) for greek in greeks):
+                    continue
+                if self.__greeks.get(instrument, None) == greeks:
+                    continue
+                self.__greeks[instrument] = greeks
+                self.__applyContribution(instrument)
+                changed += 1
+        return changed
+
+    def getBucketGreeks(self):
+        """Returns the portfolio greeks keyed by (underlying, expiry)."""
+        with self.__lock:
+            return {
+                key: dict(zip(GreekNames, bucket))
+                for key, bucket in self.__buckets.items()
+            }
+
+    def getUnderlyingGreeks(self):
+        """Returns the portfolio greeks keyed by underlying."""
+        ret = dict()
+        for (underlying, _), greeks in self.getBucketGreeks().items():
+            totals = ret.setdefault(underlying, dict.fromkeys(GreekNames, 0.0))
+            for name in GreekNames:
+                totals[name] += greeks[name]
+        return ret
+
+    def getTotalGreeks(self):
+        totals = dict.fromkeys(GreekNames, 0.0)
+        for greeks in self.getBucketGreeks().values():
+            for name in GreekNames:
+                totals[name] += greeks[name]
+        return totals
+
+    def getStrategyQuantities(self, strategyName):
+        with self.__lock:
+            return {
+                instrument: quantity
+                for (name, instrument), quantity in self.__strategyQuantities.items()
+                if name == strategyName
+            }
+
+    def getMissingGreeks(self):
+        """Returns the held instruments for which no greeks have been received yet."""
+        with self.__lock:
+            return [
+                instrument
+                for instrument in self.__quantities
+                if instrument not in self.__greeks
+            ]
+
+
+@lru_cache(maxsize=None)
+def getRiskAggregator() -> RiskAggregator:
+    """Returns the aggregator shared by all the strategies in this process."""
+    return RiskAggregator()
@@ -0,0 +1,192 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+"""
+
+import collections
+import datetime
+import logging
+import math
+import threading
+
+import numpy as np
+from scipy.special import ndtr
+
+logger = logging.getLogger(__name__)
+
+MinimumVolatility = 0.01
+
+
+def blackScholesPrice(spot, strike, tte, sigma, isCall):
+    """Vectorized Black-Scholes price with zero rates. All the arguments broadcast against each other.
+    Expired options (tte <= 0) are priced at intrinsic value."""
+    spot, strike, tte, sigma, isCall = np.broadcast_arrays(spot, strike, tte, sigma, isCall)
+    intrinsic = np.where(isCall, np.maximum(spot - strike, 0.0), np.maximum(strike - spot, 0.0))
+
+    alive = tte > 0
+    stdDev = sigma * np.sqrt(np.where(alive, tte, 1.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(spot / strike) + 0.5 * stdDev * stdDev) / stdDev
+    d2 = d1 - stdDev
+    call = spot * ndtr(d1) - strike * ndtr(d2)
+    put = strike * ndtr(-d2) - spot * ndtr(-d1)
+    return np.where(alive, np.where(isCall, call, put), intrinsic)
+
+
+class Book:
+    """The option legs of a set of positions laid out as numpy arrays.
+
+    Open legs are valued against their own underlying's spot so books spanning several underlyings
+    can be moved together by a relative spot move. Closed legs only contribute their realized PnL.
+    """
+
+    def __init__(self, underlyings, spots, strikes, isCall, quantities, entryPrices, tte, ivs,
+                 realizedPnL):
+        self.underlyings = underlyings
+        self.spots = np.asarray(spots, dtype=float)
+        self.strikes = np.asarray(strikes, dtype=float)
+        self.isCall = np.asarray(isCall, dtype=bool)
+        self.quantities = np.asarray(quantities, dtype=float)
+        self.entryPrices = np.asarray(entryPrices, dtype=float)
+        self.tte = np.asarray(tte, dtype=float)
+        self.ivs = np.asarray(ivs, dtype=float)
+        self.realizedPnL = realizedPnL
+        self.key = (
+            tuple(underlyings),
+            self.spots.tobytes(),
+            self.strikes.tobytes(),
+            self.isCall.tobytes(),
+            self.quantities.tobytes(),
+            self.entryPrices.tobytes(),
+            self.tte.tobytes(),
+            np.round(self.ivs, 4).tobytes(),
+            round(realizedPnL, 2),
+        )
+
+    def __len__(self):
+        return len(self.strikes)
+
+
+class ScenarioEngine:
+    """Prices a book over a (spot move x IV shift x days forward) grid in one vectorized evaluation.
+
+    Results are cached by the book (positions, spots and IV snapshot) and the grid, so repeated
+    refreshes of an unchanged book do not re-price it.
+    """
+
+    def __init__(self, maxCacheSize=32, defaultIV=0.15):
+        self.__maxCacheSize = maxCacheSize
+        self.__defaultIV = defaultIV
+        self.__cache = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def buildBook(self, positions, getOptionContract, optionData: dict, spotPrices: dict,
+                  dateTime: datetime.datetime) -> Book:
+        """Builds a book from strategy positions.
+
+        :param getOptionContract: A function returning the OptionContract of an instrument.
+        :param optionData: A dict of :class:`pyalgomate.strategies.OptionGreeks` keyed by symbol.
+        :param spotPrices: A dict of underlying prices keyed by underlying.
+        """
+        underlyings, spots, strikes, isCall, quantities, entryPrices, tte, ivs = (
+            [], [], [], [], [], [], [], [])
+        realizedPnL = 0.0
+        date = dateTime.date() if dateTime is not None else datetime.date.today()
+
+        for position in positions:
+            optionContract = getOptionContract(position.getInstrument())
+            if optionContract is None:
+                continue
+
+            if position.exitFilled():
+                realizedPnL += position.getPnL()
+                continue
+
+            spot = spotPrices.get(optionContract.underlying, None)
+            if spot is None:
+                continue
+
+            entryOrder = position.getEntryOrder()
+            optionGreeks = optionData.get(position.getInstrument(), None)
+            iv = optionGreeks.iv if optionGreeks is not None else math.nan
+
+            underlyings.append(optionContract.underlying)
+            spots.append(spot)
+            strikes.append(optionContract.strike)
+            isCall.append(optionContract.type == "c")
+            quantities.append(entryOrder.getQuantity() * (-1 if entryOrder.isSell() else 1))
+            entryPrices.append(entryOrder.getAvgFillPrice())
+            expiry = optionContract.expiry if optionContract.expiry is not None else date
+            tte.append(((expiry - date).days + 1) / 365.0)
+            ivs.append(iv)
+
+        ivs = np.asarray(ivs, dtype=float)
+        valid = np.isfinite(ivs) & (ivs > 0)
+        if not valid.all():
+            ivs[~valid] = np.median(ivs[valid]) if valid.any() else self.__defaultIV
+
+        return Book(underlyings, spots, strikes, isCall, quantities, entryPrices, tte, ivs,
+                    realizedPnL)
+
+    def __cached(self, key, compute):
+        with self.__lock:
+            ret = self.__cache.get(key, None)
+            if ret is not None:
+                self.__cache.move_to_end(key)
+                self.__hits += 1
+                return ret
+            self.__misses += 1
+
+        ret = compute()
+        ret.setflags(write=False)
+
+        with self.__lock:
+            self.__cache[key] = ret
+            while len(self.__cache) > self.__maxCacheSize:
+                self.__cache.popitem(last=False)
+        return ret
+
+    def evaluate(self, book: Book, spotMoves, ivShifts=(0.0,), daysForward=(0.0,)) -> np.ndarray:
+        """Returns the PnL of the book with shape (len(spotMoves), len(ivShifts), len(daysForward)).
+
+        :param spotMoves: Relative spot moves, e.g. np.linspace(-0.05, 0.05, 201).
+        :param ivShifts: Absolute IV shifts, e.g. (-0.02, 0, 0.02).
+        :param daysForward: Days to move every leg towards expiry. Legs past expiry are at intrinsic.
+        """
+        spotMoves = np.asarray(spotMoves, dtype=float)
+        ivShifts = np.asarray(ivShifts, dtype=float)
+        daysForward = np.asarray(daysForward, dtype=float)
+        key = ("evaluate", book.key, spotMoves.tobytes(), ivShifts.tobytes(), daysForward.tobytes())
+
+        def compute():
+            shape = (len(spotMoves), len(ivShifts), len(daysForward))
+            if len(book) == 0:
+                return np.full(shape, book.realizedPnL)
+
+            spot = book.spots[None, None, None, :] * (1.0 + spotMoves[:, None, None, None])
+            sigma = np.maximum(book.ivs[None, None, None, :] + ivShifts[None, :, None, None],
+                               MinimumVolatility)
+            tte = np.maximum(book.tte[None, None, None, :] - daysForward[None, None, :, None] / 365.0,
+                             0.0)
+            prices = blackScholesPrice(spot, book.strikes, tte, sigma, book.isCall)
+            return (prices - book.entryPrices) @ book.quantities + book.realizedPnL
+
+        return self.__cached(key, compute)
+
+    def expiryPayoff(self, book: Book, spotMoves) -> np.ndarray:
+        """Returns the PnL of the book at expiry of every leg for the given relative spot moves."""
+        spotMoves = np.asarray(spotMoves, dtype=float)
+        key = ("expiry", book.key, spotMoves.tobytes())
+
+        def compute():
+            spot = book.spots[None, :] * (1.0 + spotMoves[:, None])
+            intrinsic = np.where(book.isCall, np.maximum(spot - book.strikes, 0.0),
+                                 np.maximum(book.strikes - spot, 0.0))
+            return (intrinsic - book.entryPrices) @ book.quantities + book.realizedPnL
+
+        return self.__cached(key, compute)
+
+    def getCacheStats(self):
+        with self.__lock:
+            return {"size": len(self.__cache), "hits": self.__hits, "misses": self.__misses}
@@ -10,6 +10,7 @@ from pyalgotrade import logger, observer
 from pyalgotrade.broker import backtesting
 
 from pyalgomate.barfeed import BaseBarFeed
+from pyalgomate.barfeed.latency import StampedBars, getLatencyTracker
 from pyalgomate.core import dispatcher, resampled
 from pyalgomate.strategy import position
 from pyalgomate.core.dispatcher import LiveAsyncDispatcher, BacktestingAsyncDispatcher
@@ -62,6 +63,7 @@ class BaseStrategy(object):
     def reset(self):
         self.__activePositions = set()
         self.__closedPositions = set()
+        self.__updateHeldInstruments()
 
     def runAsync(self, coro, callback=None):
         return self.dispatcher.run(coro, callback)
@@ -104,14 +106,26 @@ class BaseStrategy(object):
         self.__activePositions.add(position)
         assert order.isActive()  # Why register an inactive order ?
         self.__orderToPosition[order] = position
+        self.__updateHeldInstruments()
 
     def unregisterPositionOrder(self, position, order):
         del self.__orderToPosition[order]
+        self.__updateHeldInstruments()
 
     def unregisterPosition(self, position):
         assert not position.isOpen()
         self.__activePositions.discard(position)
         self.__closedPositions.add(position)
+        self.__updateHeldInstruments()
+
+    def __updateHeldInstruments(self):
+        # Live feeds keep the instruments of open positions and orders subscribed
+        if hasattr(self.__barFeed, "setHeldInstruments"):
+            self.__barFeed.setHeldInstruments(
+                self,
+                {position.getInstrument() for position in self.__activePositions}
+                | {order.getInstrument() for order in self.__orderToPosition},
+            )
 
     def __notifyAnalyzers(self, lambdaExpression):
         for s in self.__analyzers:
@@ -137,6 +151,10 @@ class BaseStrategy(object):
             ret = bar.getPrice()
         return ret
 
+    def getBidAsk(self, instrument):
+        """Returns the best (bid, ask) of an instrument. Either is None when not available."""
+        return self.getFeed().getBestBidAsk(instrument)
+
     def getFeed(self) -> BaseBarFeed:
         """Returns the :class:`pyalgotrade.barfeed.BaseBarFeed` that this strategy is using."""
         return self.__barFeed
@@ -740,6 +758,14 @@ class BaseStrategy(object):
         # 3: Notify that the bars were processed.
         self.__barsProcessedEvent.emit(self, bars)
 
+        # 4: Let live feeds that track consumer lag know this strategy caught up.
+        acknowledgeBars = getattr(self.__barFeed, "acknowledgeBars", None)
+        if acknowledgeBars is not None:
+            acknowledgeBars(getattr(self, "strategyName", type(self).__name__))
+
+        if isinstance(bars, StampedBars):
+            getLatencyTracker().recordSince("dispatchToOnBars", bars.getStamps()["dispatch"])
+
     def run(self):
         """Call once (**and only once**) to run the strategy."""
         self.__dispatcher.run()
@@ -788,8 +814,18 @@ class BaseStrategy(object):
         :param frequency: The grouping frequency in seconds. Must be > 0.
         :param callback: A function similar to onBars that will be called when new bars are available.
         :rtype: :class:`pyalgotrade.barfeed.BaseBarFeed`.
+
+        .. note::
+            The bars are resampled by the resampling hub of the feed, shared with the other strategies
+            and frequencies. It uses the candles the feed builds for the frequency when there are,
+            published at the source for live feeds or precomputed for backtests.
         """
-        ret = resampled.ResampledBars(self.getFeed(), frequency, callback)
+        getResamplingHub = getattr(self.getFeed(), "getResamplingHub", None)
+        if getResamplingHub is not None:
+            # Resampled once for all the strategies on the feed
+            ret = getResamplingHub().subscribe(frequency, callback)
+        else:
+            ret = resampled.ResampledBars(self.getFeed(), frequency, callback)
         self.__resampledBarFeeds.append(ret)
         return ret
 
@@ -0,0 +1,257 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+"""
+
+import datetime
+import logging
+import math
+import threading
+from functools import lru_cache
+
+import numpy as np
+from scipy.optimize import least_squares
+from scipy.special import ndtr
+
+logger = logging.getLogger(__name__)
+
+
+def timeToExpiry(expiry: datetime.date, date: datetime.date) -> float:
+    # Same convention as the greeks calculation in BaseOptionsGreeksStrategy
+    return ((expiry - date).days + 1) / 365.0
+
+
+def sviTotalVariance(params, k):
+    a, b, rho, m, sigma = params
+    d = k - m
+    return a + b * (rho * d + np.sqrt(d * d + sigma * sigma))
+
+
+def fitSVI(k, w):
+    """Fits raw SVI parameters (a, b, rho, m, sigma) to total variance w at log moneyness k.
+
+    :returns: The parameters as a numpy array or None if the fit did not converge to a valid smile.
+    """
+    if len(k) < 5:
+        return None
+
+    # Total variances are tiny, they are fitted relative to their mean and a and b scaled back
+    scale = float(w.mean())
+    if not math.isfinite(scale) or scale <= 0:
+        return None
+    scaled = w / scale
+
+    spread = max(float(k.max() - k.min()), 1e-4)
+    x0 = np.array([max(float(scaled.min()) * 0.5, 1e-6), 0.1, -0.3, float(k[np.argmin(w)]), 0.1 * spread])
+    lower = [-float(scaled.max()), 0.0, -0.999, float(k.min()) - spread, 1e-4]
+    upper = [float(scaled.max()), 10.0 / scale, 0.999, float(k.max()) + spread, 10 * spread]
+
+    try:
+        result = least_squares(
+            lambda p: sviTotalVariance(p, k) - scaled,
+            np.clip(x0, lower, upper),
+            bounds=(lower, upper),
+            method="trf",
+        )
+    except Exception as e:
+        logger.debug(f"SVI fit failed. {e}")
+        return None
+
+    if not result.success:
+        return None
+
+    params = result.x
+    params[:2] *= scale
+    grid = np.linspace(k.min() - spread, k.max() + spread, 64)
+    if np.any(sviTotalVariance(params, grid) <= 0):
+        return None
+
+    return params
+
+
+class Smile:
+    """A fitted volatility smile for one underlying and expiry.
+
+    The smile is parameterised in total variance against log moneyness. SVI is used when there
+    are enough strikes to fit it, otherwise a quadratic in log moneyness.
+    """
+
+    DeltaGridSize = 401
+
+    def __init__(self, underlying, expiry, spot, tte, kind, params, kRange):
+        self.underlying = underlying
+        self.expiry = expiry
+        self.spot = spot
+        self.tte = tte
+        self.kind = kind
+        self.params = params
+        self.kRange = kRange
+        self.__deltaGrid = None
+
+    def totalVariance(self, k):
+        if self.kind == "svi":
+            w = sviTotalVariance(self.params, k)
+        else:
+            w = np.polyval(self.params, k)
+        return np.maximum(w, 1e-8)
+
+    def iv(self, strikes):
+        """Returns the fitted implied volatility for the given strike(s)."""
+        k = np.log(np.asarray(strikes, dtype=float) / self.spot)
+        return np.sqrt(self.totalVariance(k) / self.tte)
+
+    def delta(self, strikes, optionType):
+        """Returns the Black-Scholes delta for the given strike(s) using the fitted volatility."""
+        k = np.log(np.asarray(strikes, dtype=float) / self.spot)
+        totalStdDev = np.sqrt(self.totalVariance(k))
+        d1 = (-k + 0.5 * totalStdDev * totalStdDev) / totalStdDev
+        callDelta = ndtr(d1)
+        return callDelta if optionType == "c" else callDelta - 1.0
+
+    def __getDeltaGrid(self):
+        if self.__deltaGrid is None:
+            kMin, kMax = self.kRange
+            spread = max(kMax - kMin, 0.05)
+            k = np.linspace(kMin - spread, kMax + spread, Smile.DeltaGridSize)
+            strikes = self.spot * np.exp(k)
+            # Deltas decrease as strikes increase so reverse them for interpolation
+            self.__deltaGrid = (strikes[::-1], self.delta(strikes, "c")[::-1])
+        return self.__deltaGrid
+
+    def strikeForDelta(self, delta, optionType):
+        """Inverts the smile to find the strike(s) with the given delta.
+
+        Put deltas may be given either signed or as absolute values.
+        """
+        strikes, callDeltas = self.__getDeltaGrid()
+        delta = np.abs(np.asarray(delta, dtype=float))
+        callDelta = delta if optionType == "c" else 1.0 - delta
+        return np.interp(callDelta, callDeltas, strikes)
+
+    def __repr__(self):
+        return f"Smile(underlying={self.underlying}, expiry={self.expiry}, spot={self.spot}, tte={self.tte:.5f}, kind={self.kind})"
+
+
+class VolatilitySurface:
+    """Caches fitted smiles per (underlying, expiry).
+
+    A smile is only refit when the fraction of strikes whose IV moved by more than
+    ``ivTolerance`` reaches ``refitFraction``, or when the spot moved by more than
+    ``spotTolerance`` (as a fraction) since the last fit. The surface is safe to share
+    across strategies running in different threads.
+    """
+
+    def __init__(self, ivTolerance=0.005, refitFraction=0.2, spotTolerance=0.002):
+        self.__ivTolerance = ivTolerance
+        self.__refitFraction = refitFraction
+        self.__spotTolerance = spotTolerance
+        self.__lock = threading.Lock()
+        self.__smiles = dict()
+        self.__fittedQuotes = dict()
+        self.__fitCount = 0
+        self.__skipCount = 0
+
+    @staticmethod
+    def __collectQuotes(optionData, spotPrices):
+        chains = dict()
+        for optionGreeks in optionData.values():
+            optionContract = optionGreeks.optionContract
+            iv = optionGreeks.iv
+            if iv is None or not math.isfinite(iv) or iv <= 0:
+                continue
+            spot = spotPrices.get(optionContract.underlying, None)
+            if spot is None:
+                continue
+
+            # Prefer out of the money quotes as they are the liquid side of the chain
+            otm = (optionContract.type == "c") == (optionContract.strike >= spot)
+            chain = chains.setdefault((optionContract.underlying, optionContract.expiry), dict())
+            if otm or optionContract.strike not in chain:
+                chain[optionContract.strike] = iv
+        return chains
+
+    def __needsRefit(self, key, quotes, spot):
+        fitted = self.__fittedQuotes.get(key, None)
+        if fitted is None:
+            return True
+
+        fittedSpot, fittedIVs = fitted
+        if abs(spot - fittedSpot) > self.__spotTolerance * fittedSpot:
+            return True
+
+        changed = 0
+        for strike, iv in quotes.items():
+            previous = fittedIVs.get(strike, None)
+            if previous is None or abs(iv - previous) > self.__ivTolerance:
+                changed += 1
+        return changed >= self.__refitFraction * max(len(quotes), 1)
+
+    @staticmethod
+    def fit(underlying, expiry, spot, tte, quotes):
+        strikes = np.fromiter(quotes.keys(), dtype=float, count=len(quotes))
+        ivs = np.fromiter(quotes.values(), dtype=float, count=len(quotes))
+        k = np.log(strikes / spot)
+        w = ivs * ivs * tte
+        kRange = (float(k.min()), float(k.max()))
+
+        params = fitSVI(k, w)
+        if params is not None:
+            return Smile(underlying, expiry, spot, tte, "svi", params, kRange)
+
+        degree = min(2, len(quotes) - 1)
+        return Smile(underlying, expiry, spot, tte, "quadratic", np.polyfit(k, w, degree), kRange)
+
+    def update(self, dateTime: datetime.datetime, optionData: dict, spotPrices: dict):
+        """Refits the smiles whose quotes changed enough.
+
+        :param optionData: A dict of :class:`pyalgomate.strategies.OptionGreeks` keyed by symbol.
+        :param spotPrices: A dict of underlying prices keyed by underlying.
+        :returns: The list of (underlying, expiry) keys that were refit.
+        """
+        refit = []
+        for key, quotes in self.__collectQuotes(optionData, spotPrices).items():
+            underlying, expiry = key
+            if expiry is None or len(quotes) < 2:
+                continue
+            spot = spotPrices[underlying]
+
+            with self.__lock:
+                if not self.__needsRefit(key, quotes, spot):
+                    self.__skipCount += 1
+                    continue
+
+            tte = timeToExpiry(expiry, dateTime.date())
+            smile = self.fit(underlying, expiry, spot, tte, quotes)
+
+            with self.__lock:
+                self.__smiles[key] = smile
+                self.__fittedQuotes[key] = (spot, quotes)
+                self.__fitCount += 1
+            refit.append(key)
+
+        return refit
+
+    def getSmile(self, underlying, expiry) -> Smile:
+        with self.__lock:
+            return self.__smiles.get((underlying, expiry), None)
+
+    def iv(self, underlying, expiry, strikes):
+        smile = self.getSmile(underlying, expiry)
+        return smile.iv(strikes) if smile is not None else None
+
+    def strikeForDelta(self, underlying, expiry, delta, optionType):
+        smile = self.getSmile(underlying, expiry)
+        return smile.strikeForDelta(delta, optionType) if smile is not None else None
+
+    def getStats(self):
+        with self.__lock:
+            return {
+                "smiles": len(self.__smiles),
+                "fits": self.__fitCount,
+                "skipped": self.__skipCount,
+            }
+
+
+@lru_cache(maxsize=None)
+def getVolatilitySurface() -> VolatilitySurface:
+    """Returns the surface shared by all the strategies in this process."""
+    return VolatilitySurface()
@@ -7,13 +7,21 @@ import numpy as np
 import pandas as pd
 import plotly.express as px
 import pyalgotrade.bar
-from py_vollib_vectorized import get_all_greeks, vectorized_implied_volatility
 from pyalgotrade import broker
 from pyalgotrade.broker import Order
 
 import pyalgomate.utils as utils
+from pyalgomate.barfeed.latency import getLatencyTracker
 from pyalgomate.brokers import QuantityTraits
 from pyalgomate.core import State
+from pyalgomate.core.greeks import (
+    BackgroundGreeksCalculator,
+    GreeksSnapshot,
+    calculateGreeks,
+)
+from pyalgomate.core.risk import RiskAggregator, getRiskAggregator
+from pyalgomate.core.scenario import Book, ScenarioEngine
+from pyalgomate.core.volatility import Smile, VolatilitySurface, getVolatilitySurface
 from pyalgomate.core.position import LongOpenPosition, ShortOpenPosition
 from pyalgomate.core.slippage_tracker import SlippageTracker
 from pyalgomate.core.strategy import BaseStrategy
@@ -35,6 +43,7 @@ class BaseOptionsGreeksStrategy(BaseStrategy):
         telegramBot: TelegramBot = None,
         telegramChannelId=None,
         telegramMessageThreadId=None,
+        backgroundGreeks=False,
     ):
         super(BaseOptionsGreeksStrategy, self).__init__(feed, broker)
         self.marketStartTime = datetime.time(hour=9, minute=15)
@@ -52,9 +61,34 @@ class BaseOptionsGreeksStrategy(BaseStrategy):
         self.mfe = dict()
 
         self.__optionData = dict()
+        # The surface is only updated once the option data changed, the fitted smiles are reused
+        # until then
+        self.__surfaceStale = True
+        self.__deltaStrikes = dict()
         self.overallPnL = 0
         self.state = State.LIVE
 
+        self.__greeksCalculator = None
+        self.__greeksSnapshot = None
+        if backgroundGreeks:
+            if self.isBacktest():
+                self.log(
+                    "Background greeks are ignored while backtesting to keep results deterministic",
+                    sendToTelegram=False,
+                )
+            else:
+                self.__greeksCalculator = BackgroundGreeksCalculator(
+                    self.__buildOptionGreeks,
+                    useProcess=backgroundGreeks == "process",
+                )
+
+        self.__scenarioEngine = ScenarioEngine()
+
+        self.__riskAggregator = None
+        if not self.isBacktest():
+            self.__riskAggregator = getRiskAggregator()
+            broker.getOrderUpdatedEvent().subscribe(self.__onRiskOrderEvent)
+
         self.__slippageTracker = None
         if not self.isBacktest():
             self.log("Initializing slippage tracker", sendToTelegram=False)
@@ -190,6 +224,19 @@ class BaseOptionsGreeksStrategy(BaseStrategy):
                 # Sleep so that the order notifications are acknowledged
                 time.sleep(2)
 
+    def __onRiskOrderEvent(self, _broker, orderEvent: broker.OrderEvent):
+        instrument = orderEvent.getOrder().getInstrument()
+        if instrument not in self.__optionContracts:
+            optionContract = self.getBroker().getOptionContract(instrument)
+            if optionContract is not None:
+                self.__optionContracts[instrument] = optionContract
+        self.__riskAggregator.onOrderEvent(
+            self.strategyName, orderEvent, self.__optionContracts.get(instrument, None)
+        )
+
+    def getRiskAggregator(self) -> RiskAggregator:
+        return self.__riskAggregator
+
     def __onOrderEvent(self, _broker, orderEvent: broker.OrderEvent):
         order: broker.Order = orderEvent.getOrder()
         if orderEvent.getEventType() in [
@@ -217,6 +264,9 @@ class BaseOptionsGreeksStrategy(BaseStrategy):
         super().reset()
 
         self.__optionData = dict()
+        self.__surfaceStale = True
+        self.__deltaStrikes = dict()
+        self.__greeksSnapshot = None
         self.overallPnL = 0
         self.state = State.LIVE
 
@@ -245,6 +295,26 @@ class BaseOptionsGreeksStrategy(BaseStrategy):
             sendToTelegram=False,
         )
 
+        if self.__greeksCalculator is not None:
+            self.log(
+                f"Background greeks metrics - {self.getGreeksMetrics()}",
+                logging.DEBUG,
+                sendToTelegram=False,
+            )
+
+        getConflationStats = getattr(self.getFeed(), "getConflationStats", None)
+        if getConflationStats is not None:
+            self.log(
+                f"Feed conflation stats - {getConflationStats()}",
+                logging.DEBUG,
+                sendToTelegram=False,
+            )
+            self.log(
+                f"Feed latency\n{getLatencyTracker().format()}",
+                logging.DEBUG,
+                sendToTelegram=False,
+            )
+
         # Calculate MAE and MFE
         for position in list(self.getActivePositions()):
             pnl = position.getPnL()
@@ -403,6 +473,12 @@ class BaseOptionsGreeksStrategy(BaseStrategy):
     def onStart(self):
         super().onStart()
 
+    def onFinish(self, bars):
+        super().onFinish(bars)
+
+        if self.__greeksCalculator is not None:
+            self.__greeksCalculator.shutdown()
+
     def onEnterOk(self, position: position.Position):
         execInfo = position.getEntryOrder().getExecutionInfo()
         action = "Buy" if position.getEntryOrder().isBuy() else "Sell"
@@ -637,7 +713,7 @@ class BaseOptionsGreeksStrategy(BaseStrategy):
 
         return delta
 
-    def getGreeks(self, instruments):
+    def __collectGreeksInputs(self, instruments):
         # Collect all the necessary data into NumPy arrays
         optionContracts = []
         underlyingPrices = []
@@ -646,14 +722,13 @@ class BaseOptionsGreeksStrategy(BaseStrategy):
         expiries = []
         types = []
         ois = []
-        greeksData = {}
         for instrument in instruments:
             optionContract = self.getBroker().getOptionContract(instrument)
 
             if optionContract is not None:
                 underlyingPrice = self.getLastPrice(optionContract.underlying)
                 if underlyingPrice is None:
-                    return
+                    return None
                 underlyingPrices.append(underlyingPrice)
                 optionContracts.append(optionContract)
                 strikes.append(optionContract.strike)
@@ -666,77 +741,168 @@ class BaseOptionsGreeksStrategy(BaseStrategy):
                     expiry = optionContract.expiry
                 expiries.append(((expiry - bar.getDateTime().date()).days + 1) / 365.0)
                 types.append(optionContract.type)
-        underlyingPrices = np.array(underlyingPrices)
-        strikes = np.array(strikes)
-        prices = np.array(prices)
-        expiries = np.array(expiries)
-        types = np.array(types)
-
-        try:
-            # Calculate implied volatilities
-            iv = vectorized_implied_volatility(
-                prices,
-                underlyingPrices,
-                strikes,
-                expiries,
-                0.0,
-                types,
-                q=0,
-                model="black_scholes_merton",
-                return_as="numpy",
-                on_error="ignore",
-            )
 
-            # Calculate greeks
-            greeks = get_all_greeks(
-                types,
-                underlyingPrices,
-                strikes,
-                expiries,
-                0.0,
-                iv,
-                0.0,
-                model="black_scholes",
-                return_as="dict",
-            )
-        except:
-            return
+        return (
+            optionContracts,
+            np.array(prices),
+            np.array(underlyingPrices),
+            np.array(strikes),
+            np.array(expiries),
+            np.array(types),
+            ois,
+        )
 
-        # Store the results
+    def __buildOptionGreeks(self, inputs, iv, greeks):
+        optionContracts, prices, _, _, _, _, ois = inputs
+        greeksData = {}
         for i in range(len(optionContracts)):
             optionContract = optionContracts[i]
             symbol = optionContract.symbol
-            deltaVal = greeks["delta"][i]
-            gammaVal = greeks["gamma"][i]
-            thetaVal = greeks["theta"][i]
-            vegaVal = greeks["vega"][i]
-            ivVal = iv[i]
+            oi = ois[i]
 
-            if ois[i] <= 0:
-                if symbol in self.__optionData:
-                    ois[i] = self.__optionData[symbol].oi
+            if oi <= 0:
+                previous = self.__optionData.get(symbol, None)
+                if previous is not None:
+                    oi = previous.oi
 
             greeksData[symbol] = OptionGreeks(
                 optionContract,
                 prices[i],
-                deltaVal,
-                gammaVal,
-                thetaVal,
-                vegaVal,
-                ivVal,
-                ois[i],
+                greeks["delta"][i],
+                greeks["gamma"][i],
+                greeks["theta"][i],
+                greeks["vega"][i],
+                iv[i],
+                oi,
             )
 
         return greeksData
 
+    def getGreeks(self, instruments):
+        inputs = self.__collectGreeksInputs(instruments)
+        if inputs is None:
+            return {}
+
+        result = calculateGreeks(*inputs[1:6])
+        if result is None:
+            return {}
+
+        iv, greeks = result
+        return self.__buildOptionGreeks(inputs, iv, greeks)
+
     def __calculateGreeks(self, bars):
-        for symbol, greeks in self.getGreeks(bars.getInstruments()):
-            self.__optionData[symbol] = greeks
+        if self.__greeksCalculator is None:
+            self.__optionData.update(self.getGreeks(bars.getInstruments()))
+            self.__surfaceStale = True
+        else:
+            inputs = self.__collectGreeksInputs(bars.getInstruments())
+            if inputs is not None:
+                self.__greeksCalculator.submit(bars.getDateTime(), inputs)
+
+            snapshot = self.__greeksCalculator.getSnapshot()
+            if snapshot is not None and snapshot is not self.__greeksSnapshot:
+                self.__greeksSnapshot = snapshot
+                self.__optionData.update(snapshot.optionData)
+                self.__surfaceStale = True
+
+        if self.__riskAggregator is not None:
+            self.__riskAggregator.updateGreeks(self.__optionData)
 
     def getOptionData(self, bars) -> dict:
         self.__calculateGreeks(bars)
         return self.__optionData
 
+    def getGreeksSnapshot(self) -> GreeksSnapshot:
+        """Returns the background greeks snapshot backing the option data, or None
+        when greeks are calculated inline."""
+        return self.__greeksSnapshot
+
+    def getGreeksSnapshotAge(self):
+        """Returns the age in seconds of the option data when greeks are calculated
+        in the background, otherwise 0 as the option data is always current."""
+        if self.__greeksCalculator is None:
+            return 0
+        return (
+            self.__greeksSnapshot.getAge() if self.__greeksSnapshot is not None else None
+        )
+
+    def getGreeksMetrics(self):
+        if self.__greeksCalculator is None:
+            return None
+        return self.__greeksCalculator.getMetrics()
+
+    def getVolatilitySurface(self) -> VolatilitySurface:
+        """Refits the shared volatility surface from the latest option data where the quotes
+        changed enough and returns it."""
+        surface = getVolatilitySurface()
+        if not self.__surfaceStale or self.getCurrentDateTime() is None:
+            return surface
+
+        spotPrices = dict()
+        for optionGreeks in self.__optionData.values():
+            underlying = optionGreeks.optionContract.underlying
+            if underlying not in spotPrices:
+                spotPrices[underlying] = self.getLastPrice(underlying)
+        spotPrices = {k: v for k, v in spotPrices.items() if v is not None}
+
+        surface.update(self.getCurrentDateTime(), self.__optionData, spotPrices)
+        self.__surfaceStale = False
+        return surface
+
+    def getSmile(self, underlying, expiry) -> Smile:
+        return self.getVolatilitySurface().getSmile(underlying, expiry)
+
+    def getNearestDeltaStrike(
+        self, optionType, deltaValue, expiry, underlying, strikeDifference
+    ):
+        """Returns the listed strike closest to the given delta using the fitted smile, which is
+        less noisy than comparing raw per strike deltas."""
+        smile = self.getSmile(underlying, expiry)
+        if smile is None:
+            return None
+
+        # Valid until the smile is refit
+        key = (optionType, deltaValue, expiry, underlying, strikeDifference)
+        cached = self.__deltaStrikes.get(key, None)
+        if cached is not None and cached[0] is smile:
+            return cached[1]
+
+        strike = self.getATMStrike(float(smile.strikeForDelta(deltaValue, optionType)), strikeDifference)
+        self.__deltaStrikes[key] = (smile, strike)
+        return strike
+
+    def buildScenarioBook(self, positions) -> Book:
+        """Builds a scenario book of the given positions from the latest option data."""
+        optionData = self.__optionData
+        missing = [
+            position.getInstrument()
+            for position in positions
+            if position.getInstrument() not in optionData
+        ]
+        if len(missing):
+            optionData = dict(optionData)
+            optionData.update(self.getGreeks(missing))
+
+        spotPrices = dict()
+        for position in positions:
+            optionContract = self.getBroker().getOptionContract(position.getInstrument())
+            if optionContract is not None and optionContract.underlying not in spotPrices:
+                spotPrices[optionContract.underlying] = self.getLastPrice(
+                    optionContract.underlying
+                )
+        spotPrices = {k: v for k, v in spotPrices.items() if v is not None}
+
+        return self.__scenarioEngine.buildBook(
+            positions,
+            self.getBroker().getOptionContract,
+            optionData,
+            spotPrices,
+            self.getCurrentDateTime(),
+        )
+
+    def getScenarioEngine(self) -> ScenarioEngine:
+        return self.__scenarioEngine
+
     def getATMStrike(self, ltp, strikeDifference):
         inputPrice = int(ltp)
         remainder = int(inputPrice % strikeDifference)
@@ -797,10 +963,15 @@ class BaseOptionsGreeksStrategy(BaseStrategy):
                 False,
             )
 
+        # Price off the side of the book the exit trades against, LTP can be far from it on
+        # illiquid strikes
+        bid, ask = self.getBidAsk(position.getInstrument())
         if position.getEntryOrder().isBuy():
-            limitPrice = lastBar.getClose() * (1 - (marketProtectionPercentage / 100.0))
+            referencePrice = bid if bid is not None else lastBar.getClose()
+            limitPrice = referencePrice * (1 - (marketProtectionPercentage / 100.0))
         else:
-            limitPrice = lastBar.getClose() * (1 + (marketProtectionPercentage / 100.0))
+            referencePrice = ask if ask is not None else lastBar.getClose()
+            limitPrice = referencePrice * (1 + (marketProtectionPercentage / 100.0))
 
         limitPrice = limitPrice - (limitPrice % tickSize)
 
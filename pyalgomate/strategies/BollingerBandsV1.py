@@ -8,6 +8,7 @@ import pandas as pd
 import pyalgomate.utils as utils
 from pyalgomate.strategies.BaseOptionsGreeksStrategy import BaseOptionsGreeksStrategy
 from pyalgomate.core import State
+from pyalgomate.technical.warmup import warm_up
 from pyalgomate.cli import CliMain
 import pyalgotrade.bar
 
@@ -49,9 +50,7 @@ class BollingerBandsV1(BaseOptionsGreeksStrategy):
         historicalData = self.getBroker().getHistoricalData(self.underlying, datetime.datetime.now() -
                                                             datetime.timedelta(days=20), str(self.resampleFrequency).replace("T", ""))
 
-        for index, row in historicalData.iterrows():
-            self.addBollingerBands(row['Date/Time'], row['Open'], row['High'],
-                                   row['Low'], row['Close'], row['Volume'], row['Open Interest'])
+        self.warmUpBollingerBands(historicalData)
 
     def __reset__(self):
         super().reset()
@@ -59,7 +58,7 @@ class BollingerBandsV1(BaseOptionsGreeksStrategy):
         self.positionBullish = []
         self.positionBearish = []
 
-    def addBollingerBands(self, dateTime, open, high, low, close, volume, openInterest):
+    def addResampledColumns(self):
         if self.underlying not in self.resampledDict:
             self.resampledDict[self.underlying] = {
                 'Date/Time': [],
@@ -70,6 +69,18 @@ class BollingerBandsV1(BaseOptionsGreeksStrategy):
                 'Volume': [],
                 'Open Interest': []
             }
+
+    def warmUpBollingerBands(self, historicalData: pd.DataFrame):
+        self.addResampledColumns()
+        for column, values in self.resampledDict[self.underlying].items():
+            values.extend(historicalData[column].tolist())
+
+        if self.underlying not in self.bollingBands:
+            self.bollingBands[self.underlying] = warm_up(
+                BB(self.bollingerBandPeriod, self.bollingerBandStdDevMultiplier), historicalData)
+
+    def addBollingerBands(self, dateTime, open, high, low, close, volume, openInterest):
+        self.addResampledColumns()
         self.resampledDict[self.underlying]['Date/Time'].append(
             dateTime)
         self.resampledDict[self.underlying]['Open'].append(open)
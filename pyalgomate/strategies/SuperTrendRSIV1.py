@@ -9,6 +9,7 @@ import pyalgotrade.bar
 import pyalgomate.utils as utils
 from pyalgomate.strategies.BaseOptionsGreeksStrategy import BaseOptionsGreeksStrategy
 from pyalgomate.core import State
+from pyalgomate.technical.warmup import warm_up
 
 logger = logging.getLogger(__file__)
 
@@ -69,9 +70,7 @@ class SuperTrendRSIV1(BaseOptionsGreeksStrategy):
         self.indicators['rsi'][self.underlying] = RSI(
             self.rsiPeriod)
 
-        for index, row in historicalData.iterrows():
-            self.addIndicators(row['Date/Time'], row['Open'], row['High'],
-                               row['Low'], row['Close'], row['Volume'], row['Open Interest'])
+        self.warmUpIndicators(historicalData)
 
         self.resampleBarFeed(
             5 * pyalgotrade.bar.Frequency.MINUTE, self.on5MinBars)
@@ -82,7 +81,7 @@ class SuperTrendRSIV1(BaseOptionsGreeksStrategy):
         self.positionBullish = None
         self.positionBearish = None
 
-    def addIndicators(self, dateTime, open, high, low, close, volume, openInterest):
+    def addResampledColumns(self):
         if self.underlying not in self.resampledDict:
             self.resampledDict[self.underlying] = {
                 'Date/Time': [],
@@ -93,6 +92,17 @@ class SuperTrendRSIV1(BaseOptionsGreeksStrategy):
                 'Volume': [],
                 'Open Interest': []
             }
+
+    def warmUpIndicators(self, historicalData: pd.DataFrame):
+        self.addResampledColumns()
+        for column, values in self.resampledDict[self.underlying].items():
+            values.extend(historicalData[column].tolist())
+
+        warm_up(self.indicators['supertrend'][self.underlying], historicalData)
+        warm_up(self.indicators['rsi'][self.underlying], historicalData)
+
+    def addIndicators(self, dateTime, open, high, low, close, volume, openInterest):
+        self.addResampledColumns()
         self.resampledDict[self.underlying]['Date/Time'].append(
             dateTime)
         self.resampledDict[self.underlying]['Open'].append(open)
@@ -10,6 +10,7 @@ import pyalgomate.utils as utils
 from pyalgomate.strategies.BaseOptionsGreeksStrategy import BaseOptionsGreeksStrategy
 from pyalgomate.core import State
 from pyalgomate.core import resampled
+from pyalgomate.technical.warmup import warm_up
 
 class SuperTrendV1(BaseOptionsGreeksStrategy):
     def __init__(self, feed, broker, underlying, strategyName=None,
@@ -57,8 +58,7 @@ class SuperTrendV1(BaseOptionsGreeksStrategy):
         # get historical data
         historicalData = self.getHistoricalData(self.underlying, datetime.timedelta(days=30), str(self.resampleFrequency))
 
-        for index, row in historicalData.iterrows():
-            self.addSuperTrend(row['Date/Time'], row['Open'], row['High'], row['Low'], row['Close'], row['Volume'])
+        warm_up(self.supertrend, historicalData)
 
     def addSuperTrend(self, dateTime, open, high, low, close, volume):
         self.supertrend.add(OHLCV(open, high, low, close, volume, dateTime))
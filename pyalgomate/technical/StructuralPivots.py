@@ -12,6 +12,8 @@ class Bar:
 
 
 class StructuralPivots:
+    """Keeps every bar, :class:`pyalgomate.technical.pivots.StreamingStructuralPivots` finds the same pivots in O(1) per bar."""
+
     def __init__(self, lookupPeriod: int = 2):
         self.lookupPeriod = lookupPeriod
         self.data = list()
@@ -13,6 +13,8 @@ class Bar:
 
 
 class SwingPivotsJSP:
+    """Keeps every bar, :class:`pyalgomate.technical.pivots.StreamingSwingPivotsJSP` finds the same pivots in O(1) per bar."""
+
     def __init__(self):
         self.data = list()
         self.pivotLows = list()
@@ -1,20 +1,90 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Type, Union
+from typing import Any, Dict, List, Optional, Type, Union
 
+import numpy as np
+import pandas as pd
 from talipp.ohlcv import OHLCV
 
+CANDLE_DTYPE = np.dtype(
+    [
+        ("time", "datetime64[ns]"),
+        ("open", "f8"),
+        ("high", "f8"),
+        ("low", "f8"),
+        ("close", "f8"),
+        ("volume", "f8"),
+    ]
+)
+
+DEFAULT_CAPACITY = 5000
+
 
 @dataclass
 class IndicatorConfig:
     use_ohlcv: bool
 
 
+class CandleBuffer:
+    """Keeps the last `capacity` candles of a series in a NumPy array of CANDLE_DTYPE.
+
+    The array holds twice the capacity, so the retained candles are always contiguous and windows
+    over them are views. When the array is full the retained candles are moved to its front, which
+    is amortized O(1) per candle.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity < 1:
+            raise ValueError(f"Invalid capacity {capacity}.")
+        self.capacity = capacity
+        self._values = np.zeros(2 * capacity, dtype=CANDLE_DTYPE)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    def append(self, dateTime: datetime, open: float, high: float, low: float, close: float, volume: float):
+        if self._end == len(self._values):
+            keep = self.capacity - 1
+            self._values[:keep] = self._values[self._end - keep:self._end]
+            self._start, self._end = 0, keep
+        self._values[self._end] = (dateTime, open, high, low, close, volume)
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+
+    def extend(self, dateTimes, opens, highs, lows, closes, volumes):
+        """Appends candles given as columns, oldest first."""
+        values = np.empty(min(len(opens), self.capacity), dtype=CANDLE_DTYPE)
+        count = len(values)
+        if count == 0:
+            return
+        for name, column in zip(CANDLE_DTYPE.names, (dateTimes, opens, highs, lows, closes, volumes)):
+            values[name] = np.asarray(column)[-count:]
+        window = np.concatenate((self._values[self._start:self._end], values))[-self.capacity:]
+        self._values[:len(window)] = window
+        self._start, self._end = 0, len(window)
+
+    def get_window(self, start_index: int = 0, end_index: int = None) -> np.recarray:
+        """Returns a view of the retained candles, sliced like a list. Fields are accessible as
+        attributes, e.g. window.close or window[-1].close."""
+        return self._values[self._start:self._end][start_index:end_index].view(np.recarray)
+
+
 class IndicatorManager:
-    def __init__(self):
+    """Keeps the candles and the indicators of every instrument and timeframe.
+
+    Only the last `capacity` candles of a series are kept and the values of its indicators are
+    purged the same way, so memory does not grow with the length of the session. The capacity must
+    be larger than the lookback of the indicators. None keeps everything.
+    """
+
+    def __init__(self, capacity: Optional[int] = DEFAULT_CAPACITY):
+        self.capacity = capacity
         self.indicators: Dict[int, Dict[str, Dict[Type, Any]]] = {}
         self.indicator_configs: Dict[Type, IndicatorConfig] = {}
-        self.candles: Dict[int, Dict[str, List[OHLCV]]] = {}
+        self.candles: Dict[int, Dict[str, Union[CandleBuffer, List[OHLCV]]]] = {}
 
     def register_indicator(self, indicator_class: Type, use_ohlcv: bool):
         """Register a new indicator type."""
@@ -34,7 +104,9 @@ class IndicatorManager:
         if instrument not in self.indicators[timeframe]:
             self.indicators[timeframe][instrument] = {}
         if instrument not in self.candles[timeframe]:
-            self.candles[timeframe][instrument] = []
+            self.candles[timeframe][instrument] = (
+                CandleBuffer(self.capacity) if self.capacity is not None else []
+            )
 
     def add_indicator(
         self,
@@ -85,9 +157,45 @@ class IndicatorManager:
         ohlcv = OHLCV(
             time=dateTime, open=open, high=high, low=low, close=close, volume=volume
         )
-        self.candles[timeframe][instrument].append(ohlcv)
+        candles = self.candles[timeframe][instrument]
+        if isinstance(candles, CandleBuffer):
+            candles.append(dateTime, open, high, low, close, volume)
+        else:
+            candles.append(ohlcv)
         self._update_indicators(timeframe, instrument, ohlcv)
 
+    def warm_up(self, timeframe: int, instrument: str, df: pd.DataFrame):
+        """Adds historical candles, with Date/Time, Open, High, Low, Close and Volume columns, oldest
+        first, to the candles and the indicators of an instrument. The indicators must have no values
+        yet. See :func:`pyalgomate.technical.warmup.warm_up`."""
+        from pyalgomate.technical.warmup import warm_up  # Lazy import
+
+        if (
+            timeframe not in self.indicators
+            or instrument not in self.indicators[timeframe]
+        ):
+            raise ValueError(
+                f"Timeframe {timeframe} or instrument {instrument} not found. Add them first using add_timeframe() and add_instrument()."
+            )
+
+        candles = self.candles[timeframe][instrument]
+        if isinstance(candles, CandleBuffer):
+            candles.extend(
+                pd.to_datetime(df["Date/Time"]).to_numpy(dtype="datetime64[ns]"),
+                *(df[column].to_numpy(dtype=np.float64) for column in ("Open", "High", "Low", "Close", "Volume")),
+            )
+        else:
+            candles.extend(
+                OHLCV(time=dateTime, open=open, high=high, low=low, close=close, volume=volume)
+                for dateTime, open, high, low, close, volume in zip(
+                    *(df[column].tolist() for column in ("Date/Time", "Open", "High", "Low", "Close", "Volume"))
+                )
+            )
+
+        keep = self.capacity if self.capacity is not None else len(df)
+        for indicator_class, indicator in self.indicators[timeframe][instrument].items():
+            warm_up(indicator, df, use_ohlcv=self.indicator_configs[indicator_class].use_ohlcv, keep=keep)
+
     def is_instrument_registered(self, timeframe: int, instrument: str):
         return timeframe in self.indicators and instrument in self.indicators[timeframe]
 
@@ -146,13 +254,17 @@ class IndicatorManager:
         instrument: str,
         start_index: int = 0,
         end_index: int = None,
-    ) -> List[OHLCV]:
+    ) -> Union[np.recarray, List[OHLCV]]:
+        """Returns the retained candles sliced like a list, a view over them unless the manager keeps
+        everything. Indexes are relative to the oldest retained candle."""
         if timeframe not in self.candles or instrument not in self.candles[timeframe]:
             raise ValueError(
                 f"Candles not found for instrument {instrument} in timeframe {timeframe}."
             )
 
         candles = self.candles[timeframe][instrument]
+        if isinstance(candles, CandleBuffer):
+            return candles.get_window(start_index, end_index)
         if end_index is None:
             return candles[start_index:]
         return candles[start_index:end_index]
@@ -162,6 +274,7 @@ class IndicatorManager:
             instrument
         ].items():
             self._calculate_indicator(indicator_class, indicator, ohlcv)
+            self._purge_indicator(indicator)
 
     def _calculate_indicator(self, indicator_class: Type, indicator: Any, ohlcv: OHLCV):
         indicator_config = self.indicator_configs[indicator_class]
@@ -170,3 +283,11 @@ class IndicatorManager:
             indicator.add(ohlcv)
         else:
             indicator.add(ohlcv.close)
+
+    def _purge_indicator(self, indicator: Any):
+        # Purged in batches down to the capacity, amortized O(1) per value
+        if self.capacity is None or not hasattr(indicator, "purge_oldest"):
+            return
+        size = len(indicator.input_values)
+        if size >= 2 * self.capacity:
+            indicator.purge_oldest(size - self.capacity)
@@ -0,0 +1,358 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Streaming versions of :class:`pyalgomate.technical.StructuralPivots.StructuralPivots` and
+:class:`pyalgomate.technical.SwingPivotsJSP.SwingPivotsJSP`, with the same pivots.
+
+Adding a bar is O(1) amortized and only the bars that can still be part of a pivot are kept:
+
+* The local extremes come from monotonic deques over the lookup window.
+* The lowest low since the last large pivot high, and the highest high since the last large pivot
+  low, come from monotonic deques trimmed as large pivots are added.
+
+The batch mode finds the local extremes of a whole series in one vectorized pass, then adds the
+bars with them. Bars are expected to have distinct datetimes, as the original classes tell bars
+apart by value.
+"""
+
+import collections
+import datetime
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from pyalgomate.technical import StructuralPivots as structuralpivots
+from pyalgomate.technical import SwingPivotsJSP as swingpivotsjsp
+
+
+def lowOf(bar):
+    return bar.low
+
+
+def negatedHighOf(bar):
+    return -bar.high
+
+
+class WindowExtreme:
+    """Tells whether a bar is the only one with the lowest value in the last `size` bars.
+
+    Values are kept increasing, equal values included, so the front is the oldest lowest value and
+    the next one tells whether it is tied.
+    """
+
+    def __init__(self, size: int, value):
+        self.__size = size
+        self.__value = value
+        self.__items = collections.deque()
+
+    def push(self, index: int, bar):
+        value = self.__value(bar)
+        items = self.__items
+        while len(items) and items[-1][1] > value:
+            items.pop()
+        items.append((index, value))
+        while items[0][0] <= index - self.__size:
+            items.popleft()
+
+    def isOnlyExtreme(self, index: int) -> bool:
+        items = self.__items
+        return items[0][0] == index and (len(items) == 1 or items[1][1] > items[0][1])
+
+
+class ExtremeSince:
+    """The bar with the lowest value among the bars pushed after a boundary index, the newest one of
+    equal values. Boundaries must not go back, the bars up to a boundary are dropped."""
+
+    def __init__(self, value):
+        self.__value = value
+        self.__items = collections.deque()
+
+    def push(self, index: int, bar):
+        value = self.__value(bar)
+        items = self.__items
+        while len(items) and items[-1][1] >= value:
+            items.pop()
+        items.append((index, value, bar))
+
+    def get(self, after: int):
+        """Returns (index, bar) or (None, None) when no bar was pushed after the boundary."""
+        items = self.__items
+        while len(items) and items[0][0] <= after:
+            items.popleft()
+        return (items[0][0], items[0][2]) if len(items) else (None, None)
+
+
+def findLocalExtremes(highs: np.ndarray, lows: np.ndarray, lookupPeriod: int):
+    """Returns the boolean arrays of the bars with a high above, and a low below, those of the
+    lookupPeriod bars on each side."""
+    isTop = np.zeros(len(highs), dtype=bool)
+    isBottom = np.zeros(len(lows), dtype=bool)
+    size = 2 * lookupPeriod + 1
+    if len(highs) < size:
+        return isTop, isBottom
+
+    others = np.r_[0:lookupPeriod, lookupPeriod + 1:size]
+    highWindows = sliding_window_view(np.asarray(highs, dtype=np.float64), size)
+    lowWindows = sliding_window_view(np.asarray(lows, dtype=np.float64), size)
+    isTop[lookupPeriod:-lookupPeriod] = highWindows[:, lookupPeriod] > highWindows[:, others].max(axis=1)
+    isBottom[lookupPeriod:-lookupPeriod] = lowWindows[:, lookupPeriod] < lowWindows[:, others].min(axis=1)
+    return isTop, isBottom
+
+
+class BasePivots:
+    def __init__(self, lookupPeriod: int):
+        self.lookupPeriod = lookupPeriod
+        self.pivotLows = list()
+        self.pivotHighs = list()
+        self.largePivotLows = list()
+        self.largePivotHighs = list()
+
+        self._window = collections.deque(maxlen=2 * lookupPeriod + 1)
+        self._count = 0
+        self.__tops = WindowExtreme(2 * lookupPeriod + 1, negatedHighOf)
+        self.__bottoms = WindowExtreme(2 * lookupPeriod + 1, lowOf)
+        self.__pushed = -1
+        # The bars before the current one, for the lowest low and the highest high since large pivots
+        self._lowestSince = ExtremeSince(lowOf)
+        self._highestSince = ExtremeSince(negatedHighOf)
+
+    def getPivotHighs(self):
+        return self.pivotHighs
+
+    def getPivotLows(self):
+        return self.pivotLows
+
+    def getLargePivotHighs(self):
+        return self.largePivotHighs
+
+    def getLargePivotLows(self):
+        return self.largePivotLows
+
+    def getBars(self):
+        """Returns the last bars, those of the lookup window."""
+        return list(self._window)
+
+    def createBar(self, dateTime, open, high, low, close):
+        raise NotImplementedError()
+
+    def add_input_value(self, dateTime: datetime.datetime, open: float, high: float, low: float, close: float):
+        bar = self.createBar(dateTime, open, high, low, close)
+        index = self._count
+        self.__tops.push(index, bar)
+        self.__bottoms.push(index, bar)
+        self.__pushed = index
+        middle = index - self.lookupPeriod
+        isFull = index + 1 >= 2 * self.lookupPeriod + 1
+        self.__add(bar, isFull and self.__tops.isOnlyExtreme(middle), isFull and self.__bottoms.isOnlyExtreme(middle))
+
+    def add_input_values(self, dateTimes, opens, highs, lows, closes):
+        """Adds a series of bars, finding their local extremes in one vectorized pass."""
+        isTop, isBottom = findLocalExtremes(highs, lows, self.lookupPeriod)
+        # The first bars complete the window of the last bars already added
+        count = min(2 * self.lookupPeriod, len(highs))
+        for i in range(count):
+            self.add_input_value(dateTimes[i], opens[i], highs[i], lows[i], closes[i])
+
+        lookupPeriod = self.lookupPeriod
+        for i in range(count, len(highs)):
+            bar = self.createBar(dateTimes[i], opens[i], highs[i], lows[i], closes[i])
+            self.__add(bar, bool(isTop[i - lookupPeriod]), bool(isBottom[i - lookupPeriod]))
+
+        # Bring the window extremes up to date, for the bars added next
+        for index, bar in enumerate(self._window, self._count - len(self._window)):
+            if index > self.__pushed:
+                self.__tops.push(index, bar)
+                self.__bottoms.push(index, bar)
+        self.__pushed = self._count - 1
+
+    def __add(self, bar, isTop: bool, isBottom: bool):
+        if len(self._window):
+            self._lowestSince.push(self._count - 1, self._window[-1])
+            self._highestSince.push(self._count - 1, self._window[-1])
+        self._window.append(bar)
+        self._count += 1
+        self.calculatePivots(bar, isTop, isBottom)
+
+    def calculatePivots(self, bar, isTop: bool, isBottom: bool):
+        raise NotImplementedError()
+
+
+class StreamingStructuralPivots(BasePivots):
+    """:class:`pyalgomate.technical.StructuralPivots.StructuralPivots` in O(1) amortized per bar."""
+
+    def __init__(self, lookupPeriod: int = 2):
+        super().__init__(lookupPeriod)
+        self.__pivotLowIndex = self.__pivotHighIndex = None
+        self.__largePivotLowIndex = self.__largePivotHighIndex = None
+
+    def createBar(self, dateTime, open, high, low, close):
+        return structuralpivots.Bar(dateTime, open, high, low, close)
+
+    def calculatePivots(self, bar, isTop: bool, isBottom: bool):
+        index = self._count - 1
+        if not len(self.pivotHighs):
+            self.pivotHighs.append(bar)
+            self.__pivotHighIndex = index
+
+        if not len(self.pivotLows):
+            self.pivotLows.append(bar)
+            self.__pivotLowIndex = index
+
+        if self._count < self.lookupPeriod * 2 + 1:
+            return
+
+        middle = index - self.lookupPeriod
+        if isBottom:
+            self.pivotLows.append(self._window[-self.lookupPeriod - 1])
+            self.__pivotLowIndex = middle
+
+        if isTop:
+            self.pivotHighs.append(self._window[-self.lookupPeriod - 1])
+            self.__pivotHighIndex = middle
+
+        if not len(self.largePivotLows):
+            self.largePivotLows.append(self.pivotLows[-1])
+            self.__largePivotLowIndex = self.__pivotLowIndex
+
+        if not len(self.largePivotHighs):
+            self.largePivotHighs.append(self.pivotHighs[-1])
+            self.__largePivotHighIndex = self.__pivotHighIndex
+
+        if bar.high > self.pivotHighs[-1].high:
+            llvIndex, llvBar = self._lowestSince.get(self.__largePivotHighIndex)
+            if llvBar and self.largePivotLows[-1] != llvBar:
+                self.largePivotLows.append(llvBar)
+                self.__largePivotLowIndex = llvIndex
+
+        if bar.low < self.pivotLows[-1].low:
+            hhvIndex, hhvBar = self._highestSince.get(self.__largePivotLowIndex)
+            if hhvBar and self.largePivotHighs[-1] != hhvBar:
+                self.largePivotHighs.append(hhvBar)
+                self.__largePivotHighIndex = hhvIndex
+
+
+class StreamingSwingPivotsJSP(BasePivots):
+    """:class:`pyalgomate.technical.SwingPivotsJSP.SwingPivotsJSP` in O(1) amortized per bar."""
+
+    def __init__(self):
+        super().__init__(2)
+        self.__largePivotLowIndex = self.__largePivotHighIndex = None
+        self.__reset__()
+
+    def __reset__(self):
+        self.pivotLowAnchor = None
+        self.pivotHighAnchor = None
+        self.high = self.low = None
+
+    def createBar(self, dateTime, open, high, low, close):
+        return swingpivotsjsp.Bar(dateTime, open, high, low, close, None)
+
+    def __setPivotLow(self, pivotBar):
+        if self.pivotHighs[-1].datetime > self.pivotLows[-1].datetime:
+            self.pivotLows.append(pivotBar)
+        elif pivotBar.low < self.pivotLows[-1].low:
+            self.pivotLows[-1] = pivotBar
+        self.pivotLows[-1].fdatetime = self._window[-1].datetime
+        self.__reset__()
+
+    def __setPivotHigh(self, pivotBar):
+        if self.pivotLows[-1].datetime > self.pivotHighs[-1].datetime:
+            self.pivotHighs.append(pivotBar)
+        elif pivotBar.high > self.pivotHighs[-1].high:
+            self.pivotHighs[-1] = pivotBar
+        self.pivotHighs[-1].fdatetime = self._window[-1].datetime
+        self.__reset__()
+
+    def findPivotLow(self, anchorBar, nextBars, isLocalBottom: bool) -> bool:
+        if self.pivotLowAnchor and nextBars[1].low > self.pivotLowAnchor.low and anchorBar.low > self.pivotLowAnchor.low:
+            if nextBars[1].high > self.high:
+                self.__setPivotLow(self.pivotLowAnchor)
+                return True
+        elif isLocalBottom:
+            if anchorBar.close > anchorBar.open:
+                if nextBars[0].high > anchorBar.high or nextBars[1].high > anchorBar.high:
+                    self.__setPivotLow(anchorBar)
+                    return True
+                else:
+                    self.pivotLowAnchor = anchorBar
+                    self.high = anchorBar.high
+            elif nextBars[0].close > nextBars[0].open:
+                if nextBars[1].high > nextBars[0].high:
+                    self.__setPivotLow(anchorBar)
+                    return True
+                else:
+                    self.pivotLowAnchor = anchorBar
+                    self.high = nextBars[0].high
+            elif nextBars[1].close > nextBars[1].open:
+                self.pivotLowAnchor = anchorBar
+                self.high = nextBars[1].high
+
+        return False
+
+    def findPivotHigh(self, anchorBar, nextBars, isLocalTop: bool) -> bool:
+        if self.pivotHighAnchor and nextBars[1].high < self.pivotHighAnchor.high and anchorBar.high < self.pivotHighAnchor.high:
+            if nextBars[1].low < self.low:
+                self.__setPivotHigh(self.pivotHighAnchor)
+                return True
+        elif isLocalTop:
+            if anchorBar.close < anchorBar.open:
+                if nextBars[0].low < anchorBar.low or nextBars[1].low < anchorBar.low:
+                    self.__setPivotHigh(anchorBar)
+                    return True
+                else:
+                    self.pivotHighAnchor = anchorBar
+                    self.low = anchorBar.low
+            elif nextBars[0].close < nextBars[0].open:
+                if nextBars[1].low < nextBars[0].low:
+                    self.__setPivotHigh(anchorBar)
+                    return True
+                else:
+                    self.pivotHighAnchor = anchorBar
+                    self.low = nextBars[0].low
+            elif nextBars[1].close < nextBars[1].open:
+                self.pivotHighAnchor = anchorBar
+                self.low = nextBars[1].low
+
+        return False
+
+    def calculatePivots(self, bar, isTop: bool, isBottom: bool):
+        window = self._window
+        if self._count < 5:
+            return
+
+        if not len(self.pivotLows) and not len(self.pivotHighs):
+            # The first two bars, still in the window
+            first, second = window[0], window[1]
+            if first.high > second.high:
+                high, low = (first, 0), (second, 1)
+            else:
+                high, low = (second, 1), (first, 0)
+            self.pivotHighs.append(high[0])
+            self.pivotLows.append(low[0])
+            self.largePivotHighs.append(high[0])
+            self.largePivotLows.append(low[0])
+            self.__largePivotHighIndex, self.__largePivotLowIndex = high[1], low[1]
+            for bars in (self.pivotHighs, self.pivotLows, self.largePivotHighs, self.largePivotLows):
+                bars[-1].fdatetime = bar.datetime
+            return
+
+        anchorBar = window[-3]
+        nextBars = (window[-2], window[-1])
+        if not self.findPivotLow(anchorBar, nextBars, isBottom):
+            self.findPivotHigh(anchorBar, nextBars, isTop)
+
+        if len(self.pivotHighs) > 0 and bar.high > self.pivotHighs[-1].high:
+            llvIndex, llvBar = self._lowestSince.get(self.__largePivotHighIndex)
+            if llvBar and self.largePivotLows[-1] != llvBar:
+                self.largePivotLows.append(llvBar)
+                self.largePivotLows[-1].fdatetime = bar.datetime
+                self.__largePivotLowIndex = llvIndex
+                return
+
+        if len(self.pivotLows) > 0 and bar.low < self.pivotLows[-1].low and len(self.pivotHighs):
+            hhvIndex, hhvBar = self._highestSince.get(self.__largePivotLowIndex)
+            if hhvBar and self.largePivotHighs[-1] != hhvBar:
+                self.largePivotHighs.append(hhvBar)
+                self.largePivotHighs[-1].fdatetime = bar.datetime
+                self.__largePivotHighIndex = hhvIndex
+                return
@@ -0,0 +1,214 @@
+"""
+.. moduleauthor:: Nagaraju Gunda
+
+Warm-up of talipp indicators from historical candles.
+
+Instead of adding the candles one by one, the values of the supported indicators are computed over
+the whole history with NumPy and the state talipp needs to continue, the last input, output and
+intermediate values, is handed to the indicator. Adding values afterwards works as if the candles
+had been added one by one. Indicators without a vectorized implementation are replayed.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+from talipp.indicators import ATR, BB, RSI, SMA, StdDev, SuperTrend
+from talipp.indicators.BB import BBVal
+from talipp.indicators.SuperTrend import SuperTrendVal, Trend
+from talipp.ohlcv import OHLCV
+
+from pyalgomate.technical.indicator import DEFAULT_CAPACITY
+
+
+def _none_padded(values: np.ndarray, count: int) -> List[Any]:
+    """Returns values preceded by Nones up to count values, like the outputs of talipp."""
+    return [None] * (count - len(values)) + values.tolist()
+
+
+def _wilder(first: float, values: np.ndarray, period: int) -> np.ndarray:
+    """Returns the Wilder smoothing of values, (previous * (period - 1) + value) / period, from first."""
+    if len(values) == 0:
+        return np.empty(0)
+    alpha = (period - 1) / period
+    return lfilter([1.0 / period], [1.0, -alpha], values, zi=[first * alpha])[0]
+
+
+def _set_state(indicator, inputs: List[Any], outputs: List[Any], keep: int, **sequences: List[Any]):
+    # Trimmed like talipp purges, the intermediate values are only read from their end
+    indicator.input_values[:] = inputs[-keep:]
+    indicator.output_values[:] = outputs[-keep:]
+    for name, values in sequences.items():
+        getattr(indicator, name)[:] = values[-keep:]
+
+
+def _sma(indicator: SMA, closes: np.ndarray, keep: int) -> np.ndarray:
+    period = indicator.period
+    values = sliding_window_view(closes, period).mean(axis=1) if len(closes) >= period else np.empty(0)
+    _set_state(indicator, closes.tolist(), _none_padded(values, len(closes)), keep)
+    return values
+
+
+def _std_dev(indicator: StdDev, closes: np.ndarray, keep: int) -> np.ndarray:
+    period = indicator.period
+    values = sliding_window_view(closes, period).std(axis=1) if len(closes) >= period else np.empty(0)
+    _set_state(indicator, closes.tolist(), _none_padded(values, len(closes)), keep)
+    return values
+
+
+def _bb(indicator: BB, closes: np.ndarray, keep: int):
+    centralBand = _sma(indicator.central_band, closes, keep)
+    stdDev = _std_dev(indicator.std_dev, closes, keep)
+    # Only the kept values are built
+    values = [
+        BBVal(cb - indicator.std_dev_mult * sd, cb, cb + indicator.std_dev_mult * sd)
+        for cb, sd in zip(centralBand[-keep:].tolist(), stdDev[-keep:].tolist())
+    ]
+    _set_state(indicator, closes.tolist(), [None] * (len(closes) - len(values)) + values, keep)
+
+
+def _true_ranges(candles: Dict[str, np.ndarray]) -> np.ndarray:
+    highs, lows, closes = candles["high"], candles["low"], candles["close"]
+    ret = highs - lows
+    if len(ret) > 1:
+        previousCloses = closes[:-1]
+        ret[1:] = np.maximum.reduce(
+            [ret[1:], np.abs(highs[1:] - previousCloses), np.abs(lows[1:] - previousCloses)])
+    return ret
+
+
+def _atr(indicator: ATR, candles: Dict[str, np.ndarray], inputs: List[OHLCV], keep: int) -> np.ndarray:
+    period = indicator.period
+    trueRanges = _true_ranges(candles)
+    if len(trueRanges) >= period:
+        first = trueRanges[:period].sum() / period
+        values = np.concatenate(([first], _wilder(first, trueRanges[period:], period)))
+    else:
+        values = np.empty(0)
+    _set_state(indicator, inputs, _none_padded(values, len(trueRanges)), keep, tr=trueRanges.tolist())
+    return values
+
+
+def _rsi(indicator: RSI, closes: np.ndarray, keep: int):
+    period = indicator.period
+    avgGains, avgLosses, values = [], [], np.empty(0)
+    if len(closes) > period:
+        changes = np.diff(closes)
+        gains = np.where(changes > 0, changes, 0.0)
+        losses = np.where(changes < 0, -changes, 0.0)
+        # talipp averages the first period - 1 changes, then smooths from the next one on
+        firstGain = gains[:period - 1].sum() / (period - 1)
+        firstLoss = losses[:period - 1].sum() / (period - 1)
+        gains = _wilder(firstGain, gains[period - 1:], period)
+        losses = _wilder(firstLoss, losses[period - 1:], period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(losses == 0, 100.0, 100.0 - (100.0 / (1.0 + gains / losses)))
+        avgGains = [firstGain] + gains.tolist()
+        avgLosses = [firstLoss] + losses.tolist()
+    _set_state(indicator, closes.tolist(), _none_padded(values, len(closes)), keep,
+               avg_gain=avgGains, avg_loss=avgLosses)
+
+
+def _super_trend(indicator: SuperTrend, candles: Dict[str, np.ndarray], inputs: List[OHLCV], keep: int):
+    atr = _atr(indicator.atr, candles, inputs, keep)
+    start = len(inputs) - len(atr)
+    highs, lows = candles["high"][start:], candles["low"][start:]
+    closes = candles["close"].tolist()
+    hla = (highs + lows) / 2.0
+    upperBands = (hla + indicator.mult * atr).tolist()
+    lowerBands = (hla - indicator.mult * atr).tolist()
+
+    # The final bands and the trend depend on their previous values
+    fub, flb, supertrends = [], [], []
+    supertrend = None
+    for i, (bub, blb) in enumerate(zip(upperBands, lowerBands)):
+        close = closes[start + i]
+        if i == 0:
+            fub.append(0)
+            flb.append(0)
+            supertrend = 0
+        else:
+            previousClose = closes[start + i - 1]
+            fub.append(bub if bub < fub[-1] or previousClose > fub[-1] else fub[-1])
+            flb.append(blb if blb > flb[-1] or previousClose < flb[-1] else flb[-1])
+            if supertrend == fub[-2]:
+                supertrend = fub[-1] if close <= fub[-1] else flb[-1]
+            elif supertrend == flb[-2]:
+                supertrend = flb[-1] if close >= flb[-1] else fub[-1]
+        supertrends.append(supertrend)
+    values = [
+        SuperTrendVal(supertrend, Trend.UP if close > supertrend else Trend.DOWN)
+        for supertrend, close in zip(supertrends[-keep:], closes[-len(supertrends):][-keep:])
+    ] if len(supertrends) else []
+    _set_state(indicator, inputs, [None] * (len(inputs) - len(values)) + values, keep, fub=fub, flb=flb)
+
+
+_CLOSE_WARM_UPS: Dict[Type, Callable] = {SMA: _sma, StdDev: _std_dev, BB: _bb, RSI: _rsi}
+_OHLCV_WARM_UPS: Dict[Type, Callable] = {ATR: _atr, SuperTrend: _super_trend}
+
+
+def is_vectorized(indicator) -> bool:
+    if indicator.input_modifier is not None or indicator.input_sampler is not None:
+        return False
+    if isinstance(indicator, BB) and type(indicator.central_band) is not SMA:
+        return False
+    return type(indicator) in _CLOSE_WARM_UPS or type(indicator) in _OHLCV_WARM_UPS
+
+
+def _lookback(indicator) -> int:
+    return max([getattr(indicator, "period", 0)] + [_lookback(sub) for sub in indicator.sub_indicators])
+
+
+def warm_up(indicator, df: pd.DataFrame, use_ohlcv: Optional[bool] = None, keep: int = DEFAULT_CAPACITY):
+    """Adds historical candles to a new talipp indicator.
+
+    :param indicator: The indicator, without values nor indicators listening to it.
+    :param df: The candles, with Date/Time, Open, High, Low, Close and Volume columns, oldest first.
+    :param use_ohlcv: Whether the indicator takes OHLCV rather than closes. Only needed for
+        indicators that are replayed.
+    :param keep: The number of values of the history kept by the indicator.
+    """
+    if len(indicator.input_values) or len(indicator.output_listeners):
+        raise ValueError(f"Indicator {type(indicator).__name__} already has values or listeners.")
+    if len(df) == 0:
+        return indicator
+
+    if not is_vectorized(indicator):
+        if use_ohlcv is None:
+            raise ValueError(f"Input type of indicator {type(indicator).__name__} is unknown, pass use_ohlcv.")
+        if use_ohlcv:
+            for ohlcv in _to_ohlcv(df, 0):
+                indicator.add(ohlcv)
+        else:
+            for close in df["Close"].tolist():
+                indicator.add(close)
+        return indicator
+
+    # Enough values for talipp to carry on
+    keep = max(keep, _lookback(indicator) + 2)
+    closes = df["Close"].to_numpy(dtype=np.float64)
+    warmUp = _CLOSE_WARM_UPS.get(type(indicator))
+    if warmUp is not None:
+        warmUp(indicator, closes, keep)
+    else:
+        candles = {
+            "high": df["High"].to_numpy(dtype=np.float64),
+            "low": df["Low"].to_numpy(dtype=np.float64),
+            "close": closes,
+        }
+        # Only the kept candles are built, as inputs
+        inputs = [None] * max(len(df) - keep, 0) + _to_ohlcv(df, keep)
+        _OHLCV_WARM_UPS[type(indicator)](indicator, candles, inputs, keep)
+    return indicator
+
+
+def _to_ohlcv(df: pd.DataFrame, last: int) -> List[OHLCV]:
+    tail = df.iloc[-last:] if last else df
+    return [
+        OHLCV(open, high, low, close, volume, dateTime)
+        for dateTime, open, high, low, close, volume in zip(
+            tail["Date/Time"].tolist(), tail["Open"].tolist(), tail["High"].tolist(), tail["Low"].tolist(),
+            tail["Close"].tolist(), tail["Volume"].tolist())
+    ]
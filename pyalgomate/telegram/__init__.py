@@ -8,6 +8,7 @@ from typing import List, Dict
 import matplotlib.pyplot as plt
 from pandas.plotting import table
 from pyalgomate.core import State
+from pyalgomate.core.risk import getRiskAggregator
 import io
 import datetime
 import time
@@ -225,6 +226,12 @@ class TelegramBot:
 
             message += f"<i>Data Feed:</i> {'🔵' if feedAlive else '⭕'}"
 
+        portfolioGreeks = getRiskAggregator().getUnderlyingGreeks()
+        if len(portfolioGreeks):
+            message += "\n\n<b>Portfolio Greeks</b>\n"
+            for underlying, greeks in portfolioGreeks.items():
+                message += f"<i>{underlying}</i>  Δ {greeks['delta']:.2f}  Γ {greeks['gamma']:.4f}  Θ {greeks['theta']:.2f}  V {greeks['vega']:.2f}\n"
+
         await update.message.reply_text(message, parse_mode='HTML', disable_web_page_preview=True)
 
         return await self.start(update, context)
@@ -5,7 +5,6 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 import flet as ft
-from pyalgomate.strategies import OptionContract
 from pyalgomate.strategies.BaseOptionsGreeksStrategy import BaseOptionsGreeksStrategy
 
 
@@ -96,44 +95,11 @@ class PayoffView(ft.View):
             alignment=ft.MainAxisAlignment.CENTER,
         )
 
-    def calculate_payoff(self, positions, spot_range):
-        payoff = np.zeros_like(spot_range)
-        for position in positions:
-            instrument = position.getInstrument()
-            option_contract: OptionContract = (
-                self.strategy.getBroker().getOptionContract(instrument)
-            )
-            if not option_contract:
-                continue
-
-            # Check if the position is closed
-            if position.exitFilled():
-                # For closed positions, just add the realized PnL
-                payoff += position.getPnL()
-            else:
-                # For open positions, calculate the payoff as before
-                quantity = position.getEntryOrder().getQuantity()
-                entry_price = position.getEntryOrder().getAvgFillPrice()
-                is_sell = position.getEntryOrder().isSell()
-                sign = -1 if is_sell else 1
-
-                if option_contract.type == "c":
-                    position_payoff = (
-                        np.maximum(spot_range - option_contract.strike, 0) * quantity
-                        - entry_price * quantity
-                    )
-                elif option_contract.type == "p":
-                    position_payoff = (
-                        np.maximum(option_contract.strike - spot_range, 0) * quantity
-                        - entry_price * quantity
-                    )
-                else:
-                    # For futures or other instruments
-                    position_payoff = (spot_range - entry_price) * quantity
-
-                payoff += sign * position_payoff
-
-        return payoff
+    def calculate_payoff(self, positions, spot_range, spot_price):
+        book = self.strategy.buildScenarioBook(positions)
+        spot_moves = spot_range / spot_price - 1.0
+        engine = self.strategy.getScenarioEngine()
+        return engine.expiryPayoff(book, spot_moves), engine.evaluate(book, spot_moves)[:, 0, 0]
 
     def update_payoff_chart(self):
         positions = self.get_positions_callback()
@@ -145,7 +111,7 @@ class PayoffView(ft.View):
             return
 
         spot_range = np.linspace(spot_price * 0.8, spot_price * 1.2, 200)
-        payoff = self.calculate_payoff(positions, spot_range)
+        payoff, payoff_t0 = self.calculate_payoff(positions, spot_range, spot_price)
 
         plt.figure(figsize=(10, 6))
 
@@ -162,6 +128,9 @@ class PayoffView(ft.View):
         # Plot the payoff line
         plt.plot(spot_range, payoff, label="Payoff", color="blue")
 
+        # Plot the mark to model curve as of now
+        plt.plot(spot_range, payoff_t0, label="T+0", color="purple", linestyle="-.")
+
         # Add horizontal line at y=0
         plt.axhline(y=0, color="gray", linestyle="--")
 
@@ -201,7 +170,8 @@ class PayoffView(ft.View):
         plt.grid(True)
 
         # Set y-axis limits to show actual profit/loss values
-        y_min, y_max = np.min(payoff), np.max(payoff)
+        y_min = min(np.min(payoff), np.min(payoff_t0))
+        y_max = max(np.max(payoff), np.max(payoff_t0))
         y_range = y_max - y_min
         plt.ylim(y_min - 0.1 * y_range, y_max + 0.1 * y_range)
 
@@ -225,7 +195,7 @@ class PayoffView(ft.View):
         total_mtm = sum(position.getPnL() for position in positions)
         underlying_price = self.strategy.getLastPrice(self.strategy.underlying)
         spot_range = np.linspace(underlying_price * 0.5, underlying_price * 1.5, 1000)
-        payoff = self.calculate_payoff(positions, spot_range)
+        payoff, _ = self.calculate_payoff(positions, spot_range, underlying_price)
         max_profit = np.max(payoff)
         max_loss = np.min(payoff)
 
@@ -9,7 +9,9 @@ import plotly.graph_objects as go
 
 import flet as ft
 from pyalgomate.barfeed import BaseBarFeed
+from pyalgomate.barfeed.latency import getLatencyTracker
 from pyalgomate.core import State
+from pyalgomate.core.risk import getRiskAggregator
 from pyalgomate.strategies.BaseOptionsGreeksStrategy import BaseOptionsGreeksStrategy
 from pyalgomate.ui.flet.views.position import PositionView
 from pyalgomate.ui.flet.views.trades import TradesView
@@ -431,12 +433,49 @@ class StrategiesView(ft.View):
             alignment=ft.alignment.center,
         )
 
+        self.portfolioGreeksText = ft.Text("-", size=12)
+        portfolioGreeksRow = ft.Container(
+            ft.Container(
+                ft.Column(
+                    [
+                        ft.Text("Portfolio Greeks", size=15, weight="w700"),
+                        self.portfolioGreeksText,
+                    ],
+                    scroll=ft.ScrollMode.HIDDEN,
+                ),
+                padding=ft.padding.only(top=20, left=20, right=20, bottom=20),
+            ),
+            col={"sm": 6, "md": 3},
+            bgcolor="#ecf0f1",
+            border_radius=10,
+            height=200,
+        )
+
+        self.latencyText = ft.Text("-", size=10)
+        latencyRow = ft.Container(
+            ft.Container(
+                ft.Column(
+                    [
+                        ft.Text("Feed Latency", size=15, weight="w700"),
+                        self.latencyText,
+                    ],
+                    scroll=ft.ScrollMode.HIDDEN,
+                ),
+                padding=ft.padding.only(top=20, left=20, right=20, bottom=20),
+            ),
+            col={"sm": 6, "md": 3},
+            bgcolor="#ecf0f1",
+            border_radius=10,
+            height=200,
+        )
+
         self.strategyCards = [
             StrategyCard(strategy, page) for strategy in self.strategies
         ]
         rows = [
             ft.ResponsiveRow(
-                [totalMtmRow, feedRow], alignment=ft.MainAxisAlignment.SPACE_BETWEEN
+                [totalMtmRow, feedRow, portfolioGreeksRow, latencyRow],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
             )
         ]
         rows.append(
@@ -507,4 +546,16 @@ class StrategiesView(ft.View):
             f": {self.feed.getNextBarsDateTime()}"
         )
 
+        portfolioGreeks = getRiskAggregator().getUnderlyingGreeks()
+        self.portfolioGreeksText.value = (
+            "\n".join(
+                f"{underlying}\n  Δ {greeks['delta']:.2f}  Γ {greeks['gamma']:.4f}  "
+                f"Θ {greeks['theta']:.2f}  V {greeks['vega']:.2f}"
+                for underlying, greeks in portfolioGreeks.items()
+            )
+            if len(portfolioGreeks)
+            else "-"
+        )
+        self.latencyText.value = getLatencyTracker().format() or "-"
+
         self.update()
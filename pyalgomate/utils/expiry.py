@@ -1,5 +1,8 @@
-import pendulum
+import calendar
 import datetime
+from functools import lru_cache
+
+import pendulum
 
 from pyalgomate.core import UnderlyingIndex
 
@@ -125,7 +128,10 @@ def __isSameWeek(date1: datetime.date, date2: datetime.date):
     return date1.month == date2.month and pendulum.date(date1.year, date1.month, date1.day).week_of_month == pendulum.date(date2.year, date2.month, date2.day).week_of_month
 
 
-def getNearestWeeklyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
+# The pendulum based functions below are the reference implementations the ExpiryCalendar is
+# checked against. Use the public functions further down instead.
+
+def _getNearestWeeklyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
     currentDate = pendulum.now().date() if date is None else pendulum.date(
         date.year, date.month, date.day)
     expiryDay, monthlyExpiryDay = _getExpiryDay(currentDate, index)
@@ -139,7 +145,7 @@ def getNearestWeeklyExpiryDate(date: datetime.date = None, index: UnderlyingInde
         expiryDate = __considerHolidayList(expiryDate)
 
         if expiryDay != monthlyExpiryDay:
-            monthlyExpiryDate = getNearestMonthlyExpiryDate(date, index)
+            monthlyExpiryDate = _getNearestMonthlyExpiryDate(date, index)
             if __isSameWeek(expiryDate, monthlyExpiryDate) or monthlyExpiryDate < expiryDate:
                 expiryDate = monthlyExpiryDate
 
@@ -151,15 +157,15 @@ def getNearestWeeklyExpiryDate(date: datetime.date = None, index: UnderlyingInde
     return expiryDate
 
 
-def getNextWeeklyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
+def _getNextWeeklyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
     currentDate = pendulum.now().date() if date is None else pendulum.date(
         date.year, date.month, date.day)
-    expiryDate = getNearestWeeklyExpiryDate(currentDate, index)
+    expiryDate = _getNearestWeeklyExpiryDate(currentDate, index)
 
-    return getNearestWeeklyExpiryDate(expiryDate + datetime.timedelta(days=5), index)
+    return _getNearestWeeklyExpiryDate(expiryDate + datetime.timedelta(days=5), index)
 
 
-def getNearestMonthlyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
+def _getNearestMonthlyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
     currentDate = pendulum.now().date() if date is None else pendulum.date(
         date.year, date.month, date.day)
     expiryDay, monthlyExpiryDay = _getExpiryDay(currentDate, index)
@@ -170,7 +176,7 @@ def getNearestMonthlyExpiryDate(date: datetime.date = None, index: UnderlyingInd
     return __considerHolidayList(expiryDate)
 
 
-def getNextMonthlyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
+def _getNextMonthlyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
     currentDate = pendulum.now().date() if date is None else pendulum.date(
         date.year, date.month, date.day)
     expiryDay, monthlyExpiryDay = _getExpiryDay(currentDate, index)
@@ -185,6 +191,163 @@ def getNextMonthlyExpiryDate(date: datetime.date = None, index: UnderlyingIndex
     return __considerHolidayList(expiryDate)
 
 
+def _toWeekday(day) -> int:
+    # Map pendulum weekday constants to datetime.date.weekday() irrespective of the pendulum version
+    return pendulum.date(2024, 1, 1).next(day).weekday()
+
+
+def _lastWeekdayOfMonth(year: int, month: int, weekday: int) -> datetime.date:
+    lastDay = datetime.date(year, month, calendar.monthrange(year, month)[1])
+    return lastDay - datetime.timedelta(days=(lastDay.weekday() - weekday) % 7)
+
+
+def _addMonths(year: int, month: int, months: int):
+    month += months
+    return year + (month - 1) // 12, (month - 1) % 12 + 1
+
+
+def _weekOfMonth(date: datetime.date) -> int:
+    return (date.day + date.replace(day=1).isoweekday() - 1 + 6) // 7
+
+
+class ExpiryCalendar:
+    """Precomputed expiry dates of an index.
+
+    Expiries are computed once per calendar year, with the same rules and holiday adjustments as
+    the reference functions above, and stored in per day arrays so lookups are an index by date.
+    Years are built lazily on first use.
+    """
+
+    def __init__(self, index: UnderlyingIndex):
+        if index not in expiryDays:
+            raise ValueError("Invalid index")
+
+        self.__index = index
+        self.__holidays = set(datetime.date(d.year, d.month, d.day) for d in listOfNseHolidays)
+        self.__regimes = [
+            (startDate, endDate, _toWeekday(weekly), _toWeekday(monthly))
+            for (startDate, endDate), (weekly, monthly) in (
+                (dateRange, (settings["weekly"], settings.get("monthly", settings["weekly"])))
+                for dateRange, settings in expiryDays[index].items()
+            )
+        ]
+        self.__years = dict()
+
+    def __getExpiryDays(self, date: datetime.date):
+        for startDate, endDate, weekly, monthly in self.__regimes:
+            if startDate <= date < endDate:
+                return weekly, monthly
+        raise ValueError("Index found, but no matching date range.")
+
+    def __considerHolidayList(self, expiryDate: datetime.date) -> datetime.date:
+        while expiryDate in self.__holidays or expiryDate.weekday() >= 5:
+            expiryDate -= datetime.timedelta(days=1)
+        return expiryDate
+
+    def __computeNearestMonthly(self, date: datetime.date, months=0):
+        _, monthlyExpiryDay = self.__getExpiryDays(date)
+        expiryDate = _lastWeekdayOfMonth(date.year, date.month, monthlyExpiryDay)
+        if date > expiryDate or months > 0:
+            year, month = _addMonths(
+                date.year, date.month, months + (1 if date > expiryDate else 0))
+            expiryDate = _lastWeekdayOfMonth(year, month, monthlyExpiryDay)
+        return self.__considerHolidayList(expiryDate)
+
+    def __computeNearestWeekly(self, date: datetime.date, monthlyExpiryDate: datetime.date):
+        expiryDay, monthlyExpiryDay = self.__getExpiryDays(date)
+        currentDate = date
+
+        while True:
+            expiryDate = currentDate + datetime.timedelta(
+                days=(expiryDay - currentDate.weekday()) % 7)
+            expiryDate = self.__considerHolidayList(expiryDate)
+
+            if expiryDay != monthlyExpiryDay:
+                if (expiryDate.month == monthlyExpiryDate.month
+                        and _weekOfMonth(expiryDate) == _weekOfMonth(monthlyExpiryDate)) \
+                        or monthlyExpiryDate < expiryDate:
+                    expiryDate = monthlyExpiryDate
+                    if expiryDate < currentDate:
+                        # A monthly expiry moved before the date by a holiday would never satisfy
+                        # the loop below, so settle on it
+                        return expiryDate
+
+            if expiryDate >= currentDate:
+                return expiryDate
+
+            currentDate += datetime.timedelta(days=1)
+
+    def __getYear(self, year: int):
+        table = self.__years.get(year, None)
+        if table is None:
+            startDate = datetime.date(year, 1, 1)
+            days = (datetime.date(year + 1, 1, 1) - startDate).days
+            nearestWeekly = []
+            nearestMonthly = []
+            nextMonthly = []
+            for offset in range(days):
+                date = startDate + datetime.timedelta(days=offset)
+                monthlyExpiryDate = self.__computeNearestMonthly(date)
+                nearestMonthly.append(monthlyExpiryDate)
+                nextMonthly.append(self.__computeNearestMonthly(date, months=1))
+                nearestWeekly.append(self.__computeNearestWeekly(date, monthlyExpiryDate))
+            # Next weekly expiries depend on later dates, possibly of the next year, so they are
+            # filled on demand
+            table = (startDate.toordinal(), nearestWeekly, [None] * days, nearestMonthly, nextMonthly)
+            self.__years[year] = table
+        return table
+
+    def __lookup(self, date: datetime.date, column: int):
+        if date is None:
+            date = datetime.date.today()
+        elif isinstance(date, datetime.datetime):
+            date = date.date()
+        table = self.__getYear(date.year)
+        return table, date.toordinal() - table[0], table[column]
+
+    def getNearestWeeklyExpiryDate(self, date: datetime.date = None) -> datetime.date:
+        _, offset, column = self.__lookup(date, 1)
+        return column[offset]
+
+    def getNextWeeklyExpiryDate(self, date: datetime.date = None) -> datetime.date:
+        table, offset, column = self.__lookup(date, 2)
+        expiryDate = column[offset]
+        if expiryDate is None:
+            expiryDate = self.getNearestWeeklyExpiryDate(
+                table[1][offset] + datetime.timedelta(days=5))
+            column[offset] = expiryDate
+        return expiryDate
+
+    def getNearestMonthlyExpiryDate(self, date: datetime.date = None) -> datetime.date:
+        _, offset, column = self.__lookup(date, 3)
+        return column[offset]
+
+    def getNextMonthlyExpiryDate(self, date: datetime.date = None) -> datetime.date:
+        _, offset, column = self.__lookup(date, 4)
+        return column[offset]
+
+
+@lru_cache(maxsize=None)
+def getExpiryCalendar(index: UnderlyingIndex) -> ExpiryCalendar:
+    return ExpiryCalendar(index)
+
+
+def getNearestWeeklyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
+    return getExpiryCalendar(index).getNearestWeeklyExpiryDate(date)
+
+
+def getNextWeeklyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
+    return getExpiryCalendar(index).getNextWeeklyExpiryDate(date)
+
+
+def getNearestMonthlyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
+    return getExpiryCalendar(index).getNearestMonthlyExpiryDate(date)
+
+
+def getNextMonthlyExpiryDate(date: datetime.date = None, index: UnderlyingIndex = UnderlyingIndex.BANKNIFTY):
+    return getExpiryCalendar(index).getNextMonthlyExpiryDate(date)
+
+
 if __name__ == '__main__':
     print(f"Today is\t\t\t{pendulum.now().date()}\n")
     print()
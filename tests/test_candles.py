@@ -0,0 +1,61 @@
+import datetime
+
+from pyalgomate.barfeed.candles import CandleAggregator, ExchangeUTCOffset, decodeCandles, encodeCandles
+
+ist = datetime.timezone(ExchangeUTCOffset)
+
+
+def epoch(hour, minute, second):
+    return int(datetime.datetime(2024, 1, 1, hour, minute, second, tzinfo=ist).timestamp())
+
+
+def tick(token, exchangeTime, ltp, volume, oi=0.0):
+    return (2, token, exchangeTime, 0, ltp, volume, oi, 0.0, 0.0, 0.0, 0.0)
+
+
+def test_candles_close_together_on_the_next_period():
+    aggregator = CandleAggregator(intervals=(60, 300))
+    assert aggregator.update(tick(1, epoch(9, 15, 5), 100.0, 1000.0)) == []
+    assert aggregator.update(tick(1, epoch(9, 15, 20), 104.0, 1100.0)) == []
+    assert aggregator.update(tick(2, epoch(9, 15, 30), 50.0, 10.0, 7.0)) == []
+    assert aggregator.update(tick(1, epoch(9, 15, 59), 98.0, 1250.0)) == []
+
+    closed = aggregator.update(tick(1, epoch(9, 16, 1), 99.0, 1300.0))
+    assert len(closed) == 1
+    interval, candles = closed[0]
+    assert interval == 60
+    assert sorted(candles) == [
+        (2, 1, epoch(9, 15, 0), 60, 100.0, 104.0, 98.0, 98.0, 250.0, 0.0),
+        (2, 2, epoch(9, 15, 0), 60, 50.0, 50.0, 50.0, 50.0, 0.0, 7.0),
+    ]
+
+    # The volume of the next candle starts from the close of the previous one
+    closed = aggregator.closeElapsed(epoch(9, 17, 0))
+    assert [candles for interval, candles in closed] == [
+        [(2, 1, epoch(9, 16, 0), 60, 99.0, 99.0, 99.0, 99.0, 50.0, 0.0)]
+    ]
+    assert aggregator.closeElapsed(epoch(9, 17, 30)) == []
+
+    closed = aggregator.update(tick(1, epoch(9, 20, 0), 101.0, 1400.0))
+    assert [interval for interval, candles in closed] == [300]
+    assert sorted(closed[0][1]) == [
+        (2, 1, epoch(9, 15, 0), 300, 100.0, 104.0, 98.0, 99.0, 300.0, 0.0),
+        (2, 2, epoch(9, 15, 0), 300, 50.0, 50.0, 50.0, 50.0, 0.0, 7.0),
+    ]
+
+
+def test_candles_round_trip_through_the_wire():
+    candles = [
+        (2, 43184, epoch(9, 15, 0), 60, 100.0, 104.0, 98.0, 99.0, 250.0, 7.0),
+        (1, 26009, epoch(9, 15, 0), 60, 48000.0, 48010.0, 47990.0, 48005.0, 0.0, 0.0),
+    ]
+    assert decodeCandles(encodeCandles(candles)).tolist() == candles
+
+
+def test_hourly_candles_align_on_the_exchange_open():
+    # 09:15 IST is not on an hour of UTC, nor of the host's time zone
+    aggregator = CandleAggregator(intervals=(3600,))
+    assert aggregator.update(tick(1, epoch(9, 20, 0), 100.0, 10.0)) == []
+    assert aggregator.update(tick(1, epoch(10, 14, 59), 101.0, 20.0)) == []
+    closed = aggregator.update(tick(1, epoch(10, 15, 0), 102.0, 30.0))
+    assert closed == [(3600, [(2, 1, epoch(9, 15, 0), 3600, 100.0, 101.0, 100.0, 101.0, 10.0, 0.0)])]
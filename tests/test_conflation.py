@@ -0,0 +1,72 @@
+import threading
+
+from pyalgomate.barfeed.conflation import ConflatingQuoteBuffer
+
+
+def test_pending_values_are_coalesced():
+    buffer = ConflatingQuoteBuffer()
+    buffer.putMany([("NFO|1", 1), ("NFO|2", 2), ("NFO|1", 3)])
+
+    sequence, values = buffer.drain()
+    assert sequence == 3
+    assert values == {"NFO|1": 3, "NFO|2": 2}
+    assert buffer.drain() == (3, {})
+
+    stats = buffer.getStats()
+    assert stats["coalesced"] == 1
+    assert stats["drained"] == 2
+    assert stats["pending"] == 0
+
+
+def test_only_keys_written_since_last_drain_are_returned():
+    buffer = ConflatingQuoteBuffer()
+    buffer.put("NFO|1", 1)
+    buffer.put("NFO|2", 2)
+    buffer.drain()
+
+    buffer.put("NFO|2", 4)
+    assert buffer.drain() == (3, {"NFO|2": 4})
+    assert buffer.get("NFO|1") == 1
+
+
+def test_consumer_lag():
+    buffer = ConflatingQuoteBuffer()
+    buffer.put("NFO|1", 1)
+    sequence, _ = buffer.drain()
+    buffer.acknowledge("slow", sequence, 0)
+    buffer.put("NFO|1", 2)
+    buffer.drop(2)
+
+    assert buffer.getConsumerLag()["slow"]["messages"] == 1
+    assert buffer.getStats()["dropped"] == 2
+
+
+def test_concurrent_drains_never_lose_the_last_write():
+    buffer = ConflatingQuoteBuffer()
+    keys = [f"NFO|{token}" for token in range(50)]
+    count = 200000
+    seen = dict.fromkeys(keys, -1)
+    outOfOrder = []
+    done = threading.Event()
+
+    def consume():
+        while not done.is_set():
+            _, values = buffer.drain()
+            for key, value in values.items():
+                # Values only move forward, at worst one is drained twice
+                if value < seen[key]:
+                    outOfOrder.append((key, value))
+                seen[key] = value
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for i in range(count):
+        buffer.put(keys[i % len(keys)], i)
+    done.set()
+    consumer.join()
+
+    _, values = buffer.drain()
+    seen.update(values)
+    assert outOfOrder == []
+    assert seen == {key: count - len(keys) + i for i, key in enumerate(keys)}
+    assert buffer.getStats()["published"] == count
@@ -0,0 +1,48 @@
+import datetime
+
+import pytest
+
+from pyalgomate.core import UnderlyingIndex
+from pyalgomate.utils import expiry
+
+indices = [index for index in UnderlyingIndex if index in expiry.expiryDays]
+
+dates = [
+    datetime.date(2022, 1, 1) + datetime.timedelta(days=offset)
+    for offset in range((datetime.date(2025, 12, 31) - datetime.date(2022, 1, 1)).days + 1)
+]
+
+
+@pytest.mark.parametrize("index", indices, ids=str)
+@pytest.mark.parametrize(
+    "name",
+    [
+        "getNearestWeeklyExpiryDate",
+        "getNextWeeklyExpiryDate",
+        "getNearestMonthlyExpiryDate",
+        "getNextMonthlyExpiryDate",
+    ],
+)
+def test_calendar_matches_reference(index, name):
+    function = getattr(expiry, name)
+    reference = getattr(expiry, f"_{name}")
+
+    for date in dates:
+        assert function(date, index) == reference(date, index), f"{name} {index} {date}"
+
+
+def test_calendar_accepts_datetimes():
+    dateTime = datetime.datetime(2024, 3, 20, 9, 15)
+    assert expiry.getNearestWeeklyExpiryDate(
+        dateTime, UnderlyingIndex.BANKNIFTY
+    ) == expiry.getNearestWeeklyExpiryDate(dateTime.date(), UnderlyingIndex.BANKNIFTY)
+
+
+def test_calendar_returns_plain_dates():
+    ret = expiry.getNearestMonthlyExpiryDate(datetime.date(2024, 3, 20), UnderlyingIndex.NIFTY)
+    assert type(ret) is datetime.date
+
+
+def test_calendar_rejects_unknown_index():
+    with pytest.raises(ValueError):
+        expiry.getNearestWeeklyExpiryDate(datetime.date(2024, 3, 20), UnderlyingIndex.NOT_INDEX)
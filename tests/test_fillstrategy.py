@@ -0,0 +1,88 @@
+import asyncio
+import datetime
+
+import pandas as pd
+from pyalgotrade import broker
+from pyalgotrade.broker import slippage
+
+from pyalgomate.backtesting.DataFrameFeed import DataFrameFeed
+from pyalgomate.brokers import BacktestingBroker
+
+instrument = "BANKNIFTY2432047000CE"
+
+
+def buildBroker(withDepth):
+    startDateTime = datetime.datetime(2024, 3, 20, 9, 15)
+    rows = []
+    for i in range(3):
+        row = {
+            "Ticker": instrument,
+            "Date/Time": startDateTime + datetime.timedelta(minutes=i),
+            "Open": 100.0,
+            "High": 101.0,
+            "Low": 99.0,
+            "Close": 100.0,
+            "Volume": 10,
+            "Open Interest": 5,
+        }
+        if withDepth:
+            row.update({"Bid": 99.5, "Ask": 100.5})
+        rows.append(row)
+
+    df = pd.DataFrame(rows)
+    feed = DataFrameFeed(df, df, [instrument])
+    broker_ = BacktestingBroker(100000, feed)
+    fills = []
+    broker_.getOrderUpdatedEvent().subscribe(
+        lambda _, orderEvent: fills.append(orderEvent.getEventInfo().getPrice())
+        if orderEvent.getEventType() == broker.OrderEvent.Type.FILLED
+        else None
+    )
+    broker_.start()
+    feed.start()
+    return broker_, feed, fills
+
+
+def test_market_orders_fill_at_bid_ask():
+    broker_, feed, fills = buildBroker(True)
+    asyncio.run(broker_.submitOrder(broker_.createMarketOrder(broker.Order.Action.BUY, instrument, 15)))
+    feed.dispatch()
+    asyncio.run(broker_.submitOrder(broker_.createMarketOrder(broker.Order.Action.SELL, instrument, 15)))
+    feed.dispatch()
+
+    assert fills == [100.5, 99.5]
+    assert feed.getBestBidAsk(instrument) == (99.5, 100.5)
+
+
+def test_limit_order_waits_for_the_ask():
+    broker_, feed, fills = buildBroker(True)
+    asyncio.run(broker_.submitOrder(broker_.createLimitOrder(broker.Order.Action.BUY, instrument, 100.0, 15)))
+    feed.dispatch()
+
+    assert fills == []
+    assert len(broker_.getActiveOrders()) == 1
+
+
+def test_without_depth_fills_like_default():
+    broker_, feed, fills = buildBroker(False)
+    asyncio.run(broker_.submitOrder(broker_.createMarketOrder(broker.Order.Action.BUY, instrument, 15)))
+    feed.dispatch()
+
+    assert fills == [100.0]
+    assert feed.getBestBidAsk(instrument) == (None, None)
+
+
+class FixedSlippage(slippage.SlippageModel):
+    def calculatePrice(self, order, price, quantity, bar, volumeUsed):
+        return price + 0.25 if order.isBuy() else price - 0.25
+
+
+def test_slippage_applies_to_the_touch():
+    broker_, feed, fills = buildBroker(True)
+    broker_.getFillStrategy().setSlippageModel(FixedSlippage())
+    asyncio.run(broker_.submitOrder(broker_.createMarketOrder(broker.Order.Action.BUY, instrument, 15)))
+    feed.dispatch()
+    asyncio.run(broker_.submitOrder(broker_.createMarketOrder(broker.Order.Action.SELL, instrument, 15)))
+    feed.dispatch()
+
+    assert fills == [100.75, 99.25]
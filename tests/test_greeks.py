@@ -0,0 +1,32 @@
+import datetime
+import time
+
+import numpy as np
+
+from pyalgomate.core import greeks
+from pyalgomate.core.greeks import BackgroundGreeksCalculator
+
+
+def test_snapshot_age_includes_the_computation(monkeypatch):
+    def calculateGreeks(prices, underlyingPrices, strikes, expiries, types):
+        # A slow solver, the quotes it was given keep ageing meanwhile
+        time.sleep(0.2)
+        return np.full(len(prices), 0.15), {"delta": np.full(len(prices), 0.5)}
+
+    monkeypatch.setattr(greeks, "calculateGreeks", calculateGreeks)
+    calculator = BackgroundGreeksCalculator(lambda inputs, iv, greeks: {"option": (iv[0], greeks["delta"][0])})
+    try:
+        inputs = (
+            ["option"], np.array([250.0]), np.array([47000.0]), np.array([47000.0]),
+            np.array([2 / 365]), np.array(["c"]), np.array([0.0]),
+        )
+        assert calculator.submit(datetime.datetime(2024, 3, 20, 9, 15), inputs)
+        deadline = time.monotonic() + 10
+        while calculator.getSnapshot() is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        snapshot = calculator.getSnapshot()
+        assert snapshot.optionData == {"option": (0.15, 0.5)}
+        assert snapshot.getAge() >= snapshot.computeDuration >= 0.2
+    finally:
+        calculator.shutdown(wait=True)
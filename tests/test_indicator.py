@@ -0,0 +1,91 @@
+import datetime
+
+import numpy as np
+from talipp.indicators import ATR, SMA
+from talipp.ohlcv import OHLCV
+
+from pyalgomate.technical.indicator import IndicatorManager
+
+
+def feed(indicatorManager, count):
+    indicatorManager.register_indicator(SMA, use_ohlcv=False)
+    indicatorManager.register_indicator(ATR, use_ohlcv=True)
+    indicatorManager.add_timeframe(60)
+    indicatorManager.add_instrument(60, "a")
+    indicatorManager.add_indicator(60, "a", SMA, {"period": 5})
+    indicatorManager.add_indicator(60, "a", ATR, {"period": 3})
+    start = datetime.datetime(2024, 1, 1, 9, 15)
+    for i in range(count):
+        close = 100.0 + (i * 7) % 13
+        indicatorManager.update_data(60, "a", start + datetime.timedelta(minutes=i), close - 1, close + 2, close - 3,
+                                     close, float(i))
+
+
+def test_candles_and_indicators_are_bounded_by_the_capacity():
+    bounded, unbounded = IndicatorManager(capacity=10), IndicatorManager(capacity=None)
+    feed(bounded, 95)
+    feed(unbounded, 95)
+
+    candles = bounded.get_candles(60, "a")
+    assert len(candles) == 10
+    assert candles.volume.tolist() == list(range(85, 95))
+    assert candles[-1].time == np.datetime64("2024-01-01T10:49")
+    assert bounded.get_candles(60, "a", -3, -1).close.tolist() == [c.close for c in unbounded.get_candles(60, "a", -3, -1)]
+    # Windows are views of the buffer
+    assert np.shares_memory(bounded.get_candles(60, "a", 2), candles)
+
+    for indicator in (SMA, ATR):
+        values = bounded.get_indicator_values(60, "a", indicator)
+        assert len(values) < 20
+        assert values[-5:] == unbounded.get_indicator_values(60, "a", indicator)[-5:]
+        assert bounded.get_indicator_value(60, "a", indicator) == unbounded.get_indicator_value(60, "a", indicator)
+
+
+def test_warm_up_continues_like_adding_the_candles_one_by_one():
+    import pandas as pd
+    from pytest import approx
+    from talipp.indicators import BB, RSI, SuperTrend
+
+    from pyalgomate.technical.warmup import warm_up
+
+    count = 300
+    closes = [100.0 + ((i * 7) % 13) - (i % 5) * 0.5 for i in range(count)]
+    df = pd.DataFrame({
+        "Date/Time": pd.date_range("2024-01-01 09:15", periods=count, freq="5min"),
+        "Open": closes,
+        "High": [close + 1.5 for close in closes],
+        "Low": [close - 2.0 for close in closes],
+        "Close": closes,
+        "Volume": 1.0,
+    })
+    history, live = df.iloc[:250], df.iloc[250:]
+
+    def values(indicator):
+        value = indicator[-1]
+        if isinstance(indicator, SuperTrend):
+            return value.value, value.trend
+        if isinstance(indicator, BB):
+            return value.lb, value.cb, value.ub
+        return (value,)
+
+    for create, use_ohlcv in ((lambda: SuperTrend(7, 3), True), (lambda: RSI(14), False), (lambda: BB(20, 2), False)):
+        warmedUp, added = warm_up(create(), history, keep=30), create()
+        for ohlcv in [OHLCV(*row[1:], row[0]) for row in history.itertuples(index=False)]:
+            added.add(ohlcv if use_ohlcv else ohlcv.close)
+        assert values(warmedUp) == approx(values(added))
+        assert len(warmedUp.output_values) == 30
+
+        for row in live.itertuples(index=False):
+            ohlcv = OHLCV(*row[1:], row[0])
+            for indicator in (warmedUp, added):
+                indicator.add(ohlcv if use_ohlcv else ohlcv.close)
+            assert values(warmedUp) == approx(values(added))
+
+    indicatorManager = IndicatorManager(capacity=100)
+    indicatorManager.register_indicator(RSI, use_ohlcv=False)
+    indicatorManager.add_timeframe(300)
+    indicatorManager.add_instrument(300, "a")
+    indicatorManager.add_indicator(300, "a", RSI, {"period": 14})
+    indicatorManager.warm_up(300, "a", history)
+    assert indicatorManager.get_candles(300, "a").close.tolist() == history["Close"].tolist()[-100:]
+    assert indicatorManager.get_indicator_value(300, "a", RSI) == approx(warm_up(RSI(14), history)[-1])
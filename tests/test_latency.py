@@ -0,0 +1,25 @@
+from pyalgomate.barfeed.latency import LatencyHistogram, LatencyTracker
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LatencyHistogram()
+    for value in range(1, 100001):
+        histogram.record(value)
+
+    assert histogram.getCount() == 100000
+    assert histogram.getMax() == 100000
+    for percentile in (50, 90, 99):
+        expected = percentile * 1000
+        assert abs(histogram.getPercentile(percentile) - expected) <= expected / 64
+
+
+def test_tracker_records_microseconds():
+    tracker = LatencyTracker()
+    tracker.record("publishToFeed", 1500000)
+    tracker.record("publishToFeed", -1000)
+
+    summary = tracker.getSummary()
+    assert list(summary.keys()) == ["publishToFeed"]
+    assert summary["publishToFeed"]["count"] == 2
+    assert summary["publishToFeed"]["max"] == 1500
+    assert summary["publishToFeed"]["negative"] == 1
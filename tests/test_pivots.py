@@ -0,0 +1,47 @@
+import datetime
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from pyalgomate.technical.pivots import StreamingStructuralPivots, StreamingSwingPivotsJSP
+from pyalgomate.technical.StructuralPivots import StructuralPivots
+from pyalgomate.technical.SwingPivotsJSP import SwingPivotsJSP
+
+
+def pivots(detector):
+    return (detector.getPivotHighs(), detector.getPivotLows(), detector.getLargePivotHighs(),
+            detector.getLargePivotLows())
+
+
+# Small integer prices, so that equal highs and lows are frequent
+bars = st.lists(
+    st.tuples(st.integers(0, 20), st.integers(0, 20), st.integers(0, 4), st.integers(0, 4)),
+    max_size=120,
+)
+
+
+@settings(max_examples=200, deadline=None)
+@given(values=bars, lookupPeriod=st.integers(1, 3), split=st.integers(0, 120))
+def test_streaming_pivots_match_the_original_ones(values, lookupPeriod, split):
+    columns = [[], [], [], [], []]
+    for i, (open, close, up, down) in enumerate(values):
+        for column, value in zip(columns, (datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=i), open,
+                                           max(open, close) + up, min(open, close) - down, close)):
+            column.append(value)
+
+    for create, createStreaming in (
+        (lambda: StructuralPivots(lookupPeriod), lambda: StreamingStructuralPivots(lookupPeriod)),
+        (SwingPivotsJSP, StreamingSwingPivotsJSP),
+    ):
+        original, streaming, batch = create(), createStreaming(), createStreaming()
+        for row in zip(*columns):
+            original.add_input_value(*row)
+            streaming.add_input_value(*row)
+        # In batch after streaming a few bars
+        for row in zip(*(column[:split] for column in columns)):
+            batch.add_input_value(*row)
+        batch.add_input_values(*(column[split:] for column in columns))
+
+        assert pivots(streaming) == pivots(original)
+        assert pivots(batch) == pivots(original)
+        assert streaming.getBars() == original.getBars()[-2 * streaming.lookupPeriod - 1:]
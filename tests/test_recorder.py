@@ -0,0 +1,71 @@
+import datetime
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyalgomate.barfeed import wire
+from pyalgomate.barfeed.recorder import TickLog, convertLogToParquet, getMetadataPath
+from pyalgomate.barfeed.replay import loadTicks
+
+
+@pytest.fixture
+def localTimeZone(monkeypatch):
+    # The recorded times are local, IST is away from UTC
+    monkeypatch.setenv("TZ", "Asia/Kolkata")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def buildQuote(token, exchangeTime, ltp):
+    return {
+        "e": "NFO", "tk": token, "ft": exchangeTime, "lp": ltp, "v": 10, "oi": 5,
+        "bp1": ltp - 0.05, "bq1": 15, "sp1": ltp + 0.05, "sq1": 30,
+    }
+
+
+def test_ticks_round_trip_through_log_and_parquet(tmp_path, localTimeZone):
+    exchangeTime = int(datetime.datetime(2024, 3, 20, 9, 15).timestamp())
+    logPath = str(tmp_path / "ticks-2024-03-20.log")
+    log = TickLog(logPath, chunkSize=wire.TickDtype.itemsize)
+    log.append(wire.encodeTick(buildQuote("43184", exchangeTime, 245.35), receiveTime=3))
+    # A frame of several ticks, growing the file
+    log.append(wire.encodeTicks([buildQuote("43185", exchangeTime + 1, 120.0),
+                                 buildQuote("43184", exchangeTime + 2, 246.0)]))
+    assert len(log) == 3
+    # Only flushed records are visible to readers
+    assert len(TickLog.read(logPath)) == 0
+    log.flush()
+    log.close()
+    with open(getMetadataPath(logPath), "w") as f:
+        json.dump({"roots": {"NFO|43184": "BANKNIFTY", "NFO|43185": "BANKNIFTY"},
+                   "symbols": {"NFO|43184": "NFO|BANKNIFTY20MAR24C47000"}}, f)
+
+    # Appending to an existing log carries on after its records
+    log = TickLog(logPath)
+    log.append(wire.encodeTick(buildQuote("43185", exchangeTime + 3, 121.0)))
+    log.close()
+    ticks = TickLog.read(logPath)
+    assert ticks["ltp"].tolist() == [245.35, 120.0, 246.0, 121.0]
+    assert ticks["token"].tolist() == [43184, 43185, 43184, 43185]
+    assert ticks["exchangeTime"][0] == exchangeTime
+
+    directory = str(tmp_path / "parquet")
+    assert convertLogToParquet(logPath, directory) == 4
+    df = pd.read_parquet(directory)
+    assert df["Date/Time"].min() == datetime.datetime(2024, 3, 20, 9, 15)
+    assert df["Date"].astype(str).unique().tolist() == ["2024-03-20"]
+
+    logTicks, logRoots, logSymbols = loadTicks(logPath)
+    parquetTicks, parquetRoots, parquetSymbols = loadTicks(directory)
+    assert logRoots == parquetRoots
+    assert logSymbols == parquetSymbols == {"NFO|43184": "NFO|BANKNIFTY20MAR24C47000"}
+    assert len(logTicks) == len(parquetTicks) == 4
+    # Both sorted by receive time
+    assert logTicks["receiveTime"][0] == 3
+    for field in wire.TickDtype.names:
+        np.testing.assert_array_equal(logTicks[field], parquetTicks[field])
@@ -0,0 +1,173 @@
+import datetime
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from pyalgotrade import bar
+
+from pyalgomate.core.resampled import ResampledBars
+
+
+class Feed:
+    def __init__(self, frequency):
+        self.__frequency = frequency
+
+    def getFrequency(self):
+        return self.__frequency
+
+
+def bars(dateTime, frequency, **prices):
+    return bar.Bars({
+        instrument: bar.BasicBar(dateTime, price, price, price, price, 10, None, frequency)
+        for instrument, price in prices.items()
+    })
+
+
+def at(minute, second=0):
+    return datetime.datetime(2024, 1, 1, 9, minute, second)
+
+
+def test_ticks_are_grouped_until_the_period_changes():
+    closed = []
+    resampledBars = ResampledBars(Feed(bar.Frequency.TRADE), bar.Frequency.MINUTE, closed.append)
+
+    resampledBars.addBars(at(15, 1), bars(at(15, 1), bar.Frequency.TRADE, a=100, b=50))
+    resampledBars.addBars(at(15, 20), bars(at(15, 20), bar.Frequency.TRADE, a=104))
+    resampledBars.addBars(at(15, 40), bars(at(15, 40), bar.Frequency.TRADE, a=98, c=7))
+    assert closed == []
+    inProgress = resampledBars.getBar("a")
+    assert (inProgress.getOpen(), inProgress.getHigh(), inProgress.getLow(), inProgress.getClose()) == (100, 104, 98, 98)
+    assert resampledBars.getBar("d") is None
+
+    # The first tick of the next period closes the previous one and is kept
+    resampledBars.addBars(at(16, 2), bars(at(16, 2), bar.Frequency.TRADE, a=101))
+    assert len(closed) == 1
+    assert sorted(closed[0].getInstruments()) == ["a", "b", "c"]
+    a = closed[0].getBar("a")
+    assert a.getDateTime() == at(15)
+    assert (a.getOpen(), a.getHigh(), a.getLow(), a.getClose(), a.getVolume()) == (100, 104, 98, 98, 30)
+    assert closed[0].getBar("b").getVolume() == 10
+    assert resampledBars.getLastBars() is closed[0]
+    assert resampledBars.getBar("b") is None
+
+    resampledBars.checkNow(at(17, 0))
+    assert len(closed) == 2
+    assert closed[1].getInstruments() == ["a"]
+    assert closed[1].getBar("a").getOpen() == 101
+
+
+def test_minute_bars_close_with_the_last_bar_of_the_period():
+    closed = []
+    resampledBars = ResampledBars(Feed(bar.Frequency.MINUTE), 3 * bar.Frequency.MINUTE, closed.append)
+
+    for minute, price in ((15, 10), (16, 12), (17, 11)):
+        resampledBars.addBars(at(minute), bars(at(minute), bar.Frequency.MINUTE, a=price))
+    assert len(closed) == 1
+    a = closed[0].getBar("a")
+    assert (a.getDateTime(), a.getOpen(), a.getHigh(), a.getLow(), a.getClose(), a.getVolume()) == (at(15), 10, 12, 10, 11, 30)
+
+    # More instruments than the initial capacity
+    resampledBars.addBars(at(18), bars(at(18), bar.Frequency.MINUTE, **{f"i{i}": i + 1 for i in range(300)}))
+    assert resampledBars.getBar("i299").getClose() == 300
+
+
+def test_hub_builds_coarser_frequencies_from_finer_ones_once():
+    from talipp.indicators import SMA
+
+    from pyalgomate.core.resampled import ResamplingHub
+
+    hub = ResamplingHub(Feed(bar.Frequency.MINUTE))
+    indicatorManager = hub.getIndicatorManager()
+    indicatorManager.register_indicator(SMA, use_ohlcv=False)
+    indicatorManager.add_timeframe(3 * bar.Frequency.MINUTE)
+    indicatorManager.add_instrument(3 * bar.Frequency.MINUTE, "a")
+    indicatorManager.add_indicator(3 * bar.Frequency.MINUTE, "a", SMA, {"period": 2})
+
+    closed = {frequency: [] for frequency in (1, 3, 6, 15)}
+    # Every subscription hands the same bars over, as strategies sharing the feed do
+    subscriptions = [
+        hub.subscribe(3 * bar.Frequency.MINUTE, closed[3].append),
+        hub.subscribe(15 * bar.Frequency.MINUTE, closed[15].append),
+        hub.subscribe(bar.Frequency.MINUTE, closed[1].append),
+        hub.subscribe(6 * bar.Frequency.MINUTE, closed[6].append),
+    ]
+    assert hub.getSourceFrequency(bar.Frequency.MINUTE) is None
+    assert hub.getSourceFrequency(3 * bar.Frequency.MINUTE) == bar.Frequency.MINUTE
+    assert hub.getSourceFrequency(6 * bar.Frequency.MINUTE) == 3 * bar.Frequency.MINUTE
+    assert hub.getSourceFrequency(15 * bar.Frequency.MINUTE) == 3 * bar.Frequency.MINUTE
+
+    for minute in range(15, 30):
+        value = bars(at(minute), bar.Frequency.MINUTE, a=minute)
+        for subscription in subscriptions:
+            subscription.addBars(at(minute), value)
+
+    assert len(closed[1]) == 15
+    assert [bars_.getDateTime() for bars_ in closed[3]] == [at(minute) for minute in range(15, 30, 3)]
+    assert [bars_.getDateTime() for bars_ in closed[6]] == [at(15), at(21)]
+    fifteen = closed[15][0].getBar("a")
+    assert (fifteen.getOpen(), fifteen.getHigh(), fifteen.getLow(), fifteen.getClose(), fifteen.getVolume()) == (15, 29, 15, 29, 150)
+    assert indicatorManager.get_indicator_values(3 * bar.Frequency.MINUTE, "a", SMA)[-1] == (26 + 29) / 2
+    assert subscriptions[0].getLastBars() is closed[3][-1]
+
+
+@settings(max_examples=200, deadline=None)
+@given(
+    frequency=st.sampled_from([1, 2, 3, 5, 15, 75]),
+    # The step "c" is added at by the strategy, as for a newly selected strike
+    addedAt=st.integers(min_value=1, max_value=150),
+    minutes=st.lists(
+        st.tuples(
+            st.sampled_from(["a", "b"]),
+            # Two sessions, some bars before the 09:15 anchor
+            st.sampled_from([0, 1]),
+            st.integers(min_value=0, max_value=200),
+            st.integers(min_value=1, max_value=1000),
+            st.integers(min_value=0, max_value=500),
+        ),
+        min_size=1,
+        max_size=150,
+    ),
+)
+def test_precomputed_candles_match_online_resampling(frequency, addedAt, minutes):
+    import pandas as pd
+
+    from pyalgomate.backtesting.DataFrameFeed import DataFrameFeed
+    from pyalgomate.core.resampled import PublishedBars
+
+    rows = []
+    for ticker, day, minute, price, volume in minutes:
+        dateTime = pd.Timestamp(2024, 1, 1 + day, 9, 10) + pd.Timedelta(minutes=minute)
+        rows.append((ticker, dateTime, price, price + 5, price - 1, price + 2, volume, 0))
+        # "c" trades whenever another instrument does
+        rows.append(("c", dateTime, price + 1, price + 3, price, price + 1, volume + 1, 0))
+    df = pd.DataFrame(rows, columns=["Ticker", "Date/Time", "Open", "High", "Low", "Close", "Volume", "Open Interest"])
+    feed = DataFrameFeed(df, df, ["a", "b"])
+    frequency *= bar.Frequency.MINUTE
+
+    online, precomputed = [], []
+    resampledBars = ResampledBars(feed, frequency, lambda bars_: online.append((step, bars_)))
+    publishedBars = PublishedBars(feed.subscribeCandles(frequency), frequency,
+                                  lambda bars_: precomputed.append((step, bars_)))
+    step = 0
+    while not feed.eof():
+        step += 1
+        value = feed.getNextBars()
+        if step == addedAt:
+            # Like onBars, before the bars are resampled
+            feed.getLastBar("c")
+        for resampler in (resampledBars, publishedBars):
+            if value is not None:
+                resampler.addBars(value.getDateTime(), value)
+            else:
+                resampler.checkNow(feed.getNextBarsDateTime())
+
+    def values(closed):
+        return [
+            (step, bars_.getDateTime(), {
+                instrument: (bar_.getDateTime(), bar_.getOpen(), bar_.getHigh(), bar_.getLow(), bar_.getClose(),
+                             bar_.getVolume(), bar_.getFrequency())
+                for instrument, bar_ in bars_.items()
+            })
+            for step, bars_ in closed
+        ]
+
+    assert values(precomputed) == values(online)
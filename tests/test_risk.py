@@ -0,0 +1,36 @@
+import datetime
+import math
+
+from pyalgomate.core.risk import RiskAggregator
+from pyalgomate.strategies import OptionContract, OptionGreeks
+
+instrument = "BANKNIFTY2432047000CE"
+optionContract = OptionContract(instrument, 47000, datetime.date(2024, 3, 20), "c", "BANKNIFTY")
+
+
+def buildGreeks(delta, gamma=0.001, theta=-10.0, vega=5.0):
+    return {instrument: OptionGreeks(optionContract, 100.0, delta, gamma, theta, vega, 0.15)}
+
+
+def test_non_finite_greeks_are_ignored():
+    aggregator = RiskAggregator()
+    aggregator.onFill("strategy", instrument, -15, optionContract)
+
+    assert aggregator.updateGreeks(buildGreeks(math.nan)) == 0
+    assert aggregator.getMissingGreeks() == [instrument]
+    assert aggregator.getTotalGreeks() == dict.fromkeys(("delta", "gamma", "theta", "vega"), 0.0)
+
+    assert aggregator.updateGreeks(buildGreeks(0.5)) == 1
+    assert aggregator.getTotalGreeks()["delta"] == -7.5
+
+    # The previous greeks are kept and a repeated NaN is not a change
+    assert aggregator.updateGreeks(buildGreeks(0.6, vega=math.inf)) == 0
+    assert aggregator.updateGreeks(buildGreeks(math.nan)) == 0
+    assert aggregator.getTotalGreeks()["delta"] == -7.5
+    assert aggregator.getTotalGreeks()["vega"] == -75.0
+
+    assert aggregator.updateGreeks(buildGreeks(0.4)) == 1
+    assert math.isclose(aggregator.getTotalGreeks()["delta"], -6.0)
+
+    aggregator.onFill("strategy", instrument, 15, optionContract)
+    assert aggregator.getBucketGreeks() == {}
@@ -0,0 +1,154 @@
+import datetime
+
+import numpy as np
+
+from pyalgomate.core.scenario import ScenarioEngine, blackScholesPrice
+from pyalgomate.strategies import OptionContract, OptionGreeks
+
+underlying = "BANKNIFTY"
+expiry = datetime.date(2024, 3, 27)
+dateTime = datetime.datetime(2024, 3, 20, 10, 0)
+
+
+class Order:
+    def __init__(self, quantity, price, isSell):
+        self.__quantity = quantity
+        self.__price = price
+        self.__isSell = isSell
+
+    def getQuantity(self):
+        return self.__quantity
+
+    def getAvgFillPrice(self):
+        return self.__price
+
+    def isSell(self):
+        return self.__isSell
+
+
+class Position:
+    def __init__(self, instrument, quantity, price, isSell, pnl=None):
+        self.__instrument = instrument
+        self.__entryOrder = Order(quantity, price, isSell)
+        self.__pnl = pnl
+
+    def getInstrument(self):
+        return self.__instrument
+
+    def getEntryOrder(self):
+        return self.__entryOrder
+
+    def exitFilled(self):
+        return self.__pnl is not None
+
+    def getPnL(self):
+        return self.__pnl
+
+
+def getOptionContract(instrument):
+    strike, type_ = int(instrument[-7:-2]), instrument[-2].lower()
+    return OptionContract(instrument, strike, expiry, type_, underlying)
+
+
+def buildPositions():
+    # An iron condor, a long call and a closed leg
+    return [
+        Position("BANKNIFTY2432747500CE", 15, 120.0, True),
+        Position("BANKNIFTY2432748000CE", 15, 45.0, False),
+        Position("BANKNIFTY2432746500PE", 15, 110.0, True),
+        Position("BANKNIFTY2432746000PE", 15, 40.0, False),
+        Position("BANKNIFTY2432747000CE", 30, 250.0, False),
+        Position("BANKNIFTY2432746800PE", 15, 90.0, True, pnl=-375.0),
+    ]
+
+
+def buildOptionData(positions, iv=0.15):
+    return {
+        position.getInstrument(): OptionGreeks(getOptionContract(position.getInstrument()), 100.0, 0.5,
+                                               0.001, -10.0, 5.0, iv)
+        for position in positions
+    }
+
+
+def loopPayoff(positions, spotRange):
+    # How PayoffView computed the expiry payoff before the engine
+    payoff = np.zeros_like(spotRange)
+    for position in positions:
+        optionContract = getOptionContract(position.getInstrument())
+        if position.exitFilled():
+            payoff += position.getPnL()
+            continue
+        quantity = position.getEntryOrder().getQuantity()
+        entryPrice = position.getEntryOrder().getAvgFillPrice()
+        sign = -1 if position.getEntryOrder().isSell() else 1
+        if optionContract.type == "c":
+            positionPayoff = np.maximum(spotRange - optionContract.strike, 0) * quantity - entryPrice * quantity
+        else:
+            positionPayoff = np.maximum(optionContract.strike - spotRange, 0) * quantity - entryPrice * quantity
+        payoff += sign * positionPayoff
+    return payoff
+
+
+def test_black_scholes_put_call_parity():
+    spot = np.linspace(40000, 54000, 15)[:, None]
+    strike = np.array([44000.0, 47000.0, 50000.0])
+    tte, sigma = 10 / 365.0, 0.18
+    calls = blackScholesPrice(spot, strike, tte, sigma, True)
+    puts = blackScholesPrice(spot, strike, tte, sigma, False)
+    assert calls.shape == (15, 3)
+    np.testing.assert_allclose(calls - puts, spot - strike, atol=1e-6)
+
+
+def test_black_scholes_is_intrinsic_when_expired():
+    spot = np.array([46000.0, 47000.0, 48000.0])
+    for tte in (0.0, -1.0):
+        np.testing.assert_array_equal(blackScholesPrice(spot, 47000.0, tte, 0.2, True), [0.0, 0.0, 1000.0])
+        np.testing.assert_array_equal(blackScholesPrice(spot, 47000.0, tte, 0.2, False), [1000.0, 0.0, 0.0])
+
+
+def test_expiry_payoff_matches_the_position_loop():
+    positions = buildPositions()
+    engine = ScenarioEngine()
+    spot = 47000.0
+    book = engine.buildBook(positions, getOptionContract, buildOptionData(positions), {underlying: spot},
+                            dateTime)
+    assert len(book) == 5
+    assert book.realizedPnL == -375.0
+
+    spotMoves = np.linspace(-0.05, 0.05, 201)
+    np.testing.assert_allclose(engine.expiryPayoff(book, spotMoves), loopPayoff(positions, spot * (1 + spotMoves)))
+
+
+def test_evaluate_grid_and_cache():
+    positions = buildPositions()
+    engine = ScenarioEngine()
+    spotMoves = np.linspace(-0.05, 0.05, 101)
+    ivShifts, daysForward = (-0.02, 0.0, 0.02), (0.0, 3.0, 30.0)
+
+    book = engine.buildBook(positions, getOptionContract, buildOptionData(positions), {underlying: 47000.0},
+                            dateTime)
+    pnl = engine.evaluate(book, spotMoves, ivShifts, daysForward)
+    assert pnl.shape == (101, 3, 3)
+    assert not pnl.flags.writeable
+    # Past every expiry the legs are at intrinsic
+    np.testing.assert_allclose(pnl[:, 1, 2], engine.expiryPayoff(book, spotMoves))
+
+    # The same positions and snapshot, rebuilt, are served from the cache
+    rebuilt = engine.buildBook(positions, getOptionContract, buildOptionData(positions), {underlying: 47000.0},
+                               dateTime)
+    assert engine.evaluate(rebuilt, spotMoves, ivShifts, daysForward) is pnl
+    assert engine.getCacheStats()["hits"] == 1
+
+    # A change of the positions, the spot or the IVs is priced again
+    books = [
+        engine.buildBook(positions[:-2], getOptionContract, buildOptionData(positions), {underlying: 47000.0},
+                         dateTime),
+        engine.buildBook(positions, getOptionContract, buildOptionData(positions), {underlying: 47100.0},
+                         dateTime),
+        engine.buildBook(positions, getOptionContract, buildOptionData(positions, iv=0.2),
+                         {underlying: 47000.0}, dateTime),
+    ]
+    for changed in books:
+        assert engine.evaluate(changed, spotMoves, ivShifts, daysForward) is not pnl
+    # One entry per evaluation and one for the expiry payoff
+    assert engine.getCacheStats() == {"size": 5, "hits": 1, "misses": 5}
@@ -0,0 +1,39 @@
+import os
+
+from pyalgomate.barfeed.sharedquotes import SharedQuoteTable, SlotReader
+
+
+def test_slots_are_visible_to_readers():
+    name = f"pyalgomate_test_{os.getpid()}"
+    writer = SharedQuoteTable(name, capacity=2, create=True)
+    reader = SharedQuoteTable(name)
+    try:
+        slot = writer.update({"e": "NFO", "tk": "43184", "ft": 1700000000, "lp": "245.35", "sp1": "245.4"})
+        writer.update({"e": "NSE", "tk": "26000", "lp": "22000"})
+        writer.update({"e": "NFO", "tk": "43184", "ft": 1700000001, "lp": "246", "sp1": "246.1"})
+
+        assert reader.getSlot("NFO|43184") == slot
+        tick = reader.get("NFO|43184")
+        assert tick[2] == 1700000001
+        assert tick[4] == 246.0
+        assert tick[9] == 246.1
+        assert reader.get("NFO|1") is None
+        assert reader.snapshot()["ltp"].tolist() == [246.0, 22000.0]
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_slot_reader_follows_a_recreated_table():
+    name = f"pyalgomate_test_{os.getpid()}"
+    slotReader = SlotReader(name)
+    try:
+        writer = SharedQuoteTable(name, capacity=1, create=True)
+        assert slotReader.read(writer.encodeSlot(writer.update({"e": "NFO", "tk": "1", "lp": "1"})))[4] == 1.0
+        writer.close()
+
+        writer = SharedQuoteTable(name, capacity=1, create=True)
+        assert slotReader.read(writer.encodeSlot(writer.update({"e": "NFO", "tk": "2", "lp": "2"})))[1] == 2
+        writer.close()
+    finally:
+        slotReader.close()
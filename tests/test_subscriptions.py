@@ -0,0 +1,170 @@
+import datetime
+import os
+import re
+import time
+
+import pytest
+
+from pyalgomate.barfeed.livefeed import LiveQuoteFeed
+from pyalgomate.barfeed.publisher import QuotePublisher
+from pyalgomate.brokers.finvasia.subscriptions import StrikeSubscriptionManager
+from pyalgomate.brokers.symboltable import SymbolTable
+from pyalgomate.strategies import OptionContract
+
+underlying = "NSE|NIFTY BANK"
+expiry = datetime.date(2024, 3, 27)
+strikes = range(46000, 48001, 100)
+
+
+def getSymbol(strike, callOrPut):
+    return f"NFO|BANKNIFTY27MAR24{callOrPut}{strike}"
+
+
+def parseSymbol(symbol):
+    m = re.match(r"NFO\|BANKNIFTY27MAR24([CP])(\d+)", symbol)
+    if m is None:
+        return None
+    return OptionContract(symbol, int(m.group(2)), expiry, m.group(1).lower(), underlying)
+
+
+tokenMappings = {underlying: "NSE|26009"}
+for i, strike in enumerate(strikes):
+    tokenMappings[getSymbol(strike, "C")] = f"NFO|{1000 + 2 * i}"
+    tokenMappings[getSymbol(strike, "P")] = f"NFO|{1001 + 2 * i}"
+
+
+class WebSocketClient:
+    def __init__(self, instruments):
+        self.tokenMappings = {tokenMappings[instrument]: instrument for instrument in instruments}
+        self.subscribed = []
+        self.unsubscribed = []
+        self.holdingsHandler = None
+
+    def getTokenMappings(self):
+        return dict(self.tokenMappings)
+
+    def addQuoteHandler(self, handler):
+        pass
+
+    def addHoldingsHandler(self, handler):
+        self.holdingsHandler = handler
+
+    def subscribe(self, mappings):
+        self.tokenMappings.update(mappings)
+        self.subscribed += mappings.values()
+
+    def unsubscribe(self, tokens):
+        self.unsubscribed += [self.tokenMappings.pop(token) for token in tokens]
+
+
+class SubscriptionManager(StrikeSubscriptionManager):
+    def getBand(self, underlying, atm):
+        return [
+            getSymbol(strike, callOrPut)
+            for strike in range(atm - 200, atm + 201, 100)
+            for callOrPut in ("C", "P")
+        ]
+
+
+def buildManager(instruments):
+    wsClient = WebSocketClient([underlying] + instruments)
+    manager = SubscriptionManager(
+        wsClient, [underlying], strikeCount=2, rebalanceStrikes=2, tokenMappings=tokenMappings,
+        symbolTable=SymbolTable(parseSymbol),
+    )
+    return wsClient, manager
+
+
+def test_band_moves_once_the_atm_drifts_enough():
+    wsClient, manager = buildManager([getSymbol(46000, "C")])
+
+    manager.onQuote("NSE|26009", {"lp": "47010"})
+    assert manager.getAtm(underlying) == 47000
+    assert wsClient.unsubscribed == [getSymbol(46000, "C")]
+    assert manager.getSubscribed(underlying) == set(manager.getBand(underlying, 47000))
+
+    # Within rebalanceStrikes of the centre nothing changes
+    wsClient.subscribed, wsClient.unsubscribed = [], []
+    manager.onQuote("NSE|26009", {"lp": "47140"})
+    manager.onQuote("NSE|26009", {"lp": "46860"})
+    assert manager.getAtm(underlying) == 47000
+    assert wsClient.subscribed == wsClient.unsubscribed == []
+
+    manager.onQuote("NSE|26009", {"lp": "47210"})
+    assert manager.getAtm(underlying) == 47200
+    assert sorted(wsClient.subscribed) == sorted([getSymbol(s, t) for s in (47300, 47400) for t in "CP"])
+    assert sorted(wsClient.unsubscribed) == sorted([getSymbol(s, t) for s in (46800, 46900) for t in "CP"])
+
+
+def test_held_instruments_stay_subscribed():
+    wsClient, manager = buildManager([])
+    manager.onQuote("NSE|26009", {"lp": "47000"})
+
+    held = getSymbol(46800, "P")
+    wsClient.holdingsHandler("feed", [held])
+    manager.onQuote("NSE|26009", {"lp": "47400"})
+    assert held not in wsClient.unsubscribed
+    assert held in manager.getSubscribed(underlying)
+
+    # Once no feed holds it, the next rebalance lets it go
+    wsClient.holdingsHandler("feed", [])
+    manager.onQuote("NSE|26009", {"lp": "47600"})
+    assert held in wsClient.unsubscribed
+
+    # Held after it left the band, it is subscribed again
+    wsClient.subscribed = []
+    wsClient.holdingsHandler("other", [held])
+    assert wsClient.subscribed == [held]
+    assert manager.getPinned() == {held}
+
+
+def waitFor(condition, feed=None):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if feed is not None:
+            feed.getNextBars()
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.mark.parametrize("wireFormat", ["pickle", "binary"])
+def test_feed_follows_subscriptions_and_keeps_held_bars(wireFormat):
+    ipcPath = os.path.join("/tmp", f"pyalgomate_test_{os.getpid()}_{wireFormat}")
+    instrumentA, instrumentB = getSymbol(47000, "C"), getSymbol(47000, "P")
+    publisher = QuotePublisher(ipcPath, wireFormat=wireFormat)
+    publisher.setInstruments({tokenMappings[instrumentA]: instrumentA, tokenMappings[instrumentB]: instrumentB})
+    holdings = []
+    publisher.addHoldingsHandler(lambda feed, instruments: holdings.append(instruments))
+    feed = LiveQuoteFeed(None, tokenMappings, [instrumentA], ipc_path=ipcPath, followSubscriptions=True,
+                         wireFormat=wireFormat)
+    try:
+        quoteTimes = iter(range(int(time.time()), int(time.time()) + 100))
+
+        # Bars are only built when the time of the quotes moves on
+        def publish(instrument, ltp):
+            exchange, token = tokenMappings[instrument].split("|")
+            publisher.publish({"e": exchange, "tk": token, "ft": str(next(quoteTimes)), "lp": str(ltp)})
+
+        time.sleep(0.2)
+        publish(instrumentB, 10.0)
+        publish(instrumentA, 20.0)
+        assert waitFor(lambda: feed.getLastBar(instrumentA) is not None, feed)
+        assert feed.getLastBar(instrumentB) is None
+
+        publisher.publishSubscriptions([instrumentB], [])
+        time.sleep(0.2)
+        publish(instrumentB, 11.0)
+        assert waitFor(lambda: feed.getLastBar(instrumentB) is not None, feed)
+        assert feed.getLastBar(instrumentB).getClose() == 11.0
+
+        feed.setHeldInstruments("strategy", [instrumentB])
+        assert waitFor(lambda: holdings == [[instrumentB]])
+
+        publisher.publishSubscriptions([], [instrumentA, instrumentB])
+        assert waitFor(lambda: feed.getLastBar(instrumentA) is None, feed)
+        assert feed.getLastBar(instrumentB).getClose() == 11.0
+    finally:
+        feed.stop()
+        publisher.close()
@@ -0,0 +1,78 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from pyalgomate.core.volatility import VolatilitySurface, fitSVI, sviTotalVariance
+from pyalgomate.strategies import OptionContract, OptionGreeks
+
+expiry = datetime.date(2024, 3, 27)
+dateTime = datetime.datetime(2024, 3, 20, 9, 30)
+spot = 47000.0
+sviParams = np.array([0.0004, 0.004, -0.4, 0.01, 0.05])
+
+
+def buildOptionData(strikes, ivs):
+    optionData = dict()
+    for strike, iv in zip(strikes, ivs):
+        for optionType in ("c", "p"):
+            symbol = f"BANKNIFTY{int(strike)}{optionType}"
+            optionContract = OptionContract(symbol, strike, expiry, optionType, "BANKNIFTY")
+            optionData[symbol] = OptionGreeks(optionContract, 100.0, 0.5, 0.0, 0.0, 0.0, iv)
+    return optionData
+
+
+def sviIVs(strikes, tte):
+    return np.sqrt(sviTotalVariance(sviParams, np.log(np.asarray(strikes) / spot)) / tte)
+
+
+def test_svi_fit_recovers_the_smile():
+    k = np.linspace(-0.08, 0.08, 21)
+    w = sviTotalVariance(sviParams, k)
+    params = fitSVI(k, w)
+    assert params is not None
+    assert sviTotalVariance(params, k) == pytest.approx(w, rel=1e-4)
+    # Too few strikes for 5 parameters
+    assert fitSVI(k[:4], w[:4]) is None
+
+
+def test_sparse_chain_falls_back_to_a_quadratic():
+    surface = VolatilitySurface()
+    strikes = [46500.0, 47000.0, 47500.0]
+    ivs = [0.16, 0.14, 0.15]
+    assert surface.update(dateTime, buildOptionData(strikes, ivs), {"BANKNIFTY": spot}) == [("BANKNIFTY", expiry)]
+
+    smile = surface.getSmile("BANKNIFTY", expiry)
+    assert smile.kind == "quadratic"
+    assert smile.iv(strikes) == pytest.approx(ivs)
+
+
+def test_smile_is_reused_until_quotes_move():
+    surface = VolatilitySurface()
+    strikes = np.arange(45000.0, 49001.0, 200.0)
+    tte = (expiry - dateTime.date()).days / 365.0 + 1 / 365.0
+    ivs = sviIVs(strikes, tte)
+
+    surface.update(dateTime, buildOptionData(strikes, ivs), {"BANKNIFTY": spot})
+    smile = surface.getSmile("BANKNIFTY", expiry)
+    assert smile.kind == "svi"
+    assert smile.iv(strikes) == pytest.approx(ivs, rel=1e-3)
+    # The delta of the strike found for a delta is that delta
+    strike = smile.strikeForDelta(0.25, "p")
+    assert smile.delta(strike, "p") == pytest.approx(-0.25, abs=1e-3)
+
+    # Small moves keep the fitted smile
+    assert surface.update(dateTime, buildOptionData(strikes, ivs + 0.001), {"BANKNIFTY": spot}) == []
+    assert surface.getSmile("BANKNIFTY", expiry) is smile
+    assert surface.getStats() == {"smiles": 1, "fits": 1, "skipped": 1}
+
+    # As does a move of the spot within the tolerance, a larger one refits
+    assert surface.update(dateTime, buildOptionData(strikes, ivs), {"BANKNIFTY": spot * 1.001}) == []
+    assert surface.update(dateTime, buildOptionData(strikes, ivs), {"BANKNIFTY": spot * 1.01}) == [
+        ("BANKNIFTY", expiry)]
+    assert surface.getSmile("BANKNIFTY", expiry) is not smile
+
+    # NaN IVs are dropped rather than fitted
+    ivs[::2] = np.nan
+    surface.update(dateTime, buildOptionData(strikes, ivs), {"BANKNIFTY": spot})
+    assert np.isfinite(surface.getSmile("BANKNIFTY", expiry).iv(strikes)).all()